@@ -1,5 +1,7 @@
 # Home.py
 import streamlit as st
+# Imported first so DIAGNOSTICS_TRACEMALLOC also attributes the model and caches
+import diagnostics  # noqa: F401
 from auth import (
     student_signup, placement_signup,
     student_login, placement_login,
@@ -115,7 +117,7 @@ else:
         #### 🏢 For Placement Unit
         - **Student Rankings**: Rank all applicants for a specific company
         - **Comparative Analysis**: See how students stack up against each other
-        - **Data Export**: Download rankings as CSV for records
+        - **Data Export**: Download full rankings as CSV or Excel, with matched/missing columns per skill
         - **Placement Insights**: Based on 2025 batch placement data
         
         ### 🚀 How to Get Started:
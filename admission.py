@@ -0,0 +1,154 @@
+# admission.py
+import collections
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# How many model inferences may run at once across all sessions and workers.
+# Running more than the cores can serve only makes every request slower.
+MAX_CONCURRENT_INFERENCES = int(os.getenv("MAX_CONCURRENT_INFERENCES", "2"))
+# Requests allowed to wait in line before new ones are turned away
+MAX_QUEUE_LENGTH = int(os.getenv("MAX_ANALYSIS_QUEUE", "200"))
+# Seconds a request may wait before giving up
+QUEUE_TIMEOUT = float(os.getenv("ANALYSIS_QUEUE_TIMEOUT", "300"))
+# torch intra-op threads per inference (default: split the cores between slots)
+TORCH_THREADS = int(os.getenv("TORCH_THREADS", "0")) or max(1, (os.cpu_count() or 1) // MAX_CONCURRENT_INFERENCES)
+
+
+class AdmissionRejected(Exception):
+    """Raised when the analysis queue is full or the wait timed out"""
+
+
+class AdmissionController:
+    """
+    Bounded-concurrency gate with first-come-first-served waiting lines.
+
+    At most max_concurrent callers hold a slot; the rest wait in FIFO order,
+    so a burst of requests is served at peak throughput instead of thrashing.
+    Background work (auto-scoring, bulk jobs) waits in its own line, which
+    only gets a slot when no interactive request is waiting, and is never
+    rejected or timed out.
+    """
+
+    def __init__(self, max_concurrent=MAX_CONCURRENT_INFERENCES, max_queue=MAX_QUEUE_LENGTH):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max_queue
+        self._cond = threading.Condition()
+        self._active = 0
+        self._queue = collections.deque()
+        self._background = collections.deque()
+        self.admitted_total = 0
+        self.rejected_total = 0
+
+    def _is_next(self, ticket, background):
+        """Whether ticket is first in line (interactive requests go before background work)"""
+        if background:
+            return not self._queue and self._background[0] is ticket
+        return self._queue[0] is ticket
+
+    def acquire(self, on_wait=None, timeout=QUEUE_TIMEOUT, poll_interval=0.5, background=False):
+        """
+        Wait for a slot.
+
+        Args:
+            on_wait (callable): Called with the 1-based queue position while
+                waiting (e.g. to update the UI). Never called under the lock.
+            timeout (float): Give up after this many seconds (None = wait indefinitely).
+            background (bool): Queue behind interactive requests, without the
+                queue length limit and timeout.
+
+        Raises:
+            AdmissionRejected: If the queue is full or the timeout expires.
+        """
+        ticket = object()
+        line = self._background if background else self._queue
+        deadline = None if background or timeout is None else time.monotonic() + timeout
+
+        with self._cond:
+            # Interactive callers may pass waiting background work; nobody passes an interactive waiter
+            if self._active < self.max_concurrent and not self._queue and not (background and self._background):
+                self._active += 1
+                self.admitted_total += 1
+                return
+            if not background and len(self._queue) >= self.max_queue:
+                self.rejected_total += 1
+                raise AdmissionRejected("The analysis queue is full. Please try again in a minute.")
+            line.append(ticket)
+
+        last_position = None
+        try:
+            while True:
+                with self._cond:
+                    if self._is_next(ticket, background) and self._active < self.max_concurrent:
+                        line.popleft()
+                        self._active += 1
+                        self.admitted_total += 1
+                        self._cond.notify_all()
+                        return
+
+                    if deadline is not None and time.monotonic() >= deadline:
+                        self.rejected_total += 1
+                        raise AdmissionRejected("Timed out waiting in the analysis queue. Please try again.")
+
+                    position = line.index(ticket) + 1 + (len(self._queue) if background else 0)
+                    if position == last_position:
+                        self._cond.wait(poll_interval)
+                        continue
+
+                last_position = position
+                if on_wait is not None:
+                    on_wait(position)
+        except BaseException:
+            # Timeout, a failing on_wait (Streamlit stops the script by raising in it) or an
+            # interrupt: leave the line, or the dead ticket would block everyone behind it
+            with self._cond:
+                if ticket in line:
+                    line.remove(ticket)
+                self._cond.notify_all()
+            raise
+
+    def release(self):
+        """Give a slot back and wake the next caller in line"""
+        with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+    def stats(self):
+        """Current load: active inferences, queue lengths and totals"""
+        with self._cond:
+            return {
+                'active': self._active,
+                'queued': len(self._queue),
+                'background_queued': len(self._background),
+                'max_concurrent': self.max_concurrent,
+                'admitted_total': self.admitted_total,
+                'rejected_total': self.rejected_total
+            }
+
+
+_controller = AdmissionController()
+
+
+def get_controller():
+    """Get the process-wide admission controller"""
+    return _controller
+
+
+@contextmanager
+def admitted(on_wait=None, background=False):
+    """Hold an inference slot for the duration of the with-block (see AdmissionController.acquire)"""
+    _controller.acquire(on_wait=on_wait, background=background)
+    try:
+        yield
+    finally:
+        _controller.release()
+
+
+def configure_torch_threads(num_threads=TORCH_THREADS):
+    """Limit torch intra-op threads so concurrent inferences don't oversubscribe the cores"""
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+    except ImportError:
+        pass
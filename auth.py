@@ -6,6 +6,17 @@ from database import (
     insert_placement_officer, fetch_placement_officer
 )
 
+# Options offered at signup (roster imports are validated against the same lists)
+STUDENT_YEARS = ["1st Year", "2nd Year", "3rd Year", "4th Year"]
+STUDENT_BRANCHES = [
+    "Computer Science & Engineering",
+    "Electronics & Communication Engineering",
+    "Electrical & Electronics Engineering",
+    "Mechanical Engineering",
+    "Civil Engineering"
+]
+
+
 
 def hash_password(password):
     """Hash password using bcrypt for security"""
@@ -33,22 +44,9 @@ def student_signup():
         password = st.text_input("Password*", type="password", placeholder="Min 6 characters")
         confirm_password = st.text_input("Confirm Password*", type="password")
         
-        year = st.selectbox("Year of Study*", [
-            "Select Year",
-            "1st Year", 
-            "2nd Year", 
-            "3rd Year", 
-            "4th Year"
-        ])
+        year = st.selectbox("Year of Study*", ["Select Year"] + STUDENT_YEARS)
         
-        branch = st.selectbox("Branch*", [
-            "Select Branch",
-            "Computer Science & Engineering",
-            "Electronics & Communication Engineering",
-            "Electrical & Electronics Engineering",
-            "Mechanical Engineering",
-            "Civil Engineering"
-        ])
+        branch = st.selectbox("Branch*", ["Select Branch"] + STUDENT_BRANCHES)
         
         submit = st.form_submit_button("Sign Up as Student", use_container_width=True)
         
@@ -0,0 +1,79 @@
+# auto_scorer.py
+from admission import admitted
+from metrics import trace
+from candidate_search import index_resume_text
+from database import (
+    build_analysis_row, save_analysis_results_bulk, get_student_by_email, get_analyzed_roles_for_version
+)
+from embedding_index import index_resume
+from job_queue import run_in_background
+from resume_cache import get_resume_features, get_resume_chunks
+from write_behind import get_write_queue
+
+
+@trace("auto_score")
+def auto_score_resume(student_email, resume, skip_roles=()):
+    """
+    Score one resume version against every role in COMPANY_JOB_SKILLS and
+    bulk-write the results to analysis_history.
+
+    Args:
+        student_email (str): The student's email.
+        resume (dict): The saved student_resumes row.
+        skip_roles (iterable): (company, job_role) pairs already analyzed for this version.
+
+    Returns:
+        int: Number of analyses written.
+    """
+    from matcher import get_all_roles, score_resume_against_roles
+
+    try:
+        skip_roles = set(skip_roles)
+        roles = [role for role in get_all_roles() if role not in skip_roles]
+
+        # Background work: yields to interactive requests and never times out
+        with admitted(background=True):
+            processed_text, resume_embedding = get_resume_features(resume)
+            results = score_resume_against_roles(processed_text, resume_embedding, roles,
+                                                 chunk_embeddings=get_resume_chunks(resume))
+
+        rows = [
+            build_analysis_row(
+                student_email=student_email,
+                company_name=result['company'],
+                job_role=result['job_role'],
+                resume_version=resume['version_number'],
+                resume_filename=resume['resume_filename'],
+                ats_score=result['ats_score'],
+                semantic_score=result['semantic_score'],
+                combined_score=result['combined_score'],
+                matched_skills=result['matched_skills'],
+                missing_skills=result['missing_skills'],
+                feedback=str(result['feedback']),
+                source='auto'
+            )
+            for result in results
+        ]
+
+        # The student may have analyzed some roles while this job was scoring -
+        # don't write a second row for those
+        done = (get_analyzed_roles_for_version(student_email, resume['version_number'])
+                | get_write_queue().pending_roles(student_email, resume['version_number']))
+        rows = [row for row in rows if (row['company_name'], row['job_role']) not in done]
+
+        saved = save_analysis_results_bulk(rows) if rows else []
+
+        # Keep the nearest-student and keyword search indexes on the current version
+        student = get_student_by_email(student_email)
+        index_resume(student_email, resume, resume_embedding, student)
+        index_resume_text(student_email, resume, processed_text, student)
+
+        return len(saved) if saved else 0
+    except Exception as e:
+        print(f"Error auto-scoring resume for {student_email}: {e}")
+        return 0
+
+
+def schedule_auto_scoring(student_email, resume, skip_roles=()):
+    """Auto-score a newly saved resume version in the background"""
+    return run_in_background(auto_score_resume, student_email, resume, skip_roles)
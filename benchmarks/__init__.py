@@ -0,0 +1,9 @@
+# benchmarks/__init__.py
+"""
+Reproducible performance benchmarks.
+
+    python -m benchmarks.run --docs 500 --output bench.json
+    python -m benchmarks.run --docs 500 --compare bench.json
+    python -m benchmarks.corpus --docs 100 --out-dir synthetic_resumes
+    python -m benchmarks.load_test --students 500 --levels 1,2,4,8,16 --db-latency-ms 40
+"""
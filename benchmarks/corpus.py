@@ -0,0 +1,140 @@
+# benchmarks/corpus.py
+"""Deterministic synthetic resume corpus (text and PDF) built from the skills database"""
+import argparse
+import os
+import random
+from company_database import COMPANY_JOB_SKILLS
+
+FIRST_NAMES = ["Aarav", "Diya", "Rohan", "Ananya", "Vikram", "Meera", "Arjun", "Kavya", "Ishaan", "Priya",
+               "Kabir", "Sneha", "Aditya", "Pooja", "Rahul", "Nisha", "Karan", "Riya", "Siddharth", "Tanvi"]
+LAST_NAMES = ["Sharma", "Iyer", "Patel", "Reddy", "Nair", "Gupta", "Menon", "Rao", "Singh", "Kulkarni"]
+BRANCHES = ["Computer Science", "Information Technology", "Electronics", "Mechanical", "Electrical", "Civil"]
+EXPERIENCE_TEMPLATES = [
+    "Built a {a} pipeline using {b} that reduced processing time by {n}%.",
+    "Worked on {a} and {b} for a team of {n} engineers during an internship.",
+    "Led a college project applying {a} to a real-world {b} problem.",
+    "Developed and tested {a} modules integrated with {b}, serving {n}00 users.",
+    "Presented a seminar on {a} and its use in {b}.",
+    "Automated {a} reports with {b}, saving {n} hours a week."
+]
+FILLER = ("Motivated graduate with strong fundamentals, good communication skills and a passion for learning "
+          "new technologies. Comfortable working in teams and delivering projects on time.")
+
+ROLES = [(company, role) for company, roles in COMPANY_JOB_SKILLS.items() for role in roles]
+VOCABULARY = sorted({skill for roles in COMPANY_JOB_SKILLS.values() for skills in roles.values() for skill in skills})
+
+
+def generate_resume_text(index, seed=0):
+    """
+    Generate one synthetic resume.
+
+    Each document depends only on (seed, index), so a 100-document corpus is
+    the prefix of the 10,000-document corpus with the same seed.
+
+    Returns:
+        tuple: (resume text, (company, job_role) it was written towards)
+    """
+    rng = random.Random(seed * 1_000_003 + index)
+    company, role = rng.choice(ROLES)
+    role_skills = COMPANY_JOB_SKILLS[company][role]
+
+    # Mostly the target role's skills plus some unrelated ones, like a real resume
+    known = rng.sample(role_skills, k=rng.randint(max(1, len(role_skills) // 3), len(role_skills)))
+    known += rng.sample(VOCABULARY, k=rng.randint(2, 8))
+    known = list(dict.fromkeys(known))
+
+    lines = [
+        f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+        f"B.Tech {rng.choice(BRANCHES)}, Class of {rng.randint(2024, 2028)}, CGPA {rng.uniform(6.0, 9.8):.2f}",
+        "",
+        "SUMMARY",
+        f"Aspiring {role} interested in {', '.join(rng.sample(known, k=min(3, len(known))))}. {FILLER}",
+        "",
+        "SKILLS",
+        ", ".join(known),
+        "",
+        "EXPERIENCE AND PROJECTS"
+    ]
+    for _ in range(rng.randint(3, 12)):
+        lines.append("- " + rng.choice(EXPERIENCE_TEMPLATES).format(
+            a=rng.choice(known), b=rng.choice(known), n=rng.randint(2, 60)))
+    lines += ["", "ACTIVITIES", FILLER]
+
+    return "\n".join(lines), (company, role)
+
+
+def generate_corpus(num_docs, seed=0):
+    """Generate num_docs synthetic resumes: list of (text, (company, job_role))"""
+    return [generate_resume_text(i, seed) for i in range(num_docs)]
+
+
+def _pdf_escape(line):
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)").encode("latin-1", "replace")
+
+
+def text_to_pdf(text, lines_per_page=60, chars_per_line=95):
+    """
+    Render plain text as a minimal PDF (Helvetica, one text object per page).
+
+    Written by hand so benchmarks need no PDF library beyond the PyPDF2 reader
+    the app already uses.
+
+    Returns:
+        bytes: The PDF file.
+    """
+    lines = []
+    for line in text.splitlines():
+        while len(line) > chars_per_line:
+            lines.append(line[:chars_per_line])
+            line = line[chars_per_line:]
+        lines.append(line)
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+
+    # Objects: 1 catalog, 2 page tree, 3 font, then (page, contents) per page
+    objects = {1: b"<< /Type /Catalog /Pages 2 0 R >>", 3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"}
+    page_ids = []
+    for p, page_lines in enumerate(pages):
+        page_id, content_id = 4 + 2 * p, 5 + 2 * p
+        page_ids.append(page_id)
+        stream = b"BT /F1 10 Tf 12 TL 50 770 Td " + b"".join(b"(" + _pdf_escape(l) + b") Tj T* " for l in page_lines) + b"ET"
+        objects[content_id] = b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        objects[page_id] = (b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id)
+    objects[2] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % i for i in page_ids), len(page_ids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for obj_id in sorted(objects):
+        offsets[obj_id] = len(out)
+        out += b"%d 0 obj\n%s\nendobj\n" % (obj_id, objects[obj_id])
+
+    xref_at = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for obj_id in sorted(objects):
+        out += b"%010d 00000 n \n" % offsets[obj_id]
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_at)
+    return bytes(out)
+
+
+def write_pdf_corpus(out_dir, num_docs, seed=0):
+    """Write num_docs synthetic resume PDFs to out_dir; returns the file paths"""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for i in range(num_docs):
+        text, _ = generate_resume_text(i, seed)
+        path = os.path.join(out_dir, f"resume_{i:05d}.pdf")
+        with open(path, "wb") as f:
+            f.write(text_to_pdf(text))
+        paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic resume PDF corpus.")
+    parser.add_argument("--docs", type=int, default=100, help="Number of resumes (1 - 10000)")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed")
+    parser.add_argument("--out-dir", default="synthetic_resumes", help="Directory to write the PDFs to")
+    args = parser.parse_args()
+
+    paths = write_pdf_corpus(args.out_dir, max(1, min(args.docs, 10000)), args.seed)
+    print(f"✓ Wrote {len(paths)} PDF(s) to {args.out_dir}")
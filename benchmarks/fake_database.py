@@ -0,0 +1,403 @@
+# benchmarks/fake_database.py
+"""
+In-process stand-in for database.py, for load tests.
+
+Implements the same functions on in-memory tables, with an injectable
+per-call latency that simulates the Supabase round trip. Call install()
+before importing any app module so `from database import ...` resolves here.
+"""
+import itertools
+import random
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from metrics import instrument_module
+
+_lock = threading.Lock()
+_ids = itertools.count(1)
+_tables = {
+    'students': [],
+    'placement_officers': [],
+    'student_resumes': [],
+    'analysis_history': [],
+    'role_skill_versions': [],
+    'announcements': [],
+    'published_rankings': []
+}
+
+_latency = {'mean': 0.0, 'jitter': 0.0}
+_rng = random.Random(0)
+call_counts = {}
+
+
+def _round_trip(name):
+    with _lock:
+        call_counts[name] = call_counts.get(name, 0) + 1
+        delay = _rng.gauss(_latency['mean'], _latency['jitter']) if _latency['jitter'] else _latency['mean']
+    if delay > 0:
+        time.sleep(delay)
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _insert(table, row):
+    row = dict(row)
+    row.setdefault('id', next(_ids))
+    with _lock:
+        _tables[table].append(row)
+    return row
+
+
+def _select(table, **equals):
+    with _lock:
+        return [dict(r) for r in _tables[table] if all(r.get(k) == v for k, v in equals.items())]
+
+
+# ============ STUDENT FUNCTIONS ============
+
+def insert_student(email, name, password_hash, year, branch):
+    _round_trip('insert_student')
+    return [_insert('students', {'email': email, 'name': name, 'password': password_hash, 'year': year, 'branch': branch})]
+
+
+def insert_students_bulk(rows, chunk_size=500):
+    saved = []
+    for start in range(0, len(rows), chunk_size):
+        _round_trip('insert_students_bulk')
+        saved.extend(_insert('students', row) for row in rows[start:start + chunk_size])
+    return saved
+
+
+def fetch_student(email):
+    _round_trip('fetch_student')
+    rows = _select('students', email=email)
+    return rows[0] if rows else None
+
+
+def get_all_students():
+    _round_trip('get_all_students')
+    return _select('students')
+
+
+def get_student_by_email(email):
+    _round_trip('get_student_by_email')
+    rows = _select('students', email=email)
+    return rows[0] if rows else None
+
+
+def get_students_by_emails(emails, chunk_size=500):
+    wanted = set(emails)
+    for _ in range(max(1, -(-len(wanted) // chunk_size))):
+        _round_trip('get_students_by_emails')
+    with _lock:
+        return [dict(r) for r in _tables['students'] if r['email'] in wanted]
+
+
+# ============ PLACEMENT CELL FUNCTIONS ============
+
+def insert_placement_officer(email, name, password_hash):
+    _round_trip('insert_placement_officer')
+    return [_insert('placement_officers', {'email': email, 'name': name, 'password': password_hash})]
+
+
+def fetch_placement_officer(email):
+    _round_trip('fetch_placement_officer')
+    rows = _select('placement_officers', email=email)
+    return rows[0] if rows else None
+
+
+# ============ RESUME MANAGEMENT FUNCTIONS ============
+
+def save_student_resume(student_email, resume_text, filename, cache_fields=None):
+    _round_trip('save_student_resume')
+    with _lock:
+        versions = [r for r in _tables['student_resumes'] if r['student_email'] == student_email]
+        for r in versions:
+            r['is_current'] = False
+    row = {
+        'student_email': student_email,
+        'resume_text': resume_text,
+        'resume_filename': filename,
+        'version_number': max((r['version_number'] for r in versions), default=0) + 1,
+        'is_current': True
+    }
+    if cache_fields:
+        row.update(cache_fields)
+    return [_insert('student_resumes', row)]
+
+
+def get_current_resume(student_email):
+    _round_trip('get_current_resume')
+    rows = _select('student_resumes', student_email=student_email, is_current=True)
+    return rows[0] if rows else None
+
+
+def get_all_resume_versions(student_email):
+    _round_trip('get_all_resume_versions')
+    return sorted(_select('student_resumes', student_email=student_email), key=lambda r: -r['version_number'])
+
+
+def get_all_current_resumes(page_size=1000):
+    rows = sorted(_select('student_resumes', is_current=True), key=lambda r: r['id'])
+    # One round trip per page, like the real paginated query
+    for _ in range(max(1, -(-len(rows) // page_size))):
+        _round_trip('get_all_current_resumes')
+    return rows
+
+
+def update_resume_cache(resume_id, cache_fields):
+    _round_trip('update_resume_cache')
+    with _lock:
+        for r in _tables['student_resumes']:
+            if r['id'] == resume_id:
+                r.update(cache_fields)
+                return [dict(r)]
+    return []
+
+
+def get_resume_page(after_id=0, limit=100):
+    _round_trip('get_resume_page')
+    with _lock:
+        rows = sorted((dict(r) for r in _tables['student_resumes'] if r['id'] > after_id), key=lambda r: r['id'])
+    return rows[:limit]
+
+
+# ============ ANALYSIS HISTORY FUNCTIONS ============
+
+def build_analysis_row(student_email, company_name, job_role, resume_version, resume_filename,
+                       ats_score, semantic_score, combined_score, matched_skills, missing_skills, feedback,
+                       source='student'):
+    from skills_versioning import current_role_hash
+
+    return {
+        'student_email': student_email,
+        'company_name': company_name,
+        'job_role': job_role,
+        'resume_version': resume_version,
+        'resume_filename': resume_filename,
+        'ats_score': ats_score,
+        'semantic_score': semantic_score,
+        'combined_score': combined_score,
+        'matched_skills': matched_skills,
+        'missing_skills': missing_skills,
+        'feedback': feedback,
+        'source': source,
+        'skills_hash': current_role_hash(company_name, job_role),
+        'idempotency_key': uuid.uuid4().hex
+    }
+
+
+def save_analysis_result(student_email, company_name, job_role, resume_version, resume_filename,
+                         ats_score, semantic_score, combined_score, matched_skills, missing_skills, feedback):
+    _round_trip('save_analysis_result')
+    row = build_analysis_row(student_email, company_name, job_role, resume_version, resume_filename,
+                             ats_score, semantic_score, combined_score, matched_skills, missing_skills, feedback)
+    row.setdefault('analyzed_at', _now())
+    return [_insert('analysis_history', row)]
+
+
+def save_analysis_results_bulk(rows, chunk_size=500):
+    saved = []
+    for start in range(0, len(rows), chunk_size):
+        _round_trip('save_analysis_results_bulk')
+        with _lock:
+            stored_keys = {r.get('idempotency_key') for r in _tables['analysis_history']}
+        for row in rows[start:start + chunk_size]:
+            if row.get('idempotency_key') in stored_keys:
+                continue
+            row = dict(row)
+            row.setdefault('analyzed_at', _now())
+            saved.append(_insert('analysis_history', row))
+    return saved
+
+
+def _latest_first(rows):
+    return sorted(rows, key=lambda r: (r['analyzed_at'], r['id']), reverse=True)
+
+
+def get_analysis_for_resume_version(student_email, company_name, job_role, resume_version, skills_hash=None):
+    _round_trip('get_analysis_for_resume_version')
+    rows = _latest_first(_select('analysis_history', student_email=student_email, company_name=company_name,
+                                 job_role=job_role, resume_version=resume_version))
+    if skills_hash is not None:
+        rows = [r for r in rows if r.get('skills_hash') == skills_hash]
+    return rows[0] if rows else None
+
+
+def get_analyzed_roles_for_version(student_email, resume_version):
+    _round_trip('get_analyzed_roles_for_version')
+    return {(r['company_name'], r['job_role'])
+            for r in _select('analysis_history', student_email=student_email, resume_version=resume_version)}
+
+
+def get_student_analysis_history(student_email):
+    _round_trip('get_student_analysis_history')
+    return _latest_first(_select('analysis_history', student_email=student_email, source='student'))
+
+
+def get_company_specific_history(student_email, company_name):
+    _round_trip('get_company_specific_history')
+    return _latest_first(_select('analysis_history', student_email=student_email, company_name=company_name,
+                                 source='student'))
+
+
+def get_latest_analysis_for_company(student_email, company_name):
+    rows = get_company_specific_history(student_email, company_name)
+    return rows[0] if rows else None
+
+
+def get_all_student_analyses(company_name, job_role):
+    _round_trip('get_all_student_analyses')
+    seen, latest = set(), []
+    for row in _latest_first(_select('analysis_history', company_name=company_name, job_role=job_role)):
+        if row['student_email'] not in seen:
+            seen.add(row['student_email'])
+            latest.append(row)
+    return sorted(latest, key=lambda r: r['combined_score'], reverse=True)
+
+
+def get_latest_analyses(company_name=None, job_role=None, page_size=1000):
+    equals = {k: v for k, v in (('company_name', company_name), ('job_role', job_role)) if v}
+    rows = _latest_first(_select('analysis_history', **equals))
+    for _ in range(max(1, -(-len(rows) // page_size))):
+        _round_trip('get_latest_analyses')
+    seen, latest = set(), []
+    for row in rows:
+        key = (row['student_email'], row['company_name'], row['job_role'])
+        if key not in seen:
+            seen.add(key)
+            latest.append(row)
+    return latest
+
+
+def get_ranking_index(company_name, job_role, page_size=1000):
+    rows = _latest_first(_select('analysis_history', company_name=company_name, job_role=job_role))
+    for _ in range(max(1, -(-len(rows) // page_size))):
+        _round_trip('get_ranking_index')
+    seen, latest = set(), []
+    for row in rows:
+        if row['student_email'] not in seen:
+            seen.add(row['student_email'])
+            latest.append({k: row[k] for k in ('id', 'student_email', 'ats_score', 'semantic_score',
+                                               'combined_score', 'analyzed_at')})
+    return latest
+
+
+def get_analyses_by_ids(ids):
+    _round_trip('get_analyses_by_ids')
+    wanted = set(ids)
+    with _lock:
+        return [dict(r) for r in _tables['analysis_history'] if r['id'] in wanted]
+
+
+# ============ SKILLS DATABASE VERSION FUNCTIONS ============
+
+def get_role_skill_versions():
+    _round_trip('get_role_skill_versions')
+    return _select('role_skill_versions')
+
+
+def upsert_role_skill_versions(rows):
+    _round_trip('upsert_role_skill_versions')
+    with _lock:
+        table = _tables['role_skill_versions']
+        table[:] = [r for r in table if (r['company_name'], r['job_role']) not in
+                    {(row['company_name'], row['job_role']) for row in rows}]
+        table.extend(dict(row) for row in rows)
+    return rows
+
+
+def delete_role_skill_version(company_name, job_role):
+    _round_trip('delete_role_skill_version')
+    with _lock:
+        table = _tables['role_skill_versions']
+        table[:] = [r for r in table if (r['company_name'], r['job_role']) != (company_name, job_role)]
+    return []
+
+
+# ============ ANNOUNCEMENT AND RANKING FUNCTIONS ============
+
+def create_announcement(title, message, posted_by_email, posted_by_name):
+    _round_trip('create_announcement')
+    return [_insert('announcements', {'title': title, 'message': message, 'posted_by_email': posted_by_email,
+                                      'posted_by_name': posted_by_name, 'is_active': True, 'created_at': _now()})]
+
+
+def get_active_announcements():
+    _round_trip('get_active_announcements')
+    return _select('announcements', is_active=True)[::-1]
+
+
+def get_all_announcements():
+    _round_trip('get_all_announcements')
+    return _select('announcements')[::-1]
+
+
+def delete_announcement(announcement_id):
+    _round_trip('delete_announcement')
+    with _lock:
+        _tables['announcements'][:] = [r for r in _tables['announcements'] if r['id'] != announcement_id]
+    return []
+
+
+def toggle_announcement_status(announcement_id, is_active):
+    _round_trip('toggle_announcement_status')
+    with _lock:
+        for r in _tables['announcements']:
+            if r['id'] == announcement_id:
+                r['is_active'] = is_active
+    return []
+
+
+def publish_ranking(title, company_name, job_role, description, rankings, published_by_email, published_by_name, weights=None):
+    _round_trip('publish_ranking')
+    return [_insert('published_rankings', {
+        'title': title, 'company_name': company_name, 'job_role': job_role, 'description': description,
+        'rankings': rankings, 'published_by_email': published_by_email, 'published_by_name': published_by_name,
+        'weights': weights, 'is_active': True, 'created_at': _now()
+    })]
+
+
+def get_active_rankings():
+    _round_trip('get_active_rankings')
+    return _select('published_rankings', is_active=True)[::-1]
+
+
+def get_all_rankings():
+    _round_trip('get_all_rankings')
+    return _select('published_rankings')[::-1]
+
+
+def delete_ranking(ranking_id):
+    _round_trip('delete_ranking')
+    with _lock:
+        _tables['published_rankings'][:] = [r for r in _tables['published_rankings'] if r['id'] != ranking_id]
+    return []
+
+
+# Same "db.<name>" timings as the real module, for every function that makes a round trip
+instrument_module(sys.modules[__name__], "db", uses="_round_trip")
+
+
+def set_latency(mean_ms=0.0, jitter_ms=0.0):
+    """Simulated round-trip time of every call (normal distribution, clipped at 0)"""
+    _latency['mean'] = mean_ms / 1000
+    _latency['jitter'] = jitter_ms / 1000
+
+
+def reset(tables=None):
+    """Empty the given tables (default: every table, and the call counts)"""
+    with _lock:
+        for name in tables or _tables:
+            _tables[name].clear()
+        if tables is None:
+            call_counts.clear()
+
+
+def install():
+    """Make `import database` resolve to this module (call before importing app modules)"""
+    sys.modules['database'] = sys.modules[__name__]
@@ -0,0 +1,245 @@
+# benchmarks/load_test.py
+"""
+Concurrent-user load test against an in-process fake of database.py.
+
+Simulated students click "Analyze Resume" and simulated officers rank a
+company from current resumes, at increasing concurrency levels. Reports
+throughput, latency percentiles, admission-queue depth and CPU use per
+level, and the concurrency at which throughput stops growing.
+
+    python -m benchmarks.load_test --students 500 --levels 1,2,4,8,16 --duration 20 --db-latency-ms 40
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+import numpy as np
+from benchmarks import fake_database
+
+# Must happen before any app module does `from database import ...`
+fake_database.install()
+
+from admission import AdmissionRejected, get_controller  # noqa: E402
+from benchmarks.corpus import BRANCHES, generate_resume_text  # noqa: E402
+from company_database import COMPANY_JOB_SKILLS  # noqa: E402
+from metrics import trace  # noqa: E402
+
+
+def seed_students(num_students, seed=0, warm_cache=True):
+    """
+    Fill the fake database with students and one current resume each.
+
+    Args:
+        warm_cache (bool): Precompute processed text/embeddings as uploads
+            do; otherwise the first analysis of each resume encodes it.
+    """
+    fake_database.reset()
+    for i in range(num_students):
+        email = f"student{i:05d}@example.edu"
+        text, _ = generate_resume_text(i, seed)
+        fake_database.insert_student(email, text.splitlines()[0], "x", 2024 + i % 4, BRANCHES[i % len(BRANCHES)])
+        fake_database.save_student_resume(email, text, f"resume_{i:05d}.pdf")
+
+    if warm_cache:
+        from resume_cache import get_cohort_features
+        get_cohort_features(fake_database.get_all_current_resumes())
+
+
+def student_analysis(rng, num_students):
+    """One "Analyze Resume" click: load the current resume, analyze for a random role, load history"""
+    from single_flight import analyze_resume_once
+
+    email = f"student{rng.randrange(num_students):05d}@example.edu"
+    company = rng.choice(list(COMPANY_JOB_SKILLS))
+    role = rng.choice(list(COMPANY_JOB_SKILLS[company]))
+
+    with trace("load_test_analyze"):
+        resume = fake_database.get_current_resume(email)
+        fake_database.get_company_specific_history(email, company)
+        analyze_resume_once(email, resume, company, role)
+
+
+def officer_ranking(rng, num_students):
+    """One "Rank from Current Resumes" click for a random company"""
+    from cohort_ranking import rank_company_from_current_resumes
+
+    with trace("load_test_rank"):
+        rank_company_from_current_resumes(rng.choice(list(COMPANY_JOB_SKILLS)))
+
+
+FLOWS = {'student_analysis': student_analysis, 'officer_ranking': officer_ranking}
+
+
+def _percentiles(latencies):
+    if not latencies:
+        return {'p50_ms': None, 'p95_ms': None, 'p99_ms': None}
+    values = np.asarray(latencies) * 1000
+    return {f'p{q}_ms': round(float(np.percentile(values, q)), 1) for q in (50, 95, 99)}
+
+
+def run_level(concurrency, duration, num_students, officer_fraction, seed=0):
+    """
+    Run `concurrency` simulated users in closed loop for `duration` seconds.
+
+    Every level starts from the same state: analyses saved and cached by
+    earlier levels are discarded, so their hit ratios don't inflate this one.
+
+    Returns:
+        dict: Per-flow throughput/latency/errors plus queue depth, CPU use
+              and the analysis cache hit ratio.
+    """
+    from single_flight import get_analysis_flight
+    from write_behind import get_write_queue
+
+    get_write_queue().flush()
+    fake_database.reset(['analysis_history'])
+    flight = get_analysis_flight()
+    flight.reset()
+
+    samples = {name: {'latencies': [], 'errors': 0, 'rejected': 0, 'last_error': None} for name in FLOWS}
+    samples_lock = threading.Lock()
+    deadline = time.monotonic() + duration
+    stop_monitor = threading.Event()
+    queue_depths, active_counts = [], []
+
+    def user(user_id):
+        rng = random.Random(seed * 7919 + user_id)
+        while time.monotonic() < deadline:
+            name = 'officer_ranking' if rng.random() < officer_fraction else 'student_analysis'
+            start = time.perf_counter()
+            outcome, error = None, None
+            try:
+                FLOWS[name](rng, num_students)
+            except AdmissionRejected:
+                outcome = 'rejected'
+            except Exception as e:
+                outcome, error = 'errors', f"{type(e).__name__}: {e}"
+            elapsed = time.perf_counter() - start
+            with samples_lock:
+                if outcome:
+                    samples[name][outcome] += 1
+                    samples[name]['last_error'] = error or samples[name]['last_error']
+                else:
+                    samples[name]['latencies'].append(elapsed)
+
+    def monitor():
+        while not stop_monitor.wait(0.1):
+            stats = get_controller().stats()
+            queue_depths.append(stats['queued'])
+            active_counts.append(stats['active'])
+
+    monitor_thread = threading.Thread(target=monitor, daemon=True)
+    monitor_thread.start()
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+
+    users = [threading.Thread(target=user, args=(i,), name=f"load-user-{i}") for i in range(concurrency)]
+    for t in users:
+        t.start()
+    for t in users:
+        t.join()
+
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    stop_monitor.set()
+    monitor_thread.join()
+
+    result = {'concurrency': concurrency, 'seconds': round(wall, 2), 'flows': {}}
+    completed = 0
+    for name, data in samples.items():
+        count = len(data['latencies'])
+        completed += count
+        result['flows'][name] = {
+            'completed': count,
+            'throughput_per_sec': round(count / wall, 2),
+            'errors': data['errors'],
+            'rejected': data['rejected'],
+            'last_error': data['last_error'],
+            **_percentiles(data['latencies'])
+        }
+    all_latencies = [lat for data in samples.values() for lat in data['latencies']]
+    result.update({
+        'throughput_per_sec': round(completed / wall, 2),
+        **_percentiles(all_latencies),
+        'max_queue_depth': max(queue_depths, default=0),
+        'mean_active_inferences': round(float(np.mean(active_counts)), 2) if active_counts else 0.0,
+        'cpu_utilization': round(cpu / wall / (os.cpu_count() or 1), 3)
+    })
+    cache = flight.stats()
+    lookups = cache['hits'] + cache['shared'] + cache['misses']
+    result['analysis_cache'] = {**cache, 'hit_ratio': round((cache['hits'] + cache['shared']) / lookups, 3) if lookups else None}
+    return result
+
+
+def find_saturation(levels, threshold=0.95):
+    """Smallest concurrency reaching `threshold` of the peak throughput - more users only add latency"""
+    if not levels:
+        return None
+    peak = max(level['throughput_per_sec'] for level in levels)
+    for level in levels:
+        if level['throughput_per_sec'] >= threshold * peak:
+            return level['concurrency']
+    return None
+
+
+def run_load_test(num_students=200, levels=(1, 2, 4, 8, 16), duration=15.0, db_latency_ms=30.0,
+                  db_jitter_ms=10.0, officer_fraction=0.02, warm_cache=True, seed=0):
+    """Seed the fake database, then run every concurrency level; returns the JSON report"""
+    import matcher
+
+    print(f"Seeding {num_students} students...")
+    seed_students(num_students, seed, warm_cache)
+    fake_database.set_latency(db_latency_ms, db_jitter_ms)
+
+    report = {
+        'settings': {
+            'students': num_students, 'levels': list(levels), 'duration': duration,
+            'db_latency_ms': db_latency_ms, 'db_jitter_ms': db_jitter_ms,
+            'officer_fraction': officer_fraction, 'warm_cache': warm_cache,
+            'max_concurrent_inferences': get_controller().max_concurrent,
+            'model': matcher.EMBEDDING_VERSION, 'cpu_count': os.cpu_count()
+        },
+        'levels': []
+    }
+    for concurrency in levels:
+        print(f"Running {concurrency} concurrent user(s) for {duration:.0f}s...")
+        level = run_level(concurrency, duration, num_students, officer_fraction, seed)
+        report['levels'].append(level)
+        print(f"  {level['throughput_per_sec']} req/s, p50 {level['p50_ms']} ms, p95 {level['p95_ms']} ms, "
+              f"queue {level['max_queue_depth']}, CPU {level['cpu_utilization']:.0%}, "
+              f"cache hits {level['analysis_cache']['hit_ratio']}")
+
+    report['saturation_concurrency'] = find_saturation(report['levels'])
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the analysis and ranking flows with a fake database.")
+    parser.add_argument("--students", type=int, default=200, help="Simulated students in the fake database")
+    parser.add_argument("--levels", default="1,2,4,8,16", help="Comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds per level")
+    parser.add_argument("--db-latency-ms", type=float, default=30.0, help="Mean simulated database round trip")
+    parser.add_argument("--db-jitter-ms", type=float, default=10.0, help="Standard deviation of the round trip")
+    parser.add_argument("--officer-fraction", type=float, default=0.02, help="Share of requests that are officer rankings")
+    parser.add_argument("--cold", action="store_true", help="Don't precompute resume embeddings before the test")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus and user seed")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.levels.split(",") if level.strip()]
+    report = run_load_test(args.students, levels, args.duration, args.db_latency_ms, args.db_jitter_ms,
+                           args.officer_fraction, not args.cold, args.seed)
+
+    print(f"\n{'users':>6} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queue':>6} {'CPU':>5} {'rejected':>9}")
+    for level in report['levels']:
+        rejected = sum(flow['rejected'] for flow in level['flows'].values())
+        print(f"{level['concurrency']:>6} {level['throughput_per_sec']:>8} {str(level['p50_ms']):>8} "
+              f"{str(level['p95_ms']):>8} {str(level['p99_ms']):>8} {level['max_queue_depth']:>6} "
+              f"{level['cpu_utilization']:>5.0%} {rejected:>9}")
+    print(f"\nThroughput saturates at ~{report['saturation_concurrency']} concurrent user(s).")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✓ Report written to {args.output}")
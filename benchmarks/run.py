@@ -0,0 +1,204 @@
+# benchmarks/run.py
+"""
+Time each stage of the analysis pipeline on a synthetic corpus.
+
+Reports throughput, p50/p95 latency and memory per stage as JSON so runs
+can be compared over time (--compare).
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+import numpy as np
+from benchmarks.corpus import generate_corpus, text_to_pdf
+from company_database import COMPANY_JOB_SKILLS
+
+STAGES = ['extract', 'preprocess', 'encode', 'encode_batch', 'ats', 'end_to_end']
+
+
+def peak_rss_mb():
+    """
+    Peak resident set size of this process so far (MB).
+
+    This is a process-wide high-water mark (ru_maxrss): it never goes down,
+    so on its own it can't tell which stage used the memory.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def summarize(latencies, total_seconds=None, peak_before=None):
+    """
+    Throughput and latency percentiles for one stage (latencies in seconds).
+
+    peak_before is peak_rss_mb() taken when the stage started; the stage's
+    peak_rss_growth_mb is how far it pushed the process high-water mark.
+    """
+    latencies = np.asarray(latencies, dtype=np.float64)
+    peak = peak_rss_mb()
+    total = float(latencies.sum()) if total_seconds is None else total_seconds
+    return {
+        'count': int(len(latencies)),
+        'total_seconds': round(total, 4),
+        'throughput_per_sec': round(len(latencies) / total, 2) if total > 0 else None,
+        'mean_ms': round(float(latencies.mean()) * 1000, 3),
+        'p50_ms': round(float(np.percentile(latencies, 50)) * 1000, 3),
+        'p95_ms': round(float(np.percentile(latencies, 95)) * 1000, 3),
+        'max_ms': round(float(latencies.max()) * 1000, 3),
+        'process_peak_rss_mb': peak,
+        'peak_rss_growth_mb': round(peak - peak_before, 1) if peak_before is not None else None
+    }
+
+
+def _time_each(fn, items):
+    """Call fn on every item; returns (results, per-item latencies)"""
+    results, latencies = [], []
+    for item in items:
+        start = time.perf_counter()
+        results.append(fn(item))
+        latencies.append(time.perf_counter() - start)
+    return results, latencies
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_benchmarks(num_docs, seed=0, stages=STAGES, warmup=3):
+    """
+    Run the selected stages on num_docs synthetic resumes.
+
+    Each stage gets the previous stage's output (PDF bytes -> raw text ->
+    processed text -> embeddings), so stages are timed in isolation.
+
+    Returns:
+        dict: 'meta' (run settings and environment) and 'stages' (one summary per stage).
+    """
+    corpus = generate_corpus(num_docs, seed)
+    texts = [text for text, _ in corpus]
+    targets = [target for _, target in corpus]
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'docs': num_docs,
+            'seed': seed,
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count()
+        },
+        'stages': {}
+    }
+
+    needs_model = any(stage in stages for stage in ('encode', 'encode_batch', 'ats', 'end_to_end'))
+    if needs_model:
+        start = time.perf_counter()
+        import matcher
+        report['meta']['model'] = matcher.EMBEDDING_VERSION
+        report['meta']['model_load_seconds'] = round(time.perf_counter() - start, 2)
+
+    from pdf_processor import extract_text_from_pdf
+    from text_preprocessor import preprocess_text
+
+    pdfs = [text_to_pdf(text) for text in texts]
+    if 'extract' in stages or 'end_to_end' in stages:
+        peak_before = peak_rss_mb()
+        extracted, latencies = _time_each(lambda pdf: extract_text_from_pdf(io.BytesIO(pdf)), pdfs)
+        if 'extract' in stages:
+            report['stages']['extract'] = summarize(latencies, peak_before=peak_before)
+        texts = extracted
+
+    peak_before = peak_rss_mb()
+    processed, latencies = _time_each(preprocess_text, texts)
+    if 'preprocess' in stages:
+        report['stages']['preprocess'] = summarize(latencies, peak_before=peak_before)
+
+    if needs_model:
+        for text in processed[:warmup]:
+            matcher.encode_resume(text)
+
+    if 'encode' in stages:
+        peak_before = peak_rss_mb()
+        _, latencies = _time_each(matcher.encode_resume, processed)
+        report['stages']['encode'] = summarize(latencies, peak_before=peak_before)
+
+    if 'encode_batch' in stages:
+        peak_before = peak_rss_mb()
+        start = time.perf_counter()
+        matcher.encode_resumes(processed)
+        elapsed = time.perf_counter() - start
+        # One batched call - per-document latency is the amortized share
+        report['stages']['encode_batch'] = summarize([elapsed / len(processed)] * len(processed), elapsed, peak_before)
+
+    if 'ats' in stages:
+        skills = [COMPANY_JOB_SKILLS[company][role] for company, role in targets]
+        peak_before = peak_rss_mb()
+        _, latencies = _time_each(lambda i: matcher.skill_presence([processed[i]], skills[i]), range(len(processed)))
+        report['stages']['ats'] = summarize(latencies, peak_before=peak_before)
+
+    if 'end_to_end' in stages:
+        def analyze(i):
+            text = extract_text_from_pdf(io.BytesIO(pdfs[i]))
+            company, role = targets[i]
+            return matcher.match_resume_to_job(preprocess_text(text), company, role)
+
+        peak_before = peak_rss_mb()
+        _, latencies = _time_each(analyze, range(len(pdfs)))
+        report['stages']['end_to_end'] = summarize(latencies, peak_before=peak_before)
+
+    report['meta']['process_peak_rss_mb'] = peak_rss_mb()
+    return report
+
+
+def compare_reports(baseline, current):
+    """Print throughput and latency changes of current vs baseline"""
+    print(f"\n{'stage':<13} {'metric':<19} {'baseline':>10} {'current':>10} {'change':>8}")
+    for stage, stats in current['stages'].items():
+        old = baseline.get('stages', {}).get(stage)
+        if not old:
+            continue
+        for metric in ('throughput_per_sec', 'p50_ms', 'p95_ms', 'peak_rss_growth_mb'):
+            before, after = old.get(metric), stats.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before * 100
+            print(f"{stage:<13} {metric:<19} {before:>10} {after:>10} {change:>+7.1f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the resume analysis pipeline on a synthetic corpus.")
+    parser.add_argument("--docs", type=int, default=200, help="Number of synthetic resumes (1 - 10000)")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"Comma-separated stages (default: {','.join(STAGES)})")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed model calls before timing")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against")
+    args = parser.parse_args()
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"Unknown stage(s): {', '.join(sorted(unknown))}")
+
+    report = run_benchmarks(max(1, min(args.docs, 10000)), args.seed, stages, args.warmup)
+    print(json.dumps(report, indent=2))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✓ Report written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare_reports(json.load(f), report)
@@ -0,0 +1,248 @@
+# candidate_search.py
+import math
+import os
+import threading
+from collections import Counter
+import numpy as np
+from embedding_index import get_index, student_meta
+from metrics import timed
+
+# Candidates taken from each ranker before fusion
+SEARCH_DEPTH = int(os.getenv("CANDIDATE_SEARCH_DEPTH", "100"))
+# Reciprocal-rank fusion constant: larger values flatten the bonus of top ranks
+RRF_K = int(os.getenv("CANDIDATE_SEARCH_RRF_K", "60"))
+
+
+class BM25Index:
+    """
+    In-memory BM25 inverted index over students' preprocessed current resumes.
+
+    Postings map each term to {row: term frequency}. Updating a student
+    replaces their postings in place; removals leave a tombstone row, like
+    EmbeddingIndex. Rows carry the same metadata (year, branch, ...) used
+    for filtering.
+    """
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._rows = []          # row -> {'key': ..., 'meta': {...}} or None (tombstone)
+        self._key_to_row = {}
+        self._postings = {}      # term -> {row: tf}
+        self._row_terms = []     # row -> terms with postings (to undo on update)
+        self._lengths = np.zeros(0, dtype=np.float32)
+        self._total_length = 0.0
+        self._filter_cache = {}
+
+    def __len__(self):
+        return len(self._key_to_row)
+
+    def _drop_postings(self, row):
+        for term in self._row_terms[row]:
+            postings = self._postings[term]
+            del postings[row]
+            if not postings:
+                del self._postings[term]
+        self._row_terms[row] = ()
+        self._total_length -= float(self._lengths[row])
+        self._lengths[row] = 0
+
+    def upsert(self, key, processed_text, meta=None):
+        """Add or replace one document (processed_text as produced by preprocess_text())"""
+        terms = Counter((processed_text or "").split())
+        with self._lock:
+            row = self._key_to_row.get(key)
+            if row is None:
+                row = len(self._rows)
+                self._rows.append(None)
+                self._row_terms.append(())
+                self._key_to_row[key] = row
+                if row >= len(self._lengths):
+                    self._lengths = np.concatenate([self._lengths, np.zeros(max(1024, len(self._lengths)), dtype=np.float32)])
+            else:
+                self._drop_postings(row)
+
+            for term, tf in terms.items():
+                self._postings.setdefault(term, {})[row] = tf
+            self._row_terms[row] = tuple(terms)
+            self._lengths[row] = sum(terms.values())
+            self._total_length += float(self._lengths[row])
+            self._rows[row] = {'key': key, 'meta': meta or {}}
+            self._filter_cache = {}
+
+    def remove(self, key):
+        """Tombstone a key"""
+        with self._lock:
+            row = self._key_to_row.pop(key, None)
+            if row is None:
+                return False
+            self._drop_postings(row)
+            self._rows[row] = None
+            self._filter_cache = {}
+            return True
+
+    def _filter_mask(self, filters):
+        """Boolean mask of live rows whose metadata matches every filter (value or list of values)"""
+        key = tuple(sorted((field, tuple(v) if isinstance(v, (list, tuple, set)) else (v,))
+                           for field, v in (filters or {}).items()))
+        if key not in self._filter_cache:
+            wanted = dict(key)
+            self._filter_cache[key] = np.array([
+                row is not None and all(row['meta'].get(field) in values for field, values in wanted.items())
+                for row in self._rows
+            ], dtype=bool)
+        return self._filter_cache[key]
+
+    def search(self, query_terms, k=10, filters=None):
+        """
+        BM25 top-k for already preprocessed query terms.
+
+        Returns:
+            list: (key, score, meta, matched terms) tuples, best first. Rows
+                  matching no query term are never returned.
+        """
+        with self._lock:
+            n = len(self._rows)
+            live = len(self._key_to_row)
+            if not live:
+                return []
+
+            avg_length = self._total_length / live or 1.0
+            norms = self.k1 * (1 - self.b + self.b * self._lengths[:n] / avg_length)
+            scores = np.zeros(n, dtype=np.float32)
+            terms = [term for term in dict.fromkeys(query_terms) if term in self._postings]
+
+            for term in terms:
+                postings = self._postings[term]
+                rows = np.fromiter(postings.keys(), dtype=np.int64, count=len(postings))
+                tfs = np.fromiter(postings.values(), dtype=np.float32, count=len(postings))
+                idf = math.log(1 + (live - len(postings) + 0.5) / (len(postings) + 0.5))
+                scores[rows] += idf * tfs * (self.k1 + 1) / (tfs + norms[rows])
+
+            scores[~self._filter_mask(filters)] = 0
+            k = min(k, int(np.count_nonzero(scores)))
+            if k <= 0:
+                return []
+
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind='stable')]
+            return [(self._rows[i]['key'], float(scores[i]), self._rows[i]['meta'],
+                     [term for term in terms if int(i) in self._postings[term]]) for i in top]
+
+
+_search_index = None
+_search_index_lock = threading.Lock()
+
+
+def _processed_text(resume):
+    """Stored processed_text when it is current, otherwise preprocess the raw text"""
+    from text_preprocessor import preprocess_text, PREPROCESS_VERSION
+
+    if resume.get('processed_text') is not None and resume.get('preprocess_version') == PREPROCESS_VERSION:
+        return resume['processed_text']
+    return preprocess_text(resume.get('resume_text') or "")
+
+
+def build_search_index():
+    """Build a BM25Index from every student's current resume"""
+    from database import get_all_current_resumes, get_all_students
+
+    students = {s['email']: s for s in get_all_students()}
+    index = BM25Index()
+    for resume in get_all_current_resumes():
+        email = resume['student_email']
+        index.upsert(email, _processed_text(resume), student_meta(students.get(email), resume))
+    return index
+
+
+def get_search_index(rebuild=False):
+    """Get the process-wide keyword index (built from the database on first use)"""
+    global _search_index
+    with _search_index_lock:
+        if _search_index is None or rebuild:
+            _search_index = build_search_index()
+        return _search_index
+
+
+def search_index_size():
+    """Number of indexed students, or None if the index hasn't been built yet"""
+    return len(_search_index) if _search_index is not None else None
+
+
+def index_resume_text(student_email, resume, processed_text, student=None):
+    """
+    Add or replace a student's current resume in the keyword index.
+
+    Does nothing until the index has been built - the first search loads
+    every current resume anyway.
+    """
+    if _search_index is None:
+        return
+    if student is None:
+        from database import get_student_by_email
+        student = get_student_by_email(student_email)
+    _search_index.upsert(student_email, processed_text, student_meta(student, resume))
+
+
+@timed("search")
+def search_candidates(query, k=20, filters=None, semantic=True, depth=SEARCH_DEPTH, rrf_k=RRF_K):
+    """
+    Hybrid keyword + semantic search over students' current resumes.
+
+    BM25 and embedding similarity each rank their top `depth` students; the
+    lists are merged with reciprocal-rank fusion (sum of 1 / (rrf_k + rank)).
+
+    Args:
+        query (str): Free text, e.g. "kubernetes aws" or a pasted job description.
+        k (int): Number of results.
+        filters (dict): Metadata filters, e.g. {'year': [...], 'branch': [...]}.
+        semantic (bool): Also rank by embedding similarity (loads the model).
+
+    Returns:
+        list: Result dicts (student_email, score, keyword_rank, keyword_score,
+              matched_terms, semantic_rank, similarity, year, branch), best first.
+
+    Raises:
+        AdmissionRejected: If the inference queue is full or the wait timed out
+            (semantic search only).
+    """
+    from text_preprocessor import preprocess_text
+
+    processed_query = preprocess_text(query)
+    if not processed_query:
+        return []
+
+    results = {}
+
+    def result_for(key, meta):
+        if key not in results:
+            results[key] = {
+                'student_email': key, 'score': 0.0,
+                'keyword_rank': None, 'keyword_score': None, 'matched_terms': [],
+                'semantic_rank': None, 'similarity': None,
+                'year': meta.get('year'), 'branch': meta.get('branch')
+            }
+        return results[key]
+
+    for rank, (key, score, meta, terms) in enumerate(get_search_index().search(processed_query.split(), depth, filters), 1):
+        result = result_for(key, meta)
+        result.update({'keyword_rank': rank, 'keyword_score': round(score, 3), 'matched_terms': terms})
+        result['score'] += 1 / (rrf_k + rank)
+
+    if semantic:
+        from admission import admitted
+        from matcher import encode_resume
+
+        # Resumes are embedded from preprocessed text, so embed the query the same way
+        with admitted():
+            query_vector = encode_resume(processed_query)
+        for rank, (key, similarity, meta) in enumerate(get_index().top_k(query_vector, k=depth, filters=filters), 1):
+            result = result_for(key, meta)
+            result.update({'semantic_rank': rank, 'similarity': round(similarity, 4)})
+            result['score'] += 1 / (rrf_k + rank)
+
+    ranked = sorted(results.values(), key=lambda r: -r['score'])[:k]
+    for result in ranked:
+        result['score'] = round(result['score'], 5)
+    return ranked
@@ -0,0 +1,177 @@
+# cohort_analytics.py
+import os
+import threading
+import time
+import numpy as np
+from database import get_all_students, get_latest_analyses
+
+# Rebuild the cached bitmap after this many seconds (officers can also force a refresh)
+ANALYTICS_TTL = float(os.getenv("COHORT_ANALYTICS_TTL", "300"))
+
+
+class SkillGapMatrix:
+    """
+    Students x skills bitmap of skill gaps, packed 8 skills per byte.
+
+    A student has a gap in a skill when it is missing from their latest
+    analysis for at least one role in scope and matched in none of them.
+    Every statistic is computed with array operations on the bitmap, so a
+    filter (mask) over thousands of students costs no Python loop.
+    """
+
+    def __init__(self, emails, skills, bits, years, branches, roles_analyzed):
+        self.emails = emails                  # row -> student email
+        self.skills = skills                  # column -> skill name
+        self.bits = bits                      # (students, ceil(skills / 8)) uint8, np.packbits of the gaps
+        self.years = years                    # (students,) str
+        self.branches = branches              # (students,) str
+        self.roles_analyzed = roles_analyzed  # (students,) number of analyses behind each row
+        self.built_at = time.time()
+
+    @property
+    def num_students(self):
+        return len(self.emails)
+
+    def mask(self, branches=None, years=None):
+        """Boolean row filter for the given branches / years (None = all)"""
+        keep = np.ones(self.num_students, dtype=bool)
+        if branches:
+            keep &= np.isin(self.branches, list(branches))
+        if years:
+            keep &= np.isin(self.years, [str(y) for y in years])
+        return keep
+
+    def dense(self, mask=None):
+        """Unpacked (students, skills) uint8 gap matrix, optionally for masked rows only"""
+        bits = self.bits if mask is None else self.bits[mask]
+        return np.unpackbits(bits, axis=1, count=len(self.skills))
+
+    def gap_counts(self, mask=None):
+        """Number of students with a gap in each skill"""
+        return self.dense(mask).sum(axis=0, dtype=np.int64)
+
+    def top_gaps(self, limit=20, mask=None):
+        """
+        Most common missing skills.
+
+        Returns:
+            list: {'skill', 'students', 'share'} dicts, most common first
+                  ('share' is the percentage of students in the filter).
+        """
+        counts = self.gap_counts(mask)
+        total = self.num_students if mask is None else int(mask.sum())
+        order = np.argsort(-counts, kind='stable')[:limit]
+        return [{
+            'skill': self.skills[j],
+            'students': int(counts[j]),
+            'share': round(float(counts[j]) / total * 100, 1) if total else 0.0
+        } for j in order if counts[j] > 0]
+
+    def co_occurrence(self, limit=15, mask=None):
+        """
+        How often the most common missing skills are missing together.
+
+        Returns:
+            tuple: (skill names, (k, k) int matrix where [a, b] counts students
+                    missing both a and b; the diagonal is each skill's gap count)
+        """
+        dense = self.dense(mask)
+        counts = dense.sum(axis=0, dtype=np.int64)
+        top = [j for j in np.argsort(-counts, kind='stable')[:limit] if counts[j] > 0]
+        subset = dense[:, top].astype(np.float32)
+        return [self.skills[j] for j in top], np.rint(subset.T @ subset).astype(np.int64)
+
+    def breakdown(self, by="branch", limit=10, mask=None):
+        """
+        Gap counts of the most common missing skills per branch or year.
+
+        Returns:
+            tuple: (group names, group sizes, skill names, (groups, skills) int matrix)
+        """
+        labels = self.branches if by == "branch" else self.years
+        if mask is not None:
+            labels = labels[mask]
+        dense = self.dense(mask)
+        groups, inverse = np.unique(labels, return_inverse=True)
+
+        # One-hot group membership times the gap matrix = per-group counts in one product
+        membership = np.zeros((len(groups), len(labels)), dtype=np.float32)
+        membership[inverse, np.arange(len(labels))] = 1
+        counts = np.rint(membership @ dense.astype(np.float32)).astype(np.int64)
+
+        top = np.argsort(-counts.sum(axis=0), kind='stable')[:limit]
+        return ([str(g) for g in groups], membership.sum(axis=1).astype(np.int64),
+                [self.skills[j] for j in top], counts[:, top])
+
+
+def build_gap_matrix(analyses, students):
+    """
+    Build a SkillGapMatrix from latest-analysis rows.
+
+    Args:
+        analyses (list): Rows from get_latest_analyses() (student_email,
+            matched_skills, missing_skills).
+        students (list): Rows from get_all_students() (email, year, branch).
+
+    Returns:
+        SkillGapMatrix
+    """
+    student_rows = {}
+    skill_columns = {}
+    missing_cells, matched_cells = [], []
+    roles_analyzed = []
+
+    for analysis in analyses:
+        row = student_rows.get(analysis['student_email'])
+        if row is None:
+            row = student_rows[analysis['student_email']] = len(student_rows)
+            roles_analyzed.append(0)
+        roles_analyzed[row] += 1
+        for skill in analysis.get('missing_skills') or []:
+            missing_cells.append((row, skill_columns.setdefault(skill, len(skill_columns))))
+        for skill in analysis.get('matched_skills') or []:
+            matched_cells.append((row, skill_columns.setdefault(skill, len(skill_columns))))
+
+    shape = (len(student_rows), len(skill_columns))
+    missing = np.zeros(shape, dtype=bool)
+    matched = np.zeros(shape, dtype=bool)
+    if missing_cells:
+        missing[tuple(np.array(missing_cells).T)] = True
+    if matched_cells:
+        matched[tuple(np.array(matched_cells).T)] = True
+
+    profiles = {s['email']: s for s in students}
+    emails = list(student_rows)
+    years = np.array([str(profiles.get(e, {}).get('year') or "Unknown") for e in emails], dtype=str)
+    branches = np.array([profiles.get(e, {}).get('branch') or "Unknown" for e in emails], dtype=str)
+
+    return SkillGapMatrix(
+        emails=emails,
+        skills=list(skill_columns),
+        bits=np.packbits(missing & ~matched, axis=1),
+        years=years,
+        branches=branches,
+        roles_analyzed=np.array(roles_analyzed, dtype=np.int32)
+    )
+
+
+_cache_lock = threading.Lock()
+_cache = {}
+
+
+def get_gap_matrix(company_name=None, job_role=None, refresh=False):
+    """
+    Cached SkillGapMatrix for all analyses, one company, or one company/role.
+
+    Shared by every session and rebuilt after ANALYTICS_TTL seconds or on refresh.
+    """
+    key = (company_name, job_role)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None and not refresh and time.time() - cached.built_at < ANALYTICS_TTL:
+            return cached
+
+    matrix = build_gap_matrix(get_latest_analyses(company_name, job_role), get_all_students())
+    with _cache_lock:
+        _cache[key] = matrix
+    return matrix
@@ -0,0 +1,68 @@
+# cohort_ranking.py
+import numpy as np
+from admission import admitted
+from company_database import COMPANY_JOB_SKILLS
+from database import get_all_current_resumes, get_all_students
+from resume_cache import get_cohort_features, get_cohort_chunks, refresh_cohort_cache
+
+
+def rank_company_from_current_resumes(company_name):
+    """
+    Rank every student's current resume against all roles of a company.
+
+    Cached embeddings are reused; resumes without fresh ones are encoded in
+    batches of COHORT_ENCODE_BATCH, each taking its own inference slot. All
+    roles are then scored together in a single pass.
+
+    Args:
+        company_name (str): The company name.
+
+    Returns:
+        dict: job_role -> list of ranking entries (best first). Each entry has
+              rank, student_email, student_name, resume_version, resume_filename,
+              ats_score, semantic_score, combined_score, matched_skills and
+              missing_skills.
+
+    Raises:
+        AdmissionRejected: If the inference queue is full or the wait timed out.
+    """
+    from matcher import score_cohort_against_roles, cohort_result
+
+    if company_name not in COMPANY_JOB_SKILLS:
+        return {}
+
+    resumes = get_all_current_resumes()
+    roles = [(company_name, role) for role in COMPANY_JOB_SKILLS[company_name]]
+    if not resumes:
+        return {role: [] for _, role in roles}
+
+    refresh_cohort_cache(resumes)
+    with admitted():
+        processed_texts, embeddings = get_cohort_features(resumes)
+        scores = score_cohort_against_roles(processed_texts, embeddings, roles,
+                                            chunk_embeddings=get_cohort_chunks(resumes))
+
+    names = {s['email']: s['name'] for s in get_all_students()}
+
+    rankings = {}
+    for r, (_, role) in enumerate(scores['roles']):
+        order = np.argsort(-scores['combined_scores'][:, r], kind='stable')
+        entries = []
+        for rank, i in enumerate(order, 1):
+            result = cohort_result(scores, i, r)
+            resume = resumes[i]
+            entries.append({
+                'rank': rank,
+                'student_email': resume['student_email'],
+                'student_name': names.get(resume['student_email'], "Unknown"),
+                'resume_version': resume['version_number'],
+                'resume_filename': resume['resume_filename'],
+                'ats_score': result['ats_score'],
+                'semantic_score': result['semantic_score'],
+                'combined_score': result['combined_score'],
+                'matched_skills': result['matched_skills'],
+                'missing_skills': result['missing_skills']
+            })
+        rankings[role] = entries
+
+    return rankings
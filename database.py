@@ -1,6 +1,9 @@
 # database.py
 import os
+import sys
+import uuid
 from supabase import create_client, Client
+from metrics import instrument_module, record_error
 
 # Initialize Supabase client
 SUPABASE_URL = os.getenv("SUPABASE_URL")
@@ -25,6 +28,7 @@ def insert_student(email, name, password_hash, year, branch):
         return response.data
     except Exception as e:
         print(f"Error inserting student: {e}")
+        record_error()
         return None
 
 
@@ -37,6 +41,7 @@ def fetch_student(email):
         return None
     except Exception as e:
         print(f"Error fetching student: {e}")
+        record_error()
         return None
 
 
@@ -47,9 +52,24 @@ def get_all_students():
         return response.data
     except Exception as e:
         print(f"Error fetching all students: {e}")
+        record_error()
         return []
 
 
+def insert_students_bulk(rows, chunk_size=500):
+    """Register many students (dicts with email, name, password, year, branch) with multi-row inserts"""
+    saved = []
+    try:
+        for start in range(0, len(rows), chunk_size):
+            response = supabase.table('students').insert(rows[start:start + chunk_size]).execute()
+            saved.extend(response.data or [])
+        return saved
+    except Exception as e:
+        print(f"Error inserting students in bulk: {e}")
+        record_error()
+        return None
+
+
 # ============ PLACEMENT CELL FUNCTIONS ============
 
 def insert_placement_officer(email, name, password_hash):
@@ -63,6 +83,7 @@ def insert_placement_officer(email, name, password_hash):
         return response.data
     except Exception as e:
         print(f"Error inserting placement officer: {e}")
+        record_error()
         return None
 
 
@@ -75,13 +96,14 @@ def fetch_placement_officer(email):
         return None
     except Exception as e:
         print(f"Error fetching placement officer: {e}")
+        record_error()
         return None
 # Add to database.py
 
 # ============ RESUME MANAGEMENT FUNCTIONS ============
 
-def save_student_resume(student_email, resume_text, filename):
-    """Save a new resume version for student"""
+def save_student_resume(student_email, resume_text, filename, cache_fields=None):
+    """Save a new resume version for student (cache_fields: precomputed processed_text/embedding columns)"""
     try:
         # Get current max version number
         response = supabase.table('student_resumes').select('version_number').eq('student_email', student_email).order('version_number', desc=True).limit(1).execute()
@@ -94,17 +116,21 @@ def save_student_resume(student_email, resume_text, filename):
             supabase.table('student_resumes').update({'is_current': False}).eq('student_email', student_email).execute()
         
         # Insert new resume
-        result = supabase.table('student_resumes').insert({
+        row = {
             'student_email': student_email,
             'resume_text': resume_text,
             'resume_filename': filename,
             'version_number': next_version,
             'is_current': True
-        }).execute()
+        }
+        if cache_fields:
+            row.update(cache_fields)
+        result = supabase.table('student_resumes').insert(row).execute()
         
         return result.data
     except Exception as e:
         print(f"Error saving resume: {e}")
+        record_error()
         return None
 
 
@@ -117,6 +143,7 @@ def get_current_resume(student_email):
         return None
     except Exception as e:
         print(f"Error fetching current resume: {e}")
+        record_error()
         return None
 
 
@@ -127,51 +154,169 @@ def get_all_resume_versions(student_email):
         return response.data if response.data else []
     except Exception as e:
         print(f"Error fetching resume versions: {e}")
+        record_error()
+        return []
+
+
+def get_all_current_resumes(page_size=1000):
+    """Get every student's current resume (paged, since Supabase caps rows per request)"""
+    try:
+        resumes = []
+        start = 0
+        while True:
+            response = supabase.table('student_resumes').select('*').eq('is_current', True).order('id').range(start, start + page_size - 1).execute()
+            page = response.data or []
+            resumes.extend(page)
+            if len(page) < page_size:
+                break
+            start += page_size
+        return resumes
+    except Exception as e:
+        print(f"Error fetching current resumes: {e}")
+        record_error()
+        return []
+
+
+def update_resume_cache(resume_id, cache_fields):
+    """Store precomputed processed_text/embedding columns on an existing resume row"""
+    try:
+        result = supabase.table('student_resumes').update(cache_fields).eq('id', resume_id).execute()
+        return result.data
+    except Exception as e:
+        print(f"Error updating resume cache: {e}")
+        record_error()
+        return None
+
+
+def get_resume_page(after_id=0, limit=100):
+    """Get a page of resume rows ordered by id (keyset pagination for batch jobs)"""
+    try:
+        response = supabase.table('student_resumes').select('*').gt('id', after_id).order('id').limit(limit).execute()
+        return response.data if response.data else []
+    except Exception as e:
+        print(f"Error fetching resume page: {e}")
+        record_error()
         return []
 
 
 # ============ ANALYSIS HISTORY FUNCTIONS ============
 
+def build_analysis_row(student_email, company_name, job_role, resume_version, resume_filename,
+                       ats_score, semantic_score, combined_score, matched_skills, missing_skills, feedback,
+                       source='student'):
+    """
+    Build an analysis_history row (same fields as save_analysis_result).
+
+    source tells a student's own analyses ('student') apart from rows written
+    in the background ('auto' for auto-scoring, 'rescore' after skill changes),
+    which are kept out of the student's history views. skills_hash records
+    the role's skills at scoring time, so rows scored against an older skills
+    list are not reused (see get_analysis_for_resume_version()).
+    idempotency_key is unique per row, so a batch retried after a partial
+    insert does not write the same analysis twice.
+    """
+    from skills_versioning import current_role_hash
+
+    return {
+        'student_email': student_email,
+        'company_name': company_name,
+        'job_role': job_role,
+        'resume_version': resume_version,
+        'resume_filename': resume_filename,
+        'ats_score': ats_score,
+        'semantic_score': semantic_score,
+        'combined_score': combined_score,
+        'matched_skills': matched_skills,
+        'missing_skills': missing_skills,
+        'feedback': feedback,
+        'source': source,
+        'skills_hash': current_role_hash(company_name, job_role),
+        'idempotency_key': uuid.uuid4().hex
+    }
+
+
 def save_analysis_result(student_email, company_name, job_role, resume_version, resume_filename, 
                          ats_score, semantic_score, combined_score, matched_skills, missing_skills, feedback):
     """Save analysis result to history"""
     try:
-        result = supabase.table('analysis_history').insert({
-            'student_email': student_email,
-            'company_name': company_name,
-            'job_role': job_role,
-            'resume_version': resume_version,
-            'resume_filename': resume_filename,
-            'ats_score': ats_score,
-            'semantic_score': semantic_score,
-            'combined_score': combined_score,
-            'matched_skills': matched_skills,
-            'missing_skills': missing_skills,
-            'feedback': feedback
-        }).execute()
+        result = supabase.table('analysis_history').insert(build_analysis_row(
+            student_email, company_name, job_role, resume_version, resume_filename,
+            ats_score, semantic_score, combined_score, matched_skills, missing_skills, feedback
+        )).execute()
         return result.data
     except Exception as e:
         print(f"Error saving analysis: {e}")
+        record_error()
+        return None
+
+
+def save_analysis_results_bulk(rows, chunk_size=500):
+    """
+    Save many analysis rows (from build_analysis_row) with multi-row inserts.
+
+    Rows whose idempotency_key is already stored are skipped, so retrying a
+    batch that was partly written is safe.
+    """
+    saved = []
+    try:
+        for start in range(0, len(rows), chunk_size):
+            result = supabase.table('analysis_history').upsert(
+                rows[start:start + chunk_size], on_conflict='idempotency_key', ignore_duplicates=True
+            ).execute()
+            saved.extend(result.data or [])
+        return saved
+    except Exception as e:
+        print(f"Error saving analyses in bulk: {e}")
+        record_error()
         return None
 
 
+def get_analysis_for_resume_version(student_email, company_name, job_role, resume_version, skills_hash=None):
+    """Get the most recent analysis of one resume version for a company/role (optionally only one scored with skills_hash)"""
+    try:
+        query = supabase.table('analysis_history').select('*').eq('student_email', student_email).eq('company_name', company_name).eq('job_role', job_role).eq('resume_version', resume_version)
+        if skills_hash is not None:
+            query = query.eq('skills_hash', skills_hash)
+        response = query.order('analyzed_at', desc=True).limit(1).execute()
+        if response.data and len(response.data) > 0:
+            return response.data[0]
+        return None
+    except Exception as e:
+        print(f"Error fetching analysis for resume version: {e}")
+        record_error()
+        return None
+
+
+def get_analyzed_roles_for_version(student_email, resume_version):
+    """Get the (company, job_role) pairs already analyzed for one resume version (any source)"""
+    try:
+        response = supabase.table('analysis_history').select('company_name, job_role').eq('student_email', student_email).eq('resume_version', resume_version).execute()
+        return {(row['company_name'], row['job_role']) for row in response.data or []}
+    except Exception as e:
+        print(f"Error fetching analyzed roles: {e}")
+        record_error()
+        return set()
+
+
 def get_student_analysis_history(student_email):
-    """Get all analysis history for a student, grouped by company"""
+    """Get all analysis history for a student, grouped by company (the student's own analyses only)"""
     try:
-        response = supabase.table('analysis_history').select('*').eq('student_email', student_email).order('analyzed_at', desc=True).execute()
+        response = supabase.table('analysis_history').select('*').eq('student_email', student_email).eq('source', 'student').order('analyzed_at', desc=True).execute()
         return response.data if response.data else []
     except Exception as e:
         print(f"Error fetching analysis history: {e}")
+        record_error()
         return []
 
 
 def get_company_specific_history(student_email, company_name):
-    """Get all analyses for a specific company"""
+    """Get all of a student's own analyses for a specific company"""
     try:
-        response = supabase.table('analysis_history').select('*').eq('student_email', student_email).eq('company_name', company_name).order('analyzed_at', desc=True).execute()
+        response = supabase.table('analysis_history').select('*').eq('student_email', student_email).eq('company_name', company_name).eq('source', 'student').order('analyzed_at', desc=True).execute()
         return response.data if response.data else []
     except Exception as e:
         print(f"Error fetching company history: {e}")
+        record_error()
         return []
 
 
@@ -184,7 +329,130 @@ def get_latest_analysis_for_company(student_email, company_name):
         return None
     except Exception as e:
         print(f"Error fetching latest analysis: {e}")
+        record_error()
         return None
+
+
+def get_latest_analyses(company_name=None, job_role=None, page_size=1000):
+    """
+    Get the latest analysis per student and company/role (optionally for one company/role).
+
+    Only the columns needed for cohort analytics are fetched, page by page.
+    """
+    try:
+        rows = []
+        start = 0
+        while True:
+            query = supabase.table('analysis_history').select(
+                'student_email, company_name, job_role, matched_skills, missing_skills, analyzed_at'
+            )
+            if company_name:
+                query = query.eq('company_name', company_name)
+            if job_role:
+                query = query.eq('job_role', job_role)
+            # id breaks analyzed_at ties so rows can't shift between pages
+            response = query.order('analyzed_at', desc=True).order('id', desc=True).range(start, start + page_size - 1).execute()
+            page = response.data or []
+            rows.extend(page)
+            if len(page) < page_size:
+                break
+            start += page_size
+
+        seen = set()
+        latest = []
+        for row in rows:
+            key = (row['student_email'], row['company_name'], row['job_role'])
+            if key not in seen:
+                seen.add(key)
+                latest.append(row)
+        return latest
+    except Exception as e:
+        print(f"Error fetching latest analyses: {e}")
+        record_error()
+        return []
+
+
+def get_ranking_index(company_name, job_role, page_size=1000):
+    """
+    Get id and scores of the latest analysis per student for a company/role.
+
+    Lightweight first pass for exports: full rows are then fetched in
+    chunks with get_analyses_by_ids().
+    """
+    try:
+        rows = []
+        start = 0
+        while True:
+            response = supabase.table('analysis_history').select(
+                'id, student_email, ats_score, semantic_score, combined_score, analyzed_at'
+            ).eq('company_name', company_name).eq('job_role', job_role).order('analyzed_at', desc=True).order('id', desc=True).range(start, start + page_size - 1).execute()
+            page = response.data or []
+            rows.extend(page)
+            if len(page) < page_size:
+                break
+            start += page_size
+
+        seen = set()
+        latest = []
+        for row in rows:
+            if row['student_email'] not in seen:
+                seen.add(row['student_email'])
+                latest.append(row)
+        return latest
+    except Exception as e:
+        print(f"Error fetching ranking index: {e}")
+        record_error()
+        return []
+
+
+def get_analyses_by_ids(ids):
+    """Get full analysis_history rows for a list of ids (one query; keep lists to a few hundred)"""
+    if not ids:
+        return []
+    try:
+        response = supabase.table('analysis_history').select('*').in_('id', list(ids)).execute()
+        return response.data if response.data else []
+    except Exception as e:
+        print(f"Error fetching analyses by id: {e}")
+        record_error()
+        return []
+
+
+# ============ SKILLS DATABASE VERSION FUNCTIONS ============
+
+def get_role_skill_versions():
+    """Get the stored skills hash of every company/role"""
+    try:
+        response = supabase.table('role_skill_versions').select('*').execute()
+        return response.data if response.data else []
+    except Exception as e:
+        print(f"Error fetching role skill versions: {e}")
+        record_error()
+        return []
+
+
+def upsert_role_skill_versions(rows):
+    """Insert or update skills hashes (rows with company_name, job_role, skills_hash)"""
+    try:
+        result = supabase.table('role_skill_versions').upsert(rows, on_conflict='company_name,job_role').execute()
+        return result.data
+    except Exception as e:
+        print(f"Error saving role skill versions: {e}")
+        record_error()
+        return None
+
+
+def delete_role_skill_version(company_name, job_role):
+    """Forget the stored skills hash of a role that no longer exists"""
+    try:
+        result = supabase.table('role_skill_versions').delete().eq('company_name', company_name).eq('job_role', job_role).execute()
+        return result.data
+    except Exception as e:
+        print(f"Error deleting role skill version: {e}")
+        record_error()
+        return None
+
+
 # ============ ANNOUNCEMENT FUNCTIONS ============
 
 def create_announcement(title, message, posted_by_email, posted_by_name):
@@ -200,6 +468,7 @@ def create_announcement(title, message, posted_by_email, posted_by_name):
         return result.data
     except Exception as e:
         print(f"Error creating announcement: {e}")
+        record_error()
         return None
 
 
@@ -210,6 +479,7 @@ def get_active_announcements():
         return response.data if response.data else []
     except Exception as e:
         print(f"Error fetching announcements: {e}")
+        record_error()
         return []
 
 
@@ -220,6 +490,7 @@ def get_all_announcements():
         return response.data if response.data else []
     except Exception as e:
         print(f"Error fetching all announcements: {e}")
+        record_error()
         return []
 
 
@@ -230,6 +501,7 @@ def delete_announcement(announcement_id):
         return result.data
     except Exception as e:
         print(f"Error deleting announcement: {e}")
+        record_error()
         return None
 
 
@@ -240,12 +512,13 @@ def toggle_announcement_status(announcement_id, is_active):
         return result.data
     except Exception as e:
         print(f"Error toggling announcement: {e}")
+        record_error()
         return None
 
 # ============ PUBLISHED RANKINGS FUNCTIONS ============
 
-def publish_ranking(title, company_name, job_role, description, rankings, published_by_email, published_by_name):
-    """Publish student rankings for a company/role"""
+def publish_ranking(title, company_name, job_role, description, rankings, published_by_email, published_by_name, weights=None):
+    """Publish student rankings for a company/role (weights: ATS/semantic balance used for the ranking)"""
     try:
         result = supabase.table('published_rankings').insert({
             'title': title,
@@ -255,11 +528,13 @@ def publish_ranking(title, company_name, job_role, description, rankings, publis
             'rankings': rankings,  # JSON format
             'published_by': published_by_email,
             'published_by_name': published_by_name,
+            'weights': weights,  # JSON format
             'is_active': True
         }).execute()
         return result.data
     except Exception as e:
         print(f"Error publishing ranking: {e}")
+        record_error()
         return None
 
 
@@ -270,6 +545,7 @@ def get_active_rankings():
         return response.data if response.data else []
     except Exception as e:
         print(f"Error fetching rankings: {e}")
+        record_error()
         return []
 
 
@@ -280,6 +556,7 @@ def get_all_rankings():
         return response.data if response.data else []
     except Exception as e:
         print(f"Error fetching all rankings: {e}")
+        record_error()
         return []
 
 
@@ -290,6 +567,7 @@ def delete_ranking(ranking_id):
         return result.data
     except Exception as e:
         print(f"Error deleting ranking: {e}")
+        record_error()
         return None
 
 
@@ -300,6 +578,7 @@ def get_all_student_analyses(company_name, job_role):
         return response.data if response.data else []
     except Exception as e:
         print(f"Error fetching student analyses: {e}")
+        record_error()
         return []
 def get_all_student_analyses(company_name, job_role):
     """Get LATEST analysis per student for a specific company and job role"""
@@ -326,6 +605,7 @@ def get_all_student_analyses(company_name, job_role):
         return latest_analyses
     except Exception as e:
         print(f"Error fetching student analyses: {e}")
+        record_error()
         return []
 def get_student_by_email(email):
     """Get student details by email"""
@@ -336,5 +616,25 @@ def get_student_by_email(email):
         return None
     except Exception as e:
         print(f"Error fetching student: {e}")
+        record_error()
         return None
 
+
+
+def get_students_by_emails(emails, chunk_size=500):
+    """Get the students rows for many emails with a few `in` queries"""
+    try:
+        emails = list(emails)
+        students = []
+        for start in range(0, len(emails), chunk_size):
+            response = supabase.table('students').select('*').in_('email', emails[start:start + chunk_size]).execute()
+            students.extend(response.data or [])
+        return students
+    except Exception as e:
+        print(f"Error fetching students: {e}")
+        record_error()
+        return []
+
+
+# Time every function that calls Supabase as stage "db.<function name>" (see metrics.py)
+instrument_module(sys.modules[__name__], "db", uses="supabase")
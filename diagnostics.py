@@ -0,0 +1,220 @@
+# diagnostics.py
+import collections
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+# Where profiles and memory snapshots are written
+DIAGNOSTICS_DIR = os.getenv("DIAGNOSTICS_DIR", os.path.join("data", "diagnostics"))
+# Start tracemalloc at import so the model and caches are attributed (adds memory/CPU overhead)
+TRACEMALLOC_AT_START = os.getenv("DIAGNOSTICS_TRACEMALLOC", "0") == "1"
+TRACEMALLOC_FRAMES = int(os.getenv("DIAGNOSTICS_TRACEMALLOC_FRAMES", "10"))
+# Touch this file to trigger a profile + memory snapshot without the UI (empty = off)
+TRIGGER_FILE = os.getenv("DIAGNOSTICS_TRIGGER_FILE", "")
+PROFILE_SECONDS = float(os.getenv("DIAGNOSTICS_PROFILE_SECONDS", "30"))
+SAMPLE_INTERVAL = float(os.getenv("DIAGNOSTICS_SAMPLE_INTERVAL_MS", "5")) / 1000
+
+_state_lock = threading.Lock()
+_active_profile = None
+_history = collections.deque(maxlen=20)
+
+
+def _output_path(kind, ext):
+    os.makedirs(DIAGNOSTICS_DIR, exist_ok=True)
+    return os.path.join(DIAGNOSTICS_DIR, f"{kind}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{ext}")
+
+
+# ============ SAMPLING PROFILER ============
+
+def _frame_label(frame):
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", os.path.basename(code.co_filename))
+    return f"{module}:{code.co_name}:{frame.f_lineno}"
+
+
+def sample_stacks(duration, interval=SAMPLE_INTERVAL, thread_filter=None):
+    """
+    Sample the Python stacks of every other thread for duration seconds.
+
+    Args:
+        duration (float): How long to sample.
+        interval (float): Seconds between samples.
+        thread_filter (callable): Optional predicate on thread names.
+
+    Returns:
+        tuple: (Counter of collapsed stacks "thread;outer;...;inner" -> samples, number of sampling rounds)
+    """
+    own_id = threading.get_ident()
+    counts = collections.Counter()
+    rounds = 0
+    deadline = time.monotonic() + duration
+
+    while time.monotonic() < deadline:
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            name = names.get(thread_id, str(thread_id))
+            if thread_filter is not None and not thread_filter(name):
+                continue
+
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.append(name.replace(";", "_").replace(" ", "_"))
+            counts[";".join(reversed(stack))] += 1
+        rounds += 1
+        time.sleep(interval)
+
+    return counts, rounds
+
+
+def write_collapsed(counts, path):
+    """Write stacks in the collapsed format read by flamegraph.pl / speedscope"""
+    with open(path, "w") as f:
+        for stack, count in counts.most_common():
+            f.write(f"{stack} {count}\n")
+
+
+def _run_profile(seconds, interval, record):
+    try:
+        counts, rounds = sample_stacks(seconds, interval)
+        path = _output_path("profile", "collapsed")
+        write_collapsed(counts, path)
+        record.update({'status': 'done', 'path': path, 'samples': sum(counts.values()), 'rounds': rounds})
+    except Exception as e:
+        record.update({'status': 'error', 'error': str(e)})
+    finally:
+        record['finished_at'] = time.time()
+        global _active_profile
+        with _state_lock:
+            _active_profile = None
+
+
+def start_profile(seconds=PROFILE_SECONDS, interval=SAMPLE_INTERVAL):
+    """
+    Profile every thread in the background for `seconds`.
+
+    Only one profile runs at a time.
+
+    Returns:
+        dict: Status record (updated in place with 'path' when finished), or
+              None if a profile is already running.
+    """
+    global _active_profile
+    with _state_lock:
+        if _active_profile is not None:
+            return None
+        record = {'kind': 'profile', 'status': 'running', 'seconds': seconds, 'started_at': time.time(), 'path': None}
+        _active_profile = record
+        _history.appendleft(record)
+
+    threading.Thread(target=_run_profile, args=(seconds, interval, record), name="diagnostics-profiler",
+                     daemon=True).start()
+    return record
+
+
+def active_profile():
+    """The running profile's status record, or None"""
+    with _state_lock:
+        return _active_profile
+
+
+# ============ MEMORY SNAPSHOTS ============
+
+def start_memory_tracing(frames=TRACEMALLOC_FRAMES):
+    """Start tracemalloc (allocations made before this call are not attributed)"""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+
+def stop_memory_tracing():
+    """Stop tracemalloc and free its bookkeeping"""
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def memory_snapshot(limit=25, group_by="lineno"):
+    """
+    Top allocation sites since tracing started, written to a text file.
+
+    Args:
+        limit (int): Number of sites to report.
+        group_by (str): "lineno", "filename" or "traceback".
+
+    Returns:
+        dict: 'allocations' (list of {'location', 'size_kb', 'count'}), 'traced_mb',
+              'peak_mb' and 'path', or None if tracemalloc is not running.
+    """
+    if not tracemalloc.is_tracing():
+        return None
+
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    stats = snapshot.statistics(group_by)[:limit]
+    current, peak = tracemalloc.get_traced_memory()
+
+    allocations = []
+    for stat in stats:
+        frames = stat.traceback.format() if group_by == "traceback" else [str(stat.traceback[0])]
+        allocations.append({
+            'location': " <- ".join(line.strip() for line in frames if line.strip()),
+            'size_kb': round(stat.size / 1024, 1),
+            'count': stat.count
+        })
+
+    path = _output_path("memory", "txt")
+    with open(path, "w") as f:
+        f.write(f"Traced: {current / 2**20:.1f} MB, peak: {peak / 2**20:.1f} MB\n\n")
+        for stat in stats:
+            f.write(f"{stat}\n")
+            if group_by == "traceback":
+                f.write("\n".join(stat.traceback.format()) + "\n\n")
+
+    result = {'kind': 'memory', 'status': 'done', 'path': path, 'allocations': allocations,
+              'traced_mb': round(current / 2**20, 1), 'peak_mb': round(peak / 2**20, 1), 'finished_at': time.time()}
+    with _state_lock:
+        _history.appendleft(result)
+    return result
+
+
+def recent_outputs():
+    """Recent profile / snapshot records, newest first"""
+    with _state_lock:
+        return list(_history)
+
+
+# ============ ENV-DRIVEN HOOKS ============
+
+def _watch_trigger_file(path, poll_interval=2.0):
+    """Run a profile and memory snapshot whenever the trigger file appears"""
+    while True:
+        if os.path.exists(path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            print(f"Diagnostics triggered by {path}: profiling for {PROFILE_SECONDS:.0f}s")
+            record = start_profile(PROFILE_SECONDS)
+            snapshot = memory_snapshot()
+            if snapshot:
+                print(f"Memory snapshot written to {snapshot['path']}")
+            if record:
+                while record['status'] == 'running':
+                    time.sleep(poll_interval)
+                print(f"Profile written to {record.get('path')}")
+        time.sleep(poll_interval)
+
+
+if TRACEMALLOC_AT_START:
+    start_memory_tracing()
+
+if TRIGGER_FILE:
+    threading.Thread(target=_watch_trigger_file, args=(TRIGGER_FILE,), name="diagnostics-trigger",
+                     daemon=True).start()
@@ -0,0 +1,179 @@
+# embedding_compression.py
+import argparse
+import json
+import numpy as np
+
+
+# ============ PCA PROJECTION ============
+
+def fit_pca(vectors, n_components):
+    """
+    Fit a PCA projection on a corpus of embeddings.
+
+    Args:
+        vectors (np.ndarray): N x D embedding matrix.
+        n_components (int): Output dimension.
+
+    Returns:
+        dict: 'mean' (D,) and 'components' (n_components x D) arrays.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    n_components = min(n_components, vectors.shape[0], vectors.shape[1])
+    mean = vectors.mean(axis=0)
+    # Right singular vectors of the centred data are the principal axes
+    _, _, vt = np.linalg.svd(vectors - mean, full_matrices=False)
+    return {'mean': mean.astype(np.float32), 'components': vt[:n_components].astype(np.float32)}
+
+
+def apply_pca(vectors, pca):
+    """Project embeddings (N x D or D) with a fitted PCA; the caller re-normalizes if needed"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return (vectors - pca['mean']) @ pca['components'].T
+
+
+def save_pca(path, pca):
+    """Write a fitted PCA to an .npz file"""
+    np.savez(path, mean=pca['mean'], components=pca['components'])
+
+
+def load_pca(path):
+    """Load a PCA written by save_pca()"""
+    with np.load(path) as data:
+        return {'mean': data['mean'], 'components': data['components']}
+
+
+# ============ INT8 SCALAR QUANTIZATION ============
+
+def quantize_int8(vectors):
+    """
+    Quantize embeddings to int8 with one scale per vector.
+
+    Returns:
+        tuple: (int8 codes N x D, float32 scales N) with vectors ~= codes * scales.
+    """
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def dequantize_int8(codes, scales):
+    """Reconstruct float32 embeddings from int8 codes and per-vector scales"""
+    return codes.astype(np.float32) * np.asarray(scales, dtype=np.float32)[:, None]
+
+
+# ============ ACCURACY REPORT ============
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1)
+
+
+def _top_k(scores, k):
+    return np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+
+def evaluate_compression(vectors, queries=None, k=10, pca_dims=(None, 256, 128, 64), quantize=(False, True)):
+    """
+    Compare compressed storage formats against the full-precision baseline.
+
+    For each (PCA dimension, int8) combination, reports bytes per vector,
+    recall@K of the top-K search, and the absolute error of the cosine scores.
+
+    Args:
+        vectors (np.ndarray): N x D corpus embeddings.
+        queries (np.ndarray): Q x D query embeddings. Defaults to up to 100
+            vectors sampled from the corpus and held out of it, so no query
+            finds itself as a guaranteed top-1 hit.
+        k (int): K for recall@K.
+        pca_dims (iterable): Output dimensions to try (None = no PCA).
+        quantize (iterable): Whether to int8-quantize (False, True).
+
+    Returns:
+        list: One report dict per configuration.
+    """
+    vectors = _normalize(np.asarray(vectors, dtype=np.float32))
+    if queries is None:
+        if len(vectors) < 2:
+            raise ValueError("Need at least 2 vectors to hold queries out of the corpus")
+        rng = np.random.default_rng(0)
+        held_out = rng.choice(len(vectors), size=min(100, len(vectors) // 2), replace=False)
+        queries = vectors[held_out]
+        vectors = np.delete(vectors, held_out, axis=0)
+    queries = _normalize(np.asarray(queries, dtype=np.float32))
+    n, dim = vectors.shape
+    k = min(k, n)
+
+    baseline_scores = queries @ vectors.T
+    baseline_top = _top_k(baseline_scores, k)
+
+    report = []
+    for dims in pca_dims:
+        if dims is not None and dims >= dim:
+            continue
+        if dims is None:
+            projected, projected_queries = vectors, queries
+            pca = None
+        else:
+            pca = fit_pca(vectors, dims)
+            projected = _normalize(apply_pca(vectors, pca))
+            projected_queries = _normalize(apply_pca(queries, pca))
+
+        for use_int8 in quantize:
+            if use_int8:
+                codes, scales = quantize_int8(projected)
+                stored = dequantize_int8(codes, scales)
+                bytes_per_vector = codes.shape[1] + 4
+            else:
+                stored = projected
+                bytes_per_vector = projected.shape[1] * 4
+
+            scores = projected_queries @ stored.T
+            top = _top_k(scores, k)
+            recall = np.mean([
+                len(set(top[q]) & set(baseline_top[q])) / k for q in range(len(queries))
+            ])
+            error = np.abs(scores - baseline_scores)
+
+            report.append({
+                # fit_pca() clamps the dimension to the corpus size
+                'pca_dims': pca['components'].shape[0] if pca is not None else dim,
+                'int8': bool(use_int8),
+                'bytes_per_vector': int(bytes_per_vector),
+                'compression_ratio': round(dim * 4 / bytes_per_vector, 2),
+                f'recall_at_{k}': round(float(recall), 4),
+                'mean_score_error': round(float(error.mean()), 5),
+                'max_score_error': round(float(error.max()), 5)
+            })
+
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report recall/score error of compressed embedding formats.")
+    parser.add_argument("--k", type=int, default=10, help="K for recall@K")
+    parser.add_argument("--dims", type=int, nargs="*", default=[256, 128, 64], help="PCA dimensions to try")
+    parser.add_argument("--json", help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    from database import get_all_current_resumes
+    from resume_cache import get_cohort_features
+
+    print("--- Loading current resume embeddings ---")
+    _, corpus = get_cohort_features(get_all_current_resumes())
+    if len(corpus) < 2:
+        print("Need at least 2 resumes to evaluate.")
+        raise SystemExit(1)
+
+    rows = evaluate_compression(corpus, k=args.k, pca_dims=[None] + args.dims)
+
+    print(f"\n{'dims':>5} {'int8':>5} {'bytes':>6} {'ratio':>6} {'recall@' + str(args.k):>10} {'mean err':>9} {'max err':>9}")
+    for row in rows:
+        print(f"{row['pca_dims']:>5} {str(row['int8']):>5} {row['bytes_per_vector']:>6} {row['compression_ratio']:>6} "
+              f"{row[f'recall_at_{args.k}']:>10} {row['mean_score_error']:>9} {row['max_score_error']:>9}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+        print(f"\n✓ Report written to {args.json}")
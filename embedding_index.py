@@ -0,0 +1,431 @@
+# embedding_index.py
+import json
+import os
+import threading
+import numpy as np
+from embedding_compression import apply_pca, fit_pca, load_pca, save_pca, quantize_int8
+
+INDEX_DIR = os.getenv("EMBEDDING_INDEX_DIR", os.path.join("data", "embedding_index"))
+# float32, float16 or int8 (scalar-quantized with a per-vector scale)
+INDEX_DTYPE = os.getenv("EMBEDDING_INDEX_DTYPE", "float32")
+# Fit a PCA projection to this many dimensions when rebuilding (0 = keep full dimension)
+INDEX_PCA_DIMS = int(os.getenv("EMBEDDING_INDEX_PCA_DIMS", "0"))
+# Rows scored per block in top_k(), bounding the float32 copy of an int8 matrix
+SEARCH_BLOCK_ROWS = int(os.getenv("EMBEDDING_INDEX_SEARCH_BLOCK", "65536"))
+
+
+class EmbeddingIndex:
+    """
+    Persistent store of one embedding per student (their current resume version).
+
+    Vectors are L2-normalized and kept in a memory-mapped .npy matrix on disk;
+    ids.json maps each row to its key (student email) and metadata such as
+    resume_version, year and branch. Updates overwrite the student's row in
+    place, removals leave a tombstone that compact() reclaims.
+
+    Row changes are appended to ids.journal (one JSON line per row) rather
+    than rewriting ids.json, so an upload costs O(1) disk writes. The journal
+    is replayed on load and folded back into ids.json by compact() (run by
+    rebuild_index()) or once it outgrows the snapshot.
+
+    With dtype='int8' vectors are stored as int8 codes plus a float32 scale
+    per row (scales.npy); if pca.npz exists, vectors and queries are projected
+    with it before storage/search.
+    """
+
+    def __init__(self, path=INDEX_DIR, dtype=INDEX_DTYPE, initial_capacity=1024):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.initial_capacity = initial_capacity
+        self._lock = threading.RLock()
+        self._vectors_file = os.path.join(path, "vectors.npy")
+        self._ids_file = os.path.join(path, "ids.json")
+        self._journal_file = os.path.join(path, "ids.journal")
+        self._scales_file = os.path.join(path, "scales.npy")
+        self._pca_file = os.path.join(path, "pca.npz")
+
+        self.pca = load_pca(self._pca_file) if os.path.exists(self._pca_file) else None
+        self._vectors = None
+        self._scales = None
+        self._rows = []          # row -> {'key': ..., 'meta': {...}} or None (tombstone)
+        self._key_to_row = {}
+        self._filter_cache = {}
+        self._journal_entries = 0
+        self._load()
+
+    # ---------- persistence ----------
+
+    def _load(self):
+        """Open an existing index from disk, if there is one"""
+        if not (os.path.exists(self._vectors_file) and os.path.exists(self._ids_file)):
+            return
+        with open(self._ids_file) as f:
+            self._rows = json.load(f)['rows']
+        journal_intact = self._replay_journal()
+        self._vectors = np.load(self._vectors_file, mmap_mode='r+')
+        self.dtype = self._vectors.dtype
+        if self.dtype == np.int8:
+            self._scales = np.load(self._scales_file, mmap_mode='r+')
+        self._key_to_row = {row['key']: i for i, row in enumerate(self._rows) if row is not None}
+        if not journal_intact:
+            # Don't append after a torn line - start a fresh snapshot instead
+            self._save_ids()
+
+    def _replay_journal(self):
+        """
+        Apply row changes appended since ids.json was last written.
+
+        Returns:
+            bool: False if the journal ends in a write cut short by a crash
+                  (everything before it is applied).
+        """
+        if not os.path.exists(self._journal_file):
+            return True
+        with open(self._journal_file) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    return False
+                row = entry['row']
+                if row >= len(self._rows):
+                    self._rows.extend([None] * (row + 1 - len(self._rows)))
+                self._rows[row] = entry['value']
+                self._journal_entries += 1
+        return True
+
+    def _save_ids(self):
+        """Write the id map atomically and drop the journal it supersedes"""
+        os.makedirs(self.path, exist_ok=True)
+        tmp_file = self._ids_file + ".tmp"
+        with open(tmp_file, "w") as f:
+            json.dump({'dtype': self.dtype.name, 'rows': self._rows}, f)
+        os.replace(tmp_file, self._ids_file)
+        if os.path.exists(self._journal_file):
+            os.remove(self._journal_file)
+        self._journal_entries = 0
+
+    def _log_rows(self, rows):
+        """Persist changes to the given rows by appending them to the journal"""
+        if not os.path.exists(self._ids_file) or self._journal_entries + len(rows) > max(1024, len(self._rows)):
+            self._save_ids()
+            return
+        with open(self._journal_file, "a") as f:
+            f.write("".join(json.dumps({'row': row, 'value': self._rows[row]}) + "\n" for row in rows))
+        self._journal_entries += len(rows)
+
+    def _ensure_capacity(self, needed, dim):
+        """Grow the memory-mapped matrix (doubling) so it can hold `needed` rows"""
+        if self._vectors is not None:
+            if self._vectors.shape[1] != dim:
+                raise ValueError(f"Embedding dimension {dim} does not match index dimension {self._vectors.shape[1]}")
+            if needed <= self._vectors.shape[0]:
+                return
+
+        capacity = max(self.initial_capacity, needed)
+        if self._vectors is not None:
+            capacity = max(capacity, self._vectors.shape[0] * 2)
+
+        os.makedirs(self.path, exist_ok=True)
+        self._vectors = self._grow_file(self._vectors_file, self._vectors, self.dtype, (capacity, dim))
+        if self.dtype == np.int8:
+            self._scales = self._grow_file(self._scales_file, self._scales, np.float32, (capacity,))
+
+    def _grow_file(self, path, current, dtype, shape):
+        """Copy a memory-mapped array into a larger file and reopen it"""
+        tmp_file = path + ".tmp"
+        grown = np.lib.format.open_memmap(tmp_file, mode='w+', dtype=dtype, shape=shape)
+        if current is not None:
+            grown[:len(self._rows)] = current[:len(self._rows)]
+        grown.flush()
+        del grown, current
+        os.replace(tmp_file, path)
+        return np.load(path, mmap_mode='r+')
+
+    def _project(self, vectors):
+        """Apply the PCA projection (if any) and L2-normalize"""
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        if self.pca is not None:
+            vectors = apply_pca(vectors, self.pca)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms > 0, norms, 1)
+
+    def _stored_vectors(self, rows):
+        """Read stored rows back as float32 (dequantizing int8)"""
+        vectors = np.asarray(self._vectors[rows], dtype=np.float32)
+        if self.dtype == np.int8:
+            vectors = vectors * np.asarray(self._scales[rows], dtype=np.float32)[..., None]
+        return vectors
+
+    # ---------- updates ----------
+
+    def upsert_many(self, items):
+        """
+        Add or update many embeddings at once.
+
+        Args:
+            items (list): (key, embedding, meta dict) tuples.
+        """
+        if not items:
+            return
+        with self._lock:
+            vectors = self._project(np.vstack([np.asarray(e, dtype=np.float32) for _, e, _ in items]))
+            self._store(items, vectors)
+
+    def _store(self, items, vectors):
+        """Write already projected/normalized vectors for (key, _, meta) items"""
+        with self._lock:
+            if self.dtype == np.int8:
+                codes, scales = quantize_int8(vectors)
+            else:
+                codes, scales = vectors.astype(self.dtype), None
+
+            new_keys = [key for key, _, _ in items if key not in self._key_to_row]
+            self._ensure_capacity(len(self._rows) + len(set(new_keys)), vectors.shape[1])
+
+            changed = []
+            for i, (key, _, meta) in enumerate(items):
+                row = self._key_to_row.get(key)
+                if row is None:
+                    row = len(self._rows)
+                    self._rows.append(None)
+                    self._key_to_row[key] = row
+                self._rows[row] = {'key': key, 'meta': meta or {}}
+                changed.append(row)
+                self._vectors[row] = codes[i]
+                if scales is not None:
+                    self._scales[row] = scales[i]
+
+            self._vectors.flush()
+            if self._scales is not None:
+                self._scales.flush()
+            self._filter_cache = {}
+            self._log_rows(changed)
+
+    def upsert(self, key, embedding, meta=None):
+        """Add or update one embedding"""
+        self.upsert_many([(key, embedding, meta)])
+
+    def remove(self, key):
+        """Tombstone a key; its row is skipped by searches until compact()"""
+        with self._lock:
+            row = self._key_to_row.pop(key, None)
+            if row is None:
+                return False
+            self._rows[row] = None
+            self._filter_cache = {}
+            self._log_rows([row])
+            return True
+
+    def compact(self):
+        """Rewrite the matrix without tombstoned rows and fold the journal into ids.json"""
+        with self._lock:
+            live = [i for i, row in enumerate(self._rows) if row is not None]
+            if len(live) == len(self._rows) or self._vectors is None:
+                if self._journal_entries:
+                    self._save_ids()
+                return
+            vectors = self._stored_vectors(live)
+            rows = [self._rows[i] for i in live]
+
+            self._clear_files()
+            if rows:
+                self._store([(row['key'], None, row['meta']) for row in rows], vectors)
+            self._save_ids()
+
+    def _clear_files(self):
+        """Drop all rows and the matrix files (the PCA file is kept)"""
+        self._vectors = None
+        self._scales = None
+        self._rows = []
+        self._key_to_row = {}
+        self._filter_cache = {}
+        for path in (self._vectors_file, self._scales_file):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def reset(self, pca=None, dtype=None):
+        """Empty the index, set (or clear) its PCA projection and optionally change the storage dtype"""
+        with self._lock:
+            self._clear_files()
+            self.pca = pca
+            if dtype is not None:
+                self.dtype = np.dtype(dtype)
+            os.makedirs(self.path, exist_ok=True)
+            if pca is not None:
+                save_pca(self._pca_file, pca)
+            elif os.path.exists(self._pca_file):
+                os.remove(self._pca_file)
+            self._save_ids()
+
+    # ---------- search ----------
+
+    def __len__(self):
+        return len(self._key_to_row)
+
+    def keys(self):
+        """Keys of all live (non-tombstoned) rows"""
+        with self._lock:
+            return list(self._key_to_row)
+
+    def get(self, key):
+        """Get (embedding, meta) for a key, or None"""
+        with self._lock:
+            row = self._key_to_row.get(key)
+            if row is None:
+                return None
+            return self._stored_vectors(row), self._rows[row]['meta']
+
+    def _field_codes(self, field):
+        """Integer-code a metadata field once so filters become vectorized lookups"""
+        if field not in self._filter_cache:
+            value_codes = {}
+            codes = np.array([
+                value_codes.setdefault(row['meta'].get(field) if row is not None else None, len(value_codes))
+                for row in self._rows
+            ], dtype=np.int32)
+            self._filter_cache[field] = (codes, value_codes)
+        return self._filter_cache[field]
+
+    def _filter_mask(self, filters):
+        """Boolean mask of live rows whose metadata matches every filter (value or list of values)"""
+        if None not in self._filter_cache:
+            self._filter_cache[None] = np.array([row is not None for row in self._rows], dtype=bool)
+        mask = self._filter_cache[None].copy()
+        for field, wanted in (filters or {}).items():
+            codes, value_codes = self._field_codes(field)
+            wanted = wanted if isinstance(wanted, (list, tuple, set)) else [wanted]
+            wanted_codes = [value_codes[value] for value in wanted if value in value_codes]
+            mask &= np.isin(codes, wanted_codes)
+        return mask
+
+    def top_k(self, query_vector, k=10, filters=None):
+        """
+        Find the k rows most similar to a query vector.
+
+        Args:
+            query_vector (array-like): Query embedding (normalized here).
+            k (int): Number of results.
+            filters (dict): Metadata filters, e.g. {'year': '4th Year', 'branch': [...]}.
+
+        Returns:
+            list: (key, cosine similarity, meta) tuples, most similar first.
+        """
+        with self._lock:
+            n = len(self._rows)
+            if n == 0 or self._vectors is None:
+                return []
+
+            query = self._project(query_vector)[0]
+
+            # Score in blocks so int8 codes are widened a block at a time, never the whole matrix
+            scores = np.empty(n, dtype=np.float32)
+            for start in range(0, n, SEARCH_BLOCK_ROWS):
+                end = min(n, start + SEARCH_BLOCK_ROWS)
+                if self.dtype == np.int8:
+                    block = np.asarray(self._vectors[start:end], dtype=np.float32)
+                    scores[start:end] = (block @ query) * self._scales[start:end]
+                else:
+                    scores[start:end] = self._vectors[start:end] @ query.astype(self.dtype)
+            scores[~self._filter_mask(filters)] = -np.inf
+
+            candidates = int(np.isfinite(scores).sum())
+            k = min(k, candidates)
+            if k <= 0:
+                return []
+
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(self._rows[i]['key'], float(scores[i]), self._rows[i]['meta']) for i in top]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """Get the process-wide embedding index (opened from disk on first use)"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = EmbeddingIndex()
+        return _index
+
+
+def student_meta(student, resume):
+    """Metadata stored with each indexed resume (used for search filters)"""
+    return {
+        'resume_version': resume.get('version_number'),
+        'year': student.get('year') if student else None,
+        'branch': student.get('branch') if student else None
+    }
+
+
+def index_resume(student_email, resume, embedding, student=None):
+    """Add or replace a student's current resume embedding in the index"""
+    if student is None:
+        from database import get_student_by_email
+        student = get_student_by_email(student_email)
+    get_index().upsert(student_email, embedding, student_meta(student, resume))
+
+
+def rebuild_index(pca_dims=INDEX_PCA_DIMS):
+    """
+    Rebuild the index from every student's current resume.
+
+    Args:
+        pca_dims (int): If > 0, fit a PCA projection of this size on the
+            corpus and rebuild the index in the reduced dimension.
+
+    Returns:
+        int: Number of indexed students.
+    """
+    from database import get_all_current_resumes, get_all_students
+    from resume_cache import get_cohort_features, refresh_cohort_cache
+
+    resumes = get_all_current_resumes()
+    students = {s['email']: s for s in get_all_students()}
+    refresh_cohort_cache(resumes)
+    _, embeddings = get_cohort_features(resumes)
+
+    index = get_index()
+    if pca_dims and len(resumes) > pca_dims:
+        index.reset(pca=fit_pca(embeddings, pca_dims), dtype=INDEX_DTYPE)
+    elif index.pca is not None or index.dtype != np.dtype(INDEX_DTYPE):
+        index.reset(dtype=INDEX_DTYPE)
+
+    current = {r['student_email'] for r in resumes}
+    for key in [key for key in index.keys() if key not in current]:
+        index.remove(key)
+
+    index.upsert_many([
+        (r['student_email'], embedding, student_meta(students.get(r['student_email']), r))
+        for r, embedding in zip(resumes, embeddings)
+    ])
+    index.compact()
+    return len(index)
+
+
+def find_students_for_role(company_name, job_role, k=10, filters=None):
+    """Students whose current resume is semantically closest to a company role"""
+    from company_database import COMPANY_JOB_SKILLS
+    from matcher import build_job_description, get_job_embedding
+
+    skills = COMPANY_JOB_SKILLS[company_name][job_role]
+    query = get_job_embedding(build_job_description(company_name, job_role, skills))
+    return get_index().top_k(query, k=k, filters=filters)
+
+
+def find_students_for_text(job_description, k=10, filters=None):
+    """Students whose current resume is semantically closest to an ad-hoc job description"""
+    from matcher import encode_resume
+    from text_preprocessor import preprocess_text
+
+    # Resumes are embedded from preprocessed text, so embed the query the same way
+    query = encode_resume(preprocess_text(job_description))
+    return get_index().top_k(query, k=k, filters=filters)
+
+
+if __name__ == "__main__":
+    print("--- Rebuilding resume embedding index ---")
+    print(f"Indexed {rebuild_index()} student(s) in {INDEX_DIR}")
@@ -0,0 +1,199 @@
+# job_queue.py
+import heapq
+import io
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from metrics import trace
+
+# Worker pool shared by every Streamlit session. Modules are imported once per
+# server process, so jobs keep running across reruns and page switches.
+MAX_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "4"))
+MAX_FINISHED_JOBS = int(os.getenv("ANALYSIS_MAX_FINISHED_JOBS", "20"))
+DEFAULT_TOP_K = int(os.getenv("ANALYSIS_TOP_K", "50"))
+# Separate small pool for one-off tasks (auto-scoring new uploads), so they
+# never wait behind the files of a large bulk job
+BACKGROUND_WORKERS = int(os.getenv("BACKGROUND_TASK_WORKERS", "1"))
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="analysis-worker")
+_task_executor = ThreadPoolExecutor(max_workers=BACKGROUND_WORKERS, thread_name_prefix="background-task")
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+@trace("bulk_file")
+def _analyze_file(job_id, filename, file_bytes):
+    """Extract, preprocess and match a single resume for a job"""
+    job = _jobs.get(job_id)
+    if job is None or job['status'] == 'cancelled':
+        return
+
+    # Lazy import - the model is only loaded once the first job runs
+    from pdf_processor import extract_text_from_pdf
+    from matcher import match_resume_to_job
+    from resume_cache import build_resume_fields
+    from admission import admitted
+
+    with _jobs_lock:
+        if job['status'] == 'queued':
+            job['status'] = 'running'
+            job['started_at'] = time.time()
+
+    error = None
+    result = None
+    try:
+        resume_text = extract_text_from_pdf(io.BytesIO(file_bytes))
+
+        if resume_text and len(resume_text.strip()) > 50:
+            # Background work: yields to interactive student requests and never times out
+            with admitted(background=True):
+                cache_fields = build_resume_fields(resume_text)
+                result = match_resume_to_job(cache_fields['processed_text'], job['company'], job['job_role'],
+                                             resume_embedding=cache_fields['embedding'],
+                                             chunk_embeddings=cache_fields.get('chunk_embeddings'))
+
+            if 'error' in result:
+                error = result['error']
+                result = None
+            else:
+                result['filename'] = filename
+                result['resume_text'] = resume_text
+                result['cache_fields'] = cache_fields
+        else:
+            error = "Could not extract text from PDF"
+    except Exception as e:
+        error = str(e)
+
+    with _jobs_lock:
+        if result is not None:
+            job['results'].append(result)
+
+            # Keep a min-heap of the best K so the live table never re-sorts everything
+            entry = (result['combined_score'], len(job['results']) - 1)
+            if len(job['top_heap']) < job['top_k']:
+                heapq.heappush(job['top_heap'], entry)
+            else:
+                heapq.heappushpop(job['top_heap'], entry)
+        else:
+            job['errors'].append({'filename': filename, 'error': error})
+        job['done'] += 1
+
+        if job['done'] >= job['total'] and job['status'] != 'cancelled':
+            job['status'] = 'done'
+            job['finished_at'] = time.time()
+
+
+def _evict_finished_jobs():
+    """Drop the oldest finished jobs so the table stays bounded (caller holds the lock)"""
+    finished = [j for j in _jobs.values() if j['status'] in ('done', 'cancelled')]
+    finished.sort(key=lambda j: j['created_at'])
+    for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+        del _jobs[job['id']]
+
+
+def submit_bulk_analysis(files, company_name, job_role, submitted_by=None, top_k=DEFAULT_TOP_K):
+    """
+    Queue a batch of resumes for background analysis.
+
+    Args:
+        files (list): List of (filename, file_bytes) tuples.
+        company_name (str): The company name.
+        job_role (str): The job role to match against.
+        submitted_by (str): Email of the officer who submitted the batch.
+        top_k (int): How many of the best results to keep sorted while the job runs.
+
+    Returns:
+        str: The job id to poll with get_job().
+    """
+    job_id = uuid.uuid4().hex[:12]
+
+    with _jobs_lock:
+        _evict_finished_jobs()
+        _jobs[job_id] = {
+            'id': job_id,
+            'company': company_name,
+            'job_role': job_role,
+            'submitted_by': submitted_by,
+            'status': 'queued' if files else 'done',
+            'total': len(files),
+            'done': 0,
+            'results': [],
+            'top_heap': [],
+            'top_k': max(1, top_k),
+            'errors': [],
+            'saved': False,
+            'created_at': time.time(),
+            'started_at': None,
+            'finished_at': None if files else time.time()
+        }
+
+    for filename, file_bytes in files:
+        _executor.submit(_analyze_file, job_id, filename, file_bytes)
+
+    return job_id
+
+
+def get_job(job_id):
+    """
+    Get a snapshot of a job's progress and (partial) results.
+
+    Returns:
+        dict: Copy of the job record, or None if the job is unknown. Includes
+              'top_results' (best K so far, highest first), 'throughput'
+              (resumes/sec) and 'eta_seconds' (None until a rate is known).
+    """
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is None:
+            return None
+        snapshot = {k: v for k, v in job.items() if k != 'top_heap'}
+        snapshot['results'] = list(job['results'])
+        snapshot['errors'] = list(job['errors'])
+        snapshot['top_results'] = [job['results'][idx] for _, idx in sorted(job['top_heap'], reverse=True)]
+
+    snapshot['throughput'] = 0.0
+    snapshot['eta_seconds'] = None
+    if snapshot['started_at'] and snapshot['done']:
+        elapsed = (snapshot['finished_at'] or time.time()) - snapshot['started_at']
+        if elapsed > 0:
+            snapshot['throughput'] = snapshot['done'] / elapsed
+            snapshot['eta_seconds'] = (snapshot['total'] - snapshot['done']) / snapshot['throughput']
+
+    return snapshot
+
+
+def list_jobs(submitted_by=None):
+    """List jobs (newest first), optionally only those submitted by one officer"""
+    with _jobs_lock:
+        jobs = [
+            {k: v for k, v in job.items() if k not in ('results', 'top_heap', 'errors')}
+            for job in _jobs.values()
+            if submitted_by is None or job['submitted_by'] == submitted_by
+        ]
+    jobs.sort(key=lambda j: j['created_at'], reverse=True)
+    return jobs
+
+
+def cancel_job(job_id):
+    """Stop a job - files that have not started yet are skipped"""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job is None or job['status'] == 'done':
+            return False
+        job['status'] = 'cancelled'
+        job['finished_at'] = time.time()
+        return True
+
+
+def mark_job_saved(job_id):
+    """Record that a finished job's results were saved to the database"""
+    with _jobs_lock:
+        if job_id in _jobs:
+            _jobs[job_id]['saved'] = True
+
+
+def run_in_background(fn, *args, **kwargs):
+    """Run a one-off task (e.g. auto-scoring a new resume) on the background task pool"""
+    return _task_executor.submit(fn, *args, **kwargs)
@@ -1,104 +1,366 @@
-# Home.py
-import streamlit as st
-import nltk
-
-# Download NLTK data on first run
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
-    nltk.download('punkt_tab')
-    nltk.download('stopwords')
-    nltk.download('wordnet')
-    nltk.download('omw-1.4')
-
-# Rest of your existing Home.py code continues below...
 # main.py
+"""
+Headless batch scoring of resume PDFs.
+
+Scores a directory (or glob) of PDFs against selected company/roles with a
+process pool and streams the results to CSV, JSONL or Parquet as they finish
+(Parquet output is a directory with one part file per finished batch).
+
+Examples:
+    python main.py resumes/ --company Google --output scores.csv
+    python main.py "archive/**/*.pdf" --role "Google:Software Engineer" --output scores.jsonl --resume
+"""
+import argparse
+import csv
+import glob
+import json
 import os
-from pdf_processor import extract_text_from_pdf, create_dummy_pdf
-from text_preprocessor import preprocess_text
-from data_manager import JOB_SKILL_DATABASE
-from matcher import match_resume_to_job
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from company_database import COMPANY_JOB_SKILLS
+
+OUTPUT_FIELDS = ['file', 'company', 'job_role', 'ats_score', 'semantic_score', 'combined_score',
+                 'matched_skills', 'missing_skills', 'error']
 
-def process_resume_from_pdf(pdf_path):
+
+# ============ INPUTS ============
+
+def collect_pdfs(inputs):
+    """Expand files, directories (searched recursively) and glob patterns into a sorted list of PDFs"""
+    paths = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = glob.glob(os.path.join(item, "**", "*.pdf"), recursive=True)
+        elif os.path.isfile(item):
+            matches = [item]
+        else:
+            matches = glob.glob(item, recursive=True)
+        paths.update(os.path.normpath(p) for p in matches if p.lower().endswith(".pdf"))
+    return sorted(paths)
+
+
+def select_roles(companies=None, roles=None):
     """
-    Extracts text from a PDF resume and then preprocesses it.
+    Pick the (company, job_role) pairs to score.
+
+    Args:
+        companies (list): Score every role of these companies.
+        roles (list): "Company:Role" strings for individual roles.
+
+    Returns:
+        list: (company, job_role) pairs (every role when nothing is selected).
     """
-    raw_text = extract_text_from_pdf(pdf_path)
-    if raw_text:
-        processed_text = preprocess_text(raw_text)
-        return processed_text
-    return ""
+    selected = []
+    for company in companies or []:
+        if company not in COMPANY_JOB_SKILLS:
+            raise ValueError(f"Unknown company: {company}")
+        selected.extend((company, role) for role in COMPANY_JOB_SKILLS[company])
 
-if __name__ == "__main__":
-    print("=" * 60)
-    print("SMART HIRING SYSTEM - TESTING PHASE")
-    print("=" * 60)
-    
-    # Create a dummy PDF for testing
-    dummy_pdf_content = """Software Engineer with 3 years of experience in Python development and machine learning.
-Skills include Python, Java, SQL, Data Structures, Algorithms, Cloud Computing (AWS), Web Development.
-Completed projects in data analysis and automated testing.
-Seeking a challenging software engineering role."""
-    
-    dummy_pdf_path = os.path.join("data", "sample_resume_for_test.pdf")
-    
-    # Ensure data directory exists
-    os.makedirs("data", exist_ok=True)
-    
-    print("\n[1/3] Creating and processing sample resume...")
-    try:
-        create_dummy_pdf(dummy_pdf_path, dummy_pdf_content)
-        print(f"✓ Created dummy PDF at: {dummy_pdf_path}")
-        
-        processed_resume_text = process_resume_from_pdf(dummy_pdf_path)
-        
-        if processed_resume_text:
-            print(f"✓ Successfully extracted and preprocessed resume")
-            print(f"   Processed text preview: {processed_resume_text[:100]}...")
+    for spec in roles or []:
+        company, _, role = spec.partition(":")
+        if role not in COMPANY_JOB_SKILLS.get(company, {}):
+            raise ValueError(f"Unknown role: {spec} (expected 'Company:Role')")
+        selected.append((company, role))
+
+    if not selected:
+        selected = [(company, role) for company, company_roles in COMPANY_JOB_SKILLS.items() for role in company_roles]
+    return list(dict.fromkeys(selected))
+
+
+# ============ WORKERS ============
+
+def _init_worker(torch_threads):
+    """Load the model once per worker process, with its share of the cores"""
+    os.environ["TORCH_THREADS"] = str(torch_threads)
+    import matcher  # noqa: F401
+
+
+def score_files(paths, roles):
+    """
+    Extract, preprocess and score a batch of PDFs against every role.
+
+    Resumes in the batch are encoded together and scored in one vectorized pass.
+
+    Returns:
+        list: Output rows (one per file and role, or one error row per failed file).
+    """
+    from pdf_processor import extract_text_from_pdf
+    from text_preprocessor import preprocess_text
+    from matcher import encode_resumes_with_chunks, score_cohort_against_roles, cohort_result
+
+    rows = []
+    valid_paths, processed_texts = [], []
+    for path in paths:
+        error = "Could not extract text from PDF"
+        try:
+            resume_text = extract_text_from_pdf(path)
+        except Exception as e:
+            resume_text, error = "", str(e)
+
+        if resume_text and len(resume_text.strip()) > 50:
+            valid_paths.append(path)
+            processed_texts.append(preprocess_text(resume_text))
         else:
-            print("✗ Failed to process the sample resume.")
-            exit(1)
-    
-    except Exception as e:
-        print(f"✗ An error occurred: {e}")
-        exit(1)
-    
-    print("\n[2/3] Matching resume against job roles...")
-    
-    # Test matching for Software Engineer role
-    test_job_role = "Software Engineer"
-    print(f"\n--- Matching for: {test_job_role} ---")
-    
-    matching_result = match_resume_to_job(processed_resume_text, test_job_role)
-    
-    print(f"\n📊 MATCHING RESULTS:")
-    print(f"   ATS Score (Keyword Match): {matching_result['ats_score']}%")
-    print(f"   Semantic Similarity Score: {matching_result['semantic_score']}%")
-    print(f"   Combined Score: {matching_result['combined_score']}%")
-    
-    print(f"\n✓ Matched Skills ({len(matching_result['matched_skills'])}/{matching_result['total_skills']}):")
-    for skill in matching_result['matched_skills'][:10]:  # Show first 10
-        print(f"   • {skill}")
-    
-    print(f"\n✗ Missing Skills ({len(matching_result['missing_skills'])}):")
-    for skill in matching_result['missing_skills'][:5]:  # Show first 5
-        print(f"   • {skill}")
-    
-    print(f"\n💡 PERSONALIZED FEEDBACK (Top 3 recommendations):")
-    count = 0
-    for skill, course in matching_result['feedback'].items():
-        if count >= 3:
-            break
-        print(f"   {count+1}. {skill}: {course}")
-        count += 1
-    
-    print("\n[3/3] Cleaning up...")
-    if os.path.exists(dummy_pdf_path):
-        os.remove(dummy_pdf_path)
-        print(f"✓ Cleaned up {dummy_pdf_path}")
-    
+            rows.append({'file': path, 'error': error})
+
+    if not valid_paths:
+        return rows
+
+    # One model pass gives the pooled embeddings and (in "max" mode) the chunk vectors
+    embeddings, chunk_matrices = encode_resumes_with_chunks(processed_texts)
+    scores = score_cohort_against_roles(processed_texts, embeddings, roles, chunk_embeddings=chunk_matrices)
+    for i, path in enumerate(valid_paths):
+        for r in range(len(scores['roles'])):
+            result = cohort_result(scores, i, r)
+            rows.append({
+                'file': path,
+                'company': result['company'],
+                'job_role': result['job_role'],
+                'ats_score': result['ats_score'],
+                'semantic_score': result['semantic_score'],
+                'combined_score': result['combined_score'],
+                'matched_skills': result['matched_skills'],
+                'missing_skills': result['missing_skills'],
+                'error': None
+            })
+    return rows
+
+
+# ============ OUTPUT ============
+
+def detect_format(output_path, fmt=None):
+    """Output format from --format or the file extension"""
+    if fmt:
+        return fmt
+    ext = os.path.splitext(output_path)[1].lower()
+    return {'.csv': 'csv', '.jsonl': 'jsonl', '.json': 'jsonl', '.parquet': 'parquet'}.get(ext, 'csv')
+
+
+def _parquet_parts(directory):
+    """Finished part files of a Parquet output directory, in write order"""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(glob.glob(os.path.join(directory, "part-*.parquet")))
+
+
+def _truncate_partial_line(path):
+    """Drop a half-written last line left behind by an interrupted run"""
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+
+def read_completed(output_path, fmt):
+    """
+    Read what a previous (possibly interrupted) run already wrote.
+
+    Returns:
+        tuple: (set of (file, company, job_role) rows written, set of files that failed)
+    """
+    scored, failed = set(), set()
+    if not os.path.exists(output_path):
+        return scored, failed
+
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        # A single file from older runs, or a directory of part files
+        parts = [output_path] if os.path.isfile(output_path) else _parquet_parts(output_path)
+        records = [record for part in parts
+                   for record in pq.read_table(part, columns=['file', 'company', 'job_role', 'error']).to_pylist()]
+    else:
+        _truncate_partial_line(output_path)
+        with open(output_path, newline="", encoding="utf-8") as f:
+            if fmt == 'csv':
+                records = list(csv.DictReader(f))
+            else:
+                records = [json.loads(line) for line in f if line.strip()]
+
+    for record in records:
+        if record.get('error'):
+            failed.add(record['file'])
+        else:
+            scored.add((record['file'], record['company'], record['job_role']))
+    return scored, failed
+
+
+class ResultWriter:
+    """Append rows to a CSV, JSONL or Parquet file as batches finish"""
+
+    def __init__(self, output_path, fmt, append=False):
+        self.output_path = output_path
+        self.fmt = fmt
+
+        if fmt == 'parquet':
+            import pyarrow.parquet as pq
+            self._pq = pq
+            # Parquet files can't be appended to - every batch becomes its own part file,
+            # so a killed run keeps all finished batches and --resume can read them back
+            if os.path.isfile(output_path):
+                # Single-file output of an older run - its rows become the first part when resuming
+                legacy_path = output_path + ".old"
+                os.replace(output_path, legacy_path)
+                os.makedirs(output_path)
+                if append:
+                    os.replace(legacy_path, os.path.join(output_path, "part-00000.parquet"))
+                else:
+                    os.remove(legacy_path)
+            os.makedirs(output_path, exist_ok=True)
+            if not append:
+                for part in _parquet_parts(output_path):
+                    os.remove(part)
+            parts = _parquet_parts(output_path)
+            self._next_part = int(os.path.basename(parts[-1])[5:-8]) + 1 if parts else 0
+            return
+
+        write_header = not (append and os.path.exists(output_path) and os.path.getsize(output_path) > 0)
+        self._file = open(output_path, "a" if append else "w", newline="", encoding="utf-8")
+        if fmt == 'csv':
+            self._csv = csv.DictWriter(self._file, fieldnames=OUTPUT_FIELDS)
+            if write_header:
+                self._csv.writeheader()
+
+    def write(self, rows):
+        if not rows:
+            return
+        rows = [{field: row.get(field) for field in OUTPUT_FIELDS} for row in rows]
+
+        if self.fmt == 'parquet':
+            import pyarrow as pa
+            table = pa.Table.from_pylist(rows, schema=self._schema())
+            name = f"part-{self._next_part:05d}.parquet"
+            # Write under a hidden name (skipped by Parquet readers) and rename once complete
+            temp_path = os.path.join(self.output_path, "." + name)
+            self._pq.write_table(table, temp_path)
+            os.replace(temp_path, os.path.join(self.output_path, name))
+            self._next_part += 1
+            return
+
+        if self.fmt == 'csv':
+            for row in rows:
+                row['matched_skills'] = "; ".join(row['matched_skills'] or [])
+                row['missing_skills'] = "; ".join(row['missing_skills'] or [])
+            self._csv.writerows(rows)
+        else:
+            for row in rows:
+                self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+        # Flush every batch so an interrupted run can be resumed
+        self._file.flush()
+
+    @staticmethod
+    def _schema():
+        import pyarrow as pa
+        return pa.schema([
+            ('file', pa.string()), ('company', pa.string()), ('job_role', pa.string()),
+            ('ats_score', pa.float64()), ('semantic_score', pa.float64()), ('combined_score', pa.float64()),
+            ('matched_skills', pa.list_(pa.string())), ('missing_skills', pa.list_(pa.string())),
+            ('error', pa.string())
+        ])
+
+    def close(self):
+        if self.fmt != 'parquet':
+            self._file.close()
+
+
+# ============ DRIVER ============
+
+def run_batch(paths, roles, output_path, fmt, workers, batch_size, resume=False):
+    """
+    Score every PDF with a process pool, writing rows as batches complete.
+
+    Returns:
+        dict: Run statistics (files, rows, failures, seconds, files_per_second).
+    """
+    if resume:
+        scored, failed = read_completed(output_path, fmt)
+        todo = [p for p in paths if p not in failed and any((p, c, r) not in scored for c, r in roles)]
+        print(f"Resuming: {len(paths) - len(todo)} of {len(paths)} file(s) already in {output_path}")
+    else:
+        scored, todo = set(), list(paths)
+
+    stats = {'files': 0, 'rows': 0, 'failures': 0, 'seconds': 0.0, 'files_per_second': 0.0}
+    if not todo:
+        return stats
+
+    batches = [todo[i:i + batch_size] for i in range(0, len(todo), batch_size)]
+    torch_threads = max(1, (os.cpu_count() or 1) // workers)
+    writer = ResultWriter(output_path, fmt, append=resume)
+    start = time.time()
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(torch_threads,)) as pool:
+            futures = {pool.submit(score_files, batch, roles): batch for batch in batches}
+            for future in as_completed(futures):
+                batch = futures[future]
+                try:
+                    rows = future.result()
+                except BrokenProcessPool:
+                    # A worker died (e.g. out of memory) - stop here so --resume can pick up later
+                    raise
+                except Exception as e:
+                    rows = [{'file': path, 'error': str(e)} for path in batch]
+
+                # Only write rows a previous run didn't already produce
+                rows = [row for row in rows if row.get('error') or (row['file'], row['company'], row['job_role']) not in scored]
+                writer.write(rows)
+
+                stats['files'] += len(batch)
+                stats['rows'] += len(rows)
+                stats['failures'] += len({row['file'] for row in rows if row.get('error')})
+
+                elapsed = time.time() - start
+                rate = stats['files'] / elapsed if elapsed > 0 else 0.0
+                eta = (len(todo) - stats['files']) / rate if rate else 0.0
+                print(f"[{stats['files']}/{len(todo)}] {rate:.1f} resumes/s, ETA {eta:.0f}s, {stats['failures']} failed",
+                      flush=True)
+    finally:
+        writer.close()
+
+    stats['seconds'] = round(time.time() - start, 2)
+    stats['files_per_second'] = round(stats['files'] / stats['seconds'], 2) if stats['seconds'] else 0.0
+    return stats
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Score resume PDFs against company job roles without the web app.")
+    parser.add_argument("inputs", nargs="+", help="PDF files, directories or glob patterns")
+    parser.add_argument("--company", action="append", help="Score every role of this company (repeatable)")
+    parser.add_argument("--role", action="append", help="Score one role as 'Company:Role' (repeatable)")
+    parser.add_argument("-o", "--output", default="scores.csv", help="Output file (default: scores.csv)")
+    parser.add_argument("--format", choices=["csv", "jsonl", "parquet"], help="Output format (default: from the extension)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=16, help="Resumes encoded together per task (default: 16)")
+    parser.add_argument("--resume", action="store_true", help="Skip files already present in the output file (failed files are not retried)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    try:
+        roles = select_roles(args.company, args.role)
+    except ValueError as e:
+        print(f"✗ {e}")
+        return 1
+
+    paths = collect_pdfs(args.inputs)
+    if not paths:
+        print("✗ No PDF files found.")
+        return 1
+
+    fmt = detect_format(args.output, args.format)
+    print(f"Scoring {len(paths)} resume(s) against {len(roles)} role(s) with {args.workers} worker(s) -> {args.output} ({fmt})")
+
+    stats = run_batch(paths, roles, args.output, fmt, max(1, args.workers), max(1, args.batch_size), resume=args.resume)
+
     print("\n" + "=" * 60)
-    print("✓ ALL TESTS COMPLETED SUCCESSFULLY!")
+    print(f"✓ Scored {stats['files']} resume(s) in {stats['seconds']}s "
+          f"({stats['files_per_second']} resumes/s, {stats['rows']} rows written, {stats['failures']} failed)")
     print("=" * 60)
-    print("\nNext step: Run the Streamlit app with 'streamlit run app.py'")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
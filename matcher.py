@@ -1,15 +1,276 @@
 # matcher.py
+import collections
+import os
+import threading
 from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 from company_database import COMPANY_JOB_SKILLS, SKILL_COURSE_MAP
+from ranking_weights import combine_scores, get_role_weights
+from admission import configure_torch_threads
+from metrics import timed
+
+# Stored embeddings are tagged with the model name so a model change invalidates them
+MODEL_NAME = 'all-MiniLM-L6-v2'
+
+# Chunked encoding: MiniLM only sees the first 256 word pieces, so long resumes
+# can be split into overlapping word windows that are encoded together and pooled.
+# RESUME_CHUNK_POOLING: "none" (truncate, original behaviour), "mean" or "max"
+# ("max" keeps per-chunk vectors and takes the best chunk per role at scoring time).
+CHUNK_POOLING = os.getenv("RESUME_CHUNK_POOLING", "none")
+CHUNK_WORDS = int(os.getenv("RESUME_CHUNK_WORDS", "160"))
+CHUNK_OVERLAP = int(os.getenv("RESUME_CHUNK_OVERLAP", "32"))
+MAX_CHUNKS = int(os.getenv("RESUME_MAX_CHUNKS", "8"))
+ENCODE_BATCH_SIZE = int(os.getenv("ENCODE_BATCH_SIZE", "64"))
+
+# Soft ATS: also count a skill as matched when some word/bigram of the resume is
+# semantically close to it (catches "kubernetes" vs "kubernet", synonyms).
+SOFT_ATS = os.getenv("SOFT_ATS", "0") == "1"
+SOFT_ATS_THRESHOLD = float(os.getenv("SOFT_ATS_THRESHOLD", "0.75"))
+SOFT_ATS_MAX_SEGMENTS = int(os.getenv("SOFT_ATS_MAX_SEGMENTS", "1024"))
+# Segment embeddings kept in memory (most resumes share most of their words)
+SOFT_ATS_SEGMENT_CACHE = int(os.getenv("SOFT_ATS_SEGMENT_CACHE", "200000"))
+
+# Tag stored with cached embeddings - changes whenever the stored vector would
+# differ (another model or chunking settings), so stale cached rows are re-encoded
+if CHUNK_POOLING == "none":
+    EMBEDDING_VERSION = MODEL_NAME
+else:
+    EMBEDDING_VERSION = f"{MODEL_NAME}|chunks{CHUNK_WORDS}-{CHUNK_OVERLAP}-{MAX_CHUNKS}"
 
 # Load the S-BERT model (this happens once when the module is imported)
 print("Loading S-BERT model... (this may take a moment)")
-model = SentenceTransformer('all-MiniLM-L6-v2')
+configure_torch_threads()
+model = SentenceTransformer(MODEL_NAME)
+# Time every model call (see metrics.py)
+model.encode = timed("encode")(model.encode)
 print("S-BERT model loaded successfully!")
 
-def match_resume_to_job(processed_resume_text, company_name, job_role):
+# Job description embeddings only depend on the skills database, so encode each once
+_job_embedding_cache = {}
+# Same for individual skills (used by soft ATS)
+_skill_embedding_cache = {}
+# Resume words/bigrams (soft ATS), least recently used first
+_segment_embedding_cache = collections.OrderedDict()
+_segment_cache_lock = threading.Lock()
+
+
+def split_into_chunks(processed_resume_text, chunk_words=CHUNK_WORDS, overlap=CHUNK_OVERLAP, max_chunks=MAX_CHUNKS):
+    """
+    Split a preprocessed resume into overlapping word windows.
+
+    At most max_chunks windows are returned so worst-case cost stays bounded.
+    """
+    words = processed_resume_text.split()
+    if len(words) <= chunk_words:
+        return [processed_resume_text]
+
+    step = max(1, chunk_words - overlap)
+    chunks = []
+    for start in range(0, len(words), step):
+        chunks.append(" ".join(words[start:start + chunk_words]))
+        if start + chunk_words >= len(words) or len(chunks) >= max_chunks:
+            break
+    return chunks
+
+
+def encode_resume_chunks(processed_resume_texts):
+    """
+    Encode every chunk of many resumes in one batched model call.
+
+    Returns:
+        list: One (num_chunks x D) float32 matrix per resume.
+    """
+    chunk_lists = [split_into_chunks(text) for text in processed_resume_texts]
+    flat = [chunk for chunks in chunk_lists for chunk in chunks]
+    if not flat:
+        return []
+    embeddings = model.encode(flat, batch_size=ENCODE_BATCH_SIZE).astype(np.float32)
+
+    matrices = []
+    start = 0
+    for chunks in chunk_lists:
+        matrices.append(embeddings[start:start + len(chunks)])
+        start += len(chunks)
+    return matrices
+
+
+def encode_resumes(processed_resume_texts):
+    """
+    Encode many preprocessed resumes into one embedding each.
+
+    Without chunking this is a single batched encode (long resumes are
+    truncated by the model). With chunking, all chunks of all resumes are
+    encoded together and mean-pooled per resume.
+
+    Returns:
+        np.ndarray: N x D float32 matrix.
+    """
+    if CHUNK_POOLING == "none":
+        return model.encode(list(processed_resume_texts), batch_size=ENCODE_BATCH_SIZE).astype(np.float32)
+    return _mean_pool(encode_resume_chunks(processed_resume_texts))
+
+
+def _mean_pool(chunk_matrices):
+    """Average the normalized chunk vectors of each resume into one embedding"""
+    pooled = []
+    for chunk_matrix in chunk_matrices:
+        chunk_matrix = chunk_matrix / np.linalg.norm(chunk_matrix, axis=1, keepdims=True)
+        pooled.append(chunk_matrix.mean(axis=0))
+    return np.vstack(pooled).astype(np.float32)
+
+
+def encode_resumes_with_chunks(processed_resume_texts):
+    """
+    Like encode_resumes(), but in "max" pooling mode also return the chunk
+    matrices the pooled embeddings came from, so both can be cached without
+    encoding the resumes twice.
+
+    Returns:
+        tuple: (N x D float32 matrix, list of chunk matrices or None)
+    """
+    if CHUNK_POOLING != "max":
+        return encode_resumes(processed_resume_texts), None
+    chunk_matrices = encode_resume_chunks(processed_resume_texts)
+    return _mean_pool(chunk_matrices), chunk_matrices
+
+
+def encode_resume(processed_resume_text):
+    """
+    Encode a preprocessed resume into its S-BERT embedding.
+    
+    Args:
+        processed_resume_text (str): The preprocessed resume text.
+    
+    Returns:
+        np.ndarray: 1-D float32 embedding vector.
+    """
+    return encode_resumes([processed_resume_text])[0]
+
+
+def get_job_embedding(job_description_text):
+    """Get the (cached) embedding for a job description text"""
+    if job_description_text not in _job_embedding_cache:
+        _job_embedding_cache[job_description_text] = model.encode([job_description_text])[0].astype(np.float32)
+    return _job_embedding_cache[job_description_text]
+
+
+def get_job_embeddings(job_description_texts):
+    """Get embeddings for many job descriptions, encoding the uncached ones in one batch"""
+    missing = [text for text in dict.fromkeys(job_description_texts) if text not in _job_embedding_cache]
+    if missing:
+        for text, embedding in zip(missing, model.encode(missing)):
+            _job_embedding_cache[text] = embedding.astype(np.float32)
+    return np.vstack([_job_embedding_cache[text] for text in job_description_texts])
+
+
+def get_skill_embeddings(skills):
+    """Get normalized embeddings for skills, encoding the uncached ones in one batch"""
+    missing = [skill for skill in dict.fromkeys(skills) if skill not in _skill_embedding_cache]
+    if missing:
+        for skill, embedding in zip(missing, model.encode(missing, batch_size=ENCODE_BATCH_SIZE)):
+            _skill_embedding_cache[skill] = (embedding / np.linalg.norm(embedding)).astype(np.float32)
+    return np.vstack([_skill_embedding_cache[skill] for skill in skills])
+
+
+def get_segment_embeddings(segments):
+    """
+    Get normalized embeddings for resume segments, encoding the uncached ones in one batch.
+
+    Unlike skills, segments are unbounded, so the cache keeps the
+    SOFT_ATS_SEGMENT_CACHE most recently used ones.
+    """
+    with _segment_cache_lock:
+        found = {}
+        for segment in segments:
+            embedding = _segment_embedding_cache.get(segment)
+            if embedding is not None:
+                _segment_embedding_cache.move_to_end(segment)
+                found[segment] = embedding
+    missing = [segment for segment in dict.fromkeys(segments) if segment not in found]
+
+    if missing:
+        embeddings = model.encode(missing, batch_size=ENCODE_BATCH_SIZE).astype(np.float32)
+        embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+        found.update(zip(missing, embeddings))
+        with _segment_cache_lock:
+            _segment_embedding_cache.update(zip(missing, embeddings))
+            while len(_segment_embedding_cache) > SOFT_ATS_SEGMENT_CACHE:
+                _segment_embedding_cache.popitem(last=False)
+    return np.vstack([found[segment] for segment in segments])
+
+
+def resume_segments(processed_resume_text, max_segments=SOFT_ATS_MAX_SEGMENTS):
+    """Distinct words and word bigrams of a resume, in order of appearance (capped)"""
+    words = processed_resume_text.split()
+    bigrams = [f"{a} {b}" for a, b in zip(words, words[1:])]
+    return list(dict.fromkeys(words + bigrams))[:max_segments]
+
+
+@timed("ats")
+def skill_presence(processed_resume_texts, skills, soft_ats=None):
+    """
+    Decide which skills each resume contains.
+
+    Exact substring matching always applies. With soft ATS, the segments of all
+    resumes are embedded in one batch and a skills x segments similarity matrix
+    is thresholded, so close variants and synonyms also count. Segments shared
+    by several resumes are embedded once, and embeddings are cached across calls.
+
+    Args:
+        processed_resume_texts (list): Preprocessed resume texts (N).
+        skills (list): Skills to look for (S).
+        soft_ats (bool): Override the SOFT_ATS setting.
+
+    Returns:
+        np.ndarray: N x S boolean matrix.
+    """
+    n = len(processed_resume_texts)
+    presence = np.array(
+        [[skill in text for skill in skills] for text in processed_resume_texts],
+        dtype=bool
+    ).reshape(n, len(skills))
+
+    if soft_ats is None:
+        soft_ats = SOFT_ATS
+    if not soft_ats or n == 0 or not skills:
+        return presence
+
+    segment_lists = [resume_segments(text) for text in processed_resume_texts]
+    distinct = list(dict.fromkeys(segment for segments in segment_lists for segment in segments))
+    if not distinct:
+        return presence
+
+    skill_embeddings = get_skill_embeddings(skills)
+    column = {segment: j for j, segment in enumerate(distinct)}
+
+    # S x distinct_segments similarity, then the best of each resume's segments for each skill
+    similarities = skill_embeddings @ get_segment_embeddings(distinct).T
+    for i, segments in enumerate(segment_lists):
+        if segments:
+            columns = [column[segment] for segment in segments]
+            presence[i] |= similarities[:, columns].max(axis=1) >= SOFT_ATS_THRESHOLD
+    return presence
+
+
+def build_job_description(company_name, job_role, required_skills):
+    """Text that stands in for the job description when computing semantic similarity"""
+    return f"Required skills for {job_role} at {company_name}: {', '.join(required_skills)}."
+
+
+def build_feedback(missing_skills):
+    """Map each missing skill to a course recommendation"""
+    feedback = {}
+    for skill in missing_skills:
+        if skill in SKILL_COURSE_MAP:
+            feedback[skill] = SKILL_COURSE_MAP[skill]
+        else:
+            feedback[skill] = f"Consider learning about '{skill}' through online resources."
+    return feedback
+
+
+def match_resume_to_job(processed_resume_text, company_name, job_role, resume_embedding=None, soft_ats=None,
+                        chunk_embeddings=None):
     """
     Complete matching function using company-specific job role skills.
     
@@ -17,6 +278,11 @@ def match_resume_to_job(processed_resume_text, company_name, job_role):
         processed_resume_text (str): The preprocessed resume text.
         company_name (str): The company name
         job_role (str): The job role to match against.
+        resume_embedding (array-like): Precomputed embedding of the resume. When
+            given, the model is not run on the resume again.
+        soft_ats (bool): Also count semantically close skills (defaults to SOFT_ATS).
+        chunk_embeddings (array-like): Precomputed chunk matrix of the resume,
+            used in "max" pooling mode (encoded if None).
     
     Returns:
         dict: Complete matching results with scores and feedback.
@@ -34,8 +300,10 @@ def match_resume_to_job(processed_resume_text, company_name, job_role):
     matched_skills = []
     missing_skills = []
     
-    for skill in required_skills:
-        if skill in processed_resume_text:
+    presence = skill_presence([processed_resume_text], required_skills, soft_ats)[0]
+    
+    for skill, present in zip(required_skills, presence):
+        if present:
             matched_skills.append(skill)
         else:
             missing_skills.append(skill)
@@ -43,22 +311,27 @@ def match_resume_to_job(processed_resume_text, company_name, job_role):
     ats_score = (len(matched_skills) / len(required_skills)) * 100 if required_skills else 0
     
     # Calculate semantic similarity
-    job_description_text = f"Required skills for {job_role} at {company_name}: {', '.join(required_skills)}."
-    resume_embedding = model.encode([processed_resume_text])
-    job_embedding = model.encode([job_description_text])
-    similarity = cosine_similarity(resume_embedding, job_embedding)[0][0]
+    job_description_text = build_job_description(company_name, job_role, required_skills)
+    job_embedding = get_job_embedding(job_description_text)
+    if CHUNK_POOLING == "max":
+        if chunk_embeddings is None:
+            chunk_embeddings = encode_resume_chunks([processed_resume_text])[0]
+        normalized_job = (job_embedding / np.linalg.norm(job_embedding)).reshape(1, -1)
+        similarity = max_sim_scores([chunk_embeddings], normalized_job)[0][0]
+    else:
+        if resume_embedding is None:
+            resume_embedding = encode_resume(processed_resume_text)
+        similarity = cosine_similarity(
+            np.asarray(resume_embedding, dtype=np.float32).reshape(1, -1),
+            job_embedding.reshape(1, -1)
+        )[0][0]
     semantic_score = similarity * 100
     
     # Get feedback
-    feedback = {}
-    for skill in missing_skills:
-        if skill in SKILL_COURSE_MAP:
-            feedback[skill] = SKILL_COURSE_MAP[skill]
-        else:
-            feedback[skill] = f"Consider learning about '{skill}' through online resources."
+    feedback = build_feedback(missing_skills)
     
     # Combined score
-    combined_score = (ats_score + semantic_score) / 2
+    combined_score = combine_scores(ats_score, semantic_score, get_role_weights(company_name, job_role))
     
     return {
         'company': company_name,
@@ -71,3 +344,234 @@ def match_resume_to_job(processed_resume_text, company_name, job_role):
         'total_skills': len(required_skills),
         'feedback': feedback
     }
+
+
+def get_all_roles():
+    """List every (company, job role) pair in the skills database"""
+    return [(company, role) for company, roles in COMPANY_JOB_SKILLS.items() for role in roles]
+
+
+def _build_role_matrix(roles):
+    """
+    Build the data needed to score many roles at once.
+
+    Returns:
+        tuple: (vocabulary list, roles x skills incidence matrix, skills per role,
+                job embedding matrix normalized to unit length)
+    """
+    vocabulary = sorted({skill for company, role in roles for skill in COMPANY_JOB_SKILLS[company][role]})
+    skill_index = {skill: i for i, skill in enumerate(vocabulary)}
+
+    incidence = np.zeros((len(roles), len(vocabulary)), dtype=np.float32)
+    for r, (company, role) in enumerate(roles):
+        for skill in COMPANY_JOB_SKILLS[company][role]:
+            incidence[r, skill_index[skill]] = 1.0
+
+    job_texts = [build_job_description(company, role, COMPANY_JOB_SKILLS[company][role]) for company, role in roles]
+    job_embeddings = get_job_embeddings(job_texts)
+    job_embeddings /= np.linalg.norm(job_embeddings, axis=1, keepdims=True)
+
+    return vocabulary, incidence, incidence.sum(axis=1), job_embeddings
+
+
+def max_sim_scores(chunk_embeddings, job_embeddings):
+    """
+    Max-sim pooling: for each resume, the best cosine similarity of any of its
+    chunks against each (normalized) job embedding.
+
+    Returns:
+        np.ndarray: N x R similarity matrix.
+    """
+    counts = [len(chunks) for chunks in chunk_embeddings]
+    stacked = np.vstack(chunk_embeddings).astype(np.float32)
+    stacked /= np.linalg.norm(stacked, axis=1, keepdims=True)
+
+    # One product for all chunks of all resumes, then a segmented max per resume
+    similarities = stacked @ job_embeddings.T
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    return np.maximum.reduceat(similarities, offsets, axis=0)
+
+
+def score_cohort_against_roles(processed_resume_texts, resume_embeddings, roles=None, chunk_embeddings=None, soft_ats=None):
+    """
+    Score many resumes against many roles in one batched pass.
+
+    Args:
+        processed_resume_texts (list): Preprocessed resume texts (N).
+        resume_embeddings (array-like): N x D matrix of resume embeddings.
+        roles (list): (company, job_role) pairs to score. Defaults to every role.
+        chunk_embeddings (list): Optional per-resume chunk matrices from
+            encode_resume_chunks(). When given (computed automatically in "max"
+            pooling mode), the semantic score is the best chunk for each role
+            instead of the single resume vector.
+        soft_ats (bool): Also count semantically close skills (defaults to SOFT_ATS).
+
+    Returns:
+        dict: 'roles' (R valid pairs), 'vocabulary' (S skills), 'presence'
+              (N x S bool), and 'ats_scores', 'semantic_scores',
+              'combined_scores' as N x R float arrays (percentages).
+    """
+    if roles is None:
+        roles = get_all_roles()
+    roles = [(c, r) for c, r in roles if c in COMPANY_JOB_SKILLS and r in COMPANY_JOB_SKILLS[c]]
+
+    n = len(processed_resume_texts)
+    if not roles or n == 0:
+        empty = np.zeros((n, len(roles)), dtype=np.float32)
+        return {'roles': roles, 'vocabulary': [], 'presence': np.zeros((n, 0), dtype=bool),
+                'ats_scores': empty, 'semantic_scores': empty, 'combined_scores': empty}
+
+    vocabulary, incidence, skill_counts, job_embeddings = _build_role_matrix(roles)
+
+    # ATS: each distinct skill is looked up once per resume -> N x S presence matrix
+    presence = skill_presence(processed_resume_texts, vocabulary, soft_ats)
+    matched_counts = presence.astype(np.float32) @ incidence.T
+    ats_scores = matched_counts / np.maximum(skill_counts, 1) * 100
+
+    # Semantic: cosine similarity of every resume against every role in one product
+    if chunk_embeddings is None and CHUNK_POOLING == "max":
+        chunk_embeddings = encode_resume_chunks(processed_resume_texts)
+    if chunk_embeddings is not None:
+        semantic_scores = max_sim_scores(chunk_embeddings, job_embeddings) * 100
+    else:
+        resume_matrix = np.asarray(resume_embeddings, dtype=np.float32).reshape(n, -1)
+        resume_matrix = resume_matrix / np.linalg.norm(resume_matrix, axis=1, keepdims=True)
+        semantic_scores = (resume_matrix @ job_embeddings.T) * 100
+
+    return {
+        'roles': roles,
+        'vocabulary': vocabulary,
+        'presence': presence,
+        'ats_scores': ats_scores,
+        'semantic_scores': semantic_scores,
+        'combined_scores': combine_scores(ats_scores, semantic_scores, {
+            'ats': np.array([get_role_weights(c, r)['ats'] for c, r in roles], dtype=np.float32),
+            'semantic': np.array([get_role_weights(c, r)['semantic'] for c, r in roles], dtype=np.float32)
+        })
+    }
+
+
+def cohort_result(scores, i, r):
+    """Build a match_resume_to_job()-style result for resume i and role r of a cohort score"""
+    company, role = scores['roles'][r]
+    required_skills = COMPANY_JOB_SKILLS[company][role]
+    present = {skill for skill, hit in zip(scores['vocabulary'], scores['presence'][i]) if hit}
+    matched_skills = [skill for skill in required_skills if skill in present]
+    missing_skills = [skill for skill in required_skills if skill not in present]
+
+    return {
+        'company': company,
+        'job_role': role,
+        'ats_score': round(float(scores['ats_scores'][i, r]), 2),
+        'semantic_score': round(float(scores['semantic_scores'][i, r]), 2),
+        'combined_score': round(float(scores['combined_scores'][i, r]), 2),
+        'matched_skills': matched_skills,
+        'missing_skills': missing_skills,
+        'total_skills': len(required_skills),
+        'feedback': build_feedback(missing_skills)
+    }
+
+
+def score_resume_against_roles(processed_resume_text, resume_embedding=None, roles=None, chunk_embeddings=None):
+    """
+    Score one resume against many roles using a single embedding and vectorized ATS.
+
+    Each distinct skill is looked up in the resume once, and role scores come
+    from one matrix product instead of a loop over roles.
+
+    Args:
+        processed_resume_text (str): The preprocessed resume text.
+        resume_embedding (array-like): Precomputed resume embedding (encoded if None).
+        roles (list): (company, job_role) pairs to score. Defaults to every role.
+        chunk_embeddings (array-like): Precomputed chunk matrix ("max" pooling mode).
+
+    Returns:
+        list: One result dict per role, in the same format as match_resume_to_job().
+    """
+    if resume_embedding is None:
+        resume_embedding = encode_resume(processed_resume_text)
+
+    scores = score_cohort_against_roles([processed_resume_text], [resume_embedding], roles,
+                                        chunk_embeddings=None if chunk_embeddings is None else [chunk_embeddings])
+    return [cohort_result(scores, 0, r) for r in range(len(scores['roles']))]
+
+
+def simulate_skill_impact(processed_resume_text, company_name, job_role, resume_embedding=None, chunk_embeddings=None):
+    """
+    Estimate how much learning each missing skill would raise the scores.
+
+    The ATS gain is exact (one more matched skill out of the role's total).
+    The semantic gain comes from encoding every "resume + skill" variant in a
+    single batched call and comparing with the base embedding. In "max"
+    pooling mode the base is the best-matching chunk (as in the analysis
+    score) and the skill is added to that chunk.
+
+    Args:
+        processed_resume_text (str): The preprocessed resume text.
+        company_name (str): The company name.
+        job_role (str): The job role.
+        resume_embedding (array-like): Cached embedding of the resume (encoded if None).
+        chunk_embeddings (array-like): Cached chunk matrix of the resume ("max"
+            pooling mode, encoded if None).
+
+    Returns:
+        list: One dict per missing skill (skill, ats_delta, semantic_delta,
+              combined_delta, new_combined_score, course), highest impact first.
+    """
+    if company_name not in COMPANY_JOB_SKILLS or job_role not in COMPANY_JOB_SKILLS[company_name]:
+        return []
+
+    required_skills = COMPANY_JOB_SKILLS[company_name][job_role]
+    presence = skill_presence([processed_resume_text], required_skills)[0]
+    missing_skills = [skill for skill, present in zip(required_skills, presence) if not present]
+    if not missing_skills:
+        return []
+
+    weights = get_role_weights(company_name, job_role)
+    job_embedding = get_job_embedding(build_job_description(company_name, job_role, required_skills))
+    job_vector = job_embedding / np.linalg.norm(job_embedding)
+
+    if CHUNK_POOLING == "max":
+        if chunk_embeddings is None:
+            chunk_embeddings = encode_resume_chunks([processed_resume_text])[0]
+        chunk_matrix = np.asarray(chunk_embeddings, dtype=np.float32)
+        chunk_similarities = (chunk_matrix / np.linalg.norm(chunk_matrix, axis=1, keepdims=True)) @ job_vector
+        best = int(np.argmax(chunk_similarities))
+        base_semantic = float(chunk_similarities[best]) * 100
+        other_best = float(np.delete(chunk_similarities, best).max(initial=-1.0)) * 100
+
+        # Add the skill to the best-matching chunk; the score is still the best chunk overall
+        best_chunk = split_into_chunks(processed_resume_text)[best]
+        variants = model.encode([f"{skill} {best_chunk}" for skill in missing_skills],
+                                batch_size=ENCODE_BATCH_SIZE).astype(np.float32)
+        variants /= np.linalg.norm(variants, axis=1, keepdims=True)
+        semantic_deltas = np.maximum((variants @ job_vector) * 100, other_best) - base_semantic
+    else:
+        if resume_embedding is None:
+            resume_embedding = encode_resume(processed_resume_text)
+        base_vector = np.asarray(resume_embedding, dtype=np.float32)
+        base_semantic = float(base_vector @ job_vector / np.linalg.norm(base_vector)) * 100
+
+        # Prepend the skill so it survives the model's input truncation
+        variants = encode_resumes([f"{skill} {processed_resume_text}" for skill in missing_skills])
+        variants /= np.linalg.norm(variants, axis=1, keepdims=True)
+        semantic_deltas = (variants @ job_vector) * 100 - base_semantic
+
+    base_ats = presence.sum() / len(required_skills) * 100
+    base_combined = float(combine_scores(base_ats, base_semantic, weights))
+    ats_delta = 100 / len(required_skills)
+
+    impacts = []
+    for skill, semantic_delta in zip(missing_skills, semantic_deltas):
+        combined_delta = float(combine_scores(ats_delta, float(semantic_delta), weights))
+        impacts.append({
+            'skill': skill,
+            'ats_delta': round(ats_delta, 2),
+            'semantic_delta': round(float(semantic_delta), 2),
+            'combined_delta': round(combined_delta, 2),
+            'new_combined_score': round(base_combined + combined_delta, 2),
+            'course': build_feedback([skill])[skill]
+        })
+
+    impacts.sort(key=lambda x: x['combined_delta'], reverse=True)
+    return impacts
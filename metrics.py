@@ -0,0 +1,269 @@
+# metrics.py
+import collections
+import contextvars
+import functools
+import inspect
+import json
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Expose Prometheus text format on this port (e.g. 9100); unset = no endpoint
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+# Interface the endpoint listens on (set to 0.0.0.0 to let other hosts scrape it)
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+# Append a JSON snapshot to METRICS_LOG_FILE every N seconds; 0 = off
+METRICS_LOG_INTERVAL = float(os.getenv("METRICS_LOG_INTERVAL", "0"))
+METRICS_LOG_FILE = os.getenv("METRICS_LOG_FILE", "metrics.jsonl")
+# Also log every finished trace (one line per Analyze click / bulk file)
+METRICS_LOG_TRACES = os.getenv("METRICS_LOG_TRACES", "0") == "1"
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_lock = threading.Lock()
+_histograms = {}
+_counters = collections.Counter()
+_recent_traces = collections.deque(maxlen=200)
+
+# Id of the request the current thread/context is working on
+_trace = contextvars.ContextVar("trace", default=None)
+# Innermost stage being timed (see record_error())
+_stage = contextvars.ContextVar("stage", default=None)
+
+
+# ============ RECORDING ============
+
+def observe(stage, seconds):
+    """Add one duration (seconds) to a stage's histogram"""
+    with _lock:
+        hist = _histograms.get(stage)
+        if hist is None:
+            hist = _histograms[stage] = {'buckets': [0] * len(BUCKETS), 'sum': 0.0, 'count': 0}
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                hist['buckets'][i] += 1
+                break
+        hist['sum'] += seconds
+        hist['count'] += 1
+
+    current = _trace.get()
+    if current is not None:
+        current['stages'].append((stage, round(seconds * 1000, 3)))
+
+
+def increment(name, amount=1):
+    """Increase a counter"""
+    with _lock:
+        _counters[name] += amount
+
+
+def record_error(stage=None):
+    """
+    Count a failure of a stage (default: the one currently being timed).
+
+    For code that handles its own exceptions, such as the database
+    functions that log and return None - stage_timer() never sees those.
+    """
+    stage = stage or _stage.get()
+    if stage is not None:
+        increment(f"{stage}.errors")
+
+
+@contextmanager
+def stage_timer(stage):
+    """Time the with-block as one call of a pipeline stage"""
+    token = _stage.set(stage)
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        increment(f"{stage}.errors")
+        raise
+    finally:
+        observe(stage, time.perf_counter() - start)
+        _stage.reset(token)
+
+
+def timed(stage):
+    """Decorator form of stage_timer()"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage_timer(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _references(code, name):
+    """Whether a code object (or one nested in it, e.g. a comprehension) uses a global name"""
+    return name in code.co_names or any(
+        _references(const, name) for const in code.co_consts if inspect.iscode(const)
+    )
+
+
+def instrument_module(module, prefix, uses):
+    """
+    Wrap the public functions of a module that use the global `uses` (e.g. the
+    database client) with timed(f"{prefix}.{name}"); pure helpers are left alone.
+    """
+    for name, value in list(vars(module).items()):
+        if (inspect.isfunction(value) and not name.startswith("_") and value.__module__ == module.__name__
+                and _references(value.__code__, uses)):
+            setattr(module, name, timed(f"{prefix}.{name}")(value))
+
+
+# ============ TRACES ============
+
+@contextmanager
+def trace(name):
+    """
+    Tie every stage recorded inside the with-block to one trace id.
+
+    Yields:
+        str: The trace id (also returned by current_trace_id()).
+    """
+    record = {'trace_id': uuid.uuid4().hex[:16], 'name': name, 'started_at': time.time(), 'stages': []}
+    token = _trace.set(record)
+    start = time.perf_counter()
+    try:
+        yield record['trace_id']
+    finally:
+        _trace.reset(token)
+        record['duration_ms'] = round((time.perf_counter() - start) * 1000, 3)
+        observe(f"request.{name}", record['duration_ms'] / 1000)
+        with _lock:
+            _recent_traces.append(record)
+        if METRICS_LOG_TRACES:
+            _append_log({'type': 'trace', **record})
+
+
+def current_trace_id():
+    """Trace id of the request being handled, or None outside a trace"""
+    current = _trace.get()
+    return current['trace_id'] if current else None
+
+
+def recent_traces(limit=20):
+    """The most recently finished traces, newest first"""
+    with _lock:
+        return list(_recent_traces)[::-1][:limit]
+
+
+# ============ EXPORT ============
+
+def snapshot():
+    """All histograms (with p50/p95 estimated from the buckets) and counters as a dict"""
+    with _lock:
+        histograms = {stage: {'buckets': list(h['buckets']), 'sum': h['sum'], 'count': h['count']}
+                      for stage, h in _histograms.items()}
+        counters = dict(_counters)
+
+    for hist in histograms.values():
+        hist['mean_ms'] = round(hist['sum'] / hist['count'] * 1000, 3) if hist['count'] else None
+        hist['p50_ms'] = _bucket_quantile(hist, 0.5)
+        hist['p95_ms'] = _bucket_quantile(hist, 0.95)
+    return {'timestamp': time.time(), 'histograms': histograms, 'counters': counters}
+
+
+def _bucket_quantile(hist, q):
+    """Upper bucket bound containing the q-quantile (ms); None past the last bucket"""
+    target = q * hist['count']
+    seen = 0
+    for bound, count in zip(BUCKETS, hist['buckets']):
+        seen += count
+        if seen >= target and hist['count']:
+            return bound * 1000
+    return None
+
+
+def _metric_name(stage):
+    return "".join(c if c.isalnum() else "_" for c in stage)
+
+
+def render_prometheus():
+    """Render all metrics in the Prometheus text exposition format"""
+    data = snapshot()
+    lines = [
+        "# HELP resume_stage_duration_seconds Time spent per pipeline stage / database call",
+        "# TYPE resume_stage_duration_seconds histogram"
+    ]
+    for stage, hist in sorted(data['histograms'].items()):
+        cumulative = 0
+        for bound, count in zip(BUCKETS, hist['buckets']):
+            cumulative += count
+            lines.append(f'resume_stage_duration_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+        lines.append(f'resume_stage_duration_seconds_bucket{{stage="{stage}",le="+Inf"}} {hist["count"]}')
+        lines.append(f'resume_stage_duration_seconds_sum{{stage="{stage}"}} {hist["sum"]}')
+        lines.append(f'resume_stage_duration_seconds_count{{stage="{stage}"}} {hist["count"]}')
+
+    for name, value in sorted(data['counters'].items()):
+        metric = f"resume_{_metric_name(name)}_total"
+        lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric} {value}")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") not in ("", "/metrics"):
+            self.send_error(404)
+            return
+        body = render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _append_log(entry):
+    try:
+        with open(METRICS_LOG_FILE, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+    except OSError as e:
+        print(f"Error writing metrics log: {e}")
+
+
+def _log_periodically(interval):
+    while True:
+        time.sleep(interval)
+        _append_log({'type': 'snapshot', **snapshot()})
+
+
+_started = False
+
+
+def start_exporters(port=METRICS_PORT, log_interval=METRICS_LOG_INTERVAL, host=METRICS_HOST):
+    """Start the Prometheus endpoint and/or periodic JSON log (once, in the main process only)"""
+    global _started
+    # Pool workers (main.py, roster imports) import this module too - only their parent exports.
+    # Spawned workers import it before parent_process() is set, but already carry their own name.
+    if multiprocessing.parent_process() is not None or multiprocessing.current_process().name != "MainProcess":
+        return
+    with _lock:
+        if _started:
+            return
+        _started = True
+
+    if port:
+        try:
+            server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+            print(f"Metrics available at http://{host}:{port}/metrics")
+        except OSError as e:
+            print(f"Error starting metrics endpoint: {e}")
+
+    if log_interval > 0:
+        threading.Thread(target=_log_periodically, args=(log_interval,), name="metrics-log", daemon=True).start()
+
+
+start_exporters()
@@ -0,0 +1,66 @@
+-- 001_resume_cache.sql
+-- Schema changes for the resume cache, analysis reuse and ranking features.
+-- Run once in the Supabase SQL editor (or psql) before starting the app;
+-- every statement is idempotent, so re-running the file is safe.
+
+-- ============ STUDENT RESUMES ============
+-- Cached preprocessing/encoding of each resume version (resume_cache.py).
+-- A row is re-encoded whenever preprocess_version or embedding_model no
+-- longer match the running code, so these columns may be NULL.
+ALTER TABLE student_resumes ADD COLUMN IF NOT EXISTS processed_text TEXT;
+ALTER TABLE student_resumes ADD COLUMN IF NOT EXISTS embedding REAL[];
+ALTER TABLE student_resumes ADD COLUMN IF NOT EXISTS preprocess_version TEXT;
+ALTER TABLE student_resumes ADD COLUMN IF NOT EXISTS embedding_model TEXT;
+-- Per-chunk vectors, only written with RESUME_CHUNK_POOLING=max
+ALTER TABLE student_resumes ADD COLUMN IF NOT EXISTS chunk_embeddings JSONB;
+-- Base64-packed MinHash signature for near-duplicate detection (near_duplicates.py)
+ALTER TABLE student_resumes ADD COLUMN IF NOT EXISTS minhash TEXT;
+ALTER TABLE student_resumes ADD COLUMN IF NOT EXISTS minhash_version TEXT;
+
+-- Current resumes are paged by id (get_all_current_resumes)
+CREATE INDEX IF NOT EXISTS student_resumes_current_id_idx
+    ON student_resumes (id) WHERE is_current;
+
+-- ============ SKILLS VERSIONING ============
+-- Hash of each role's skill list when its analyses were last synced (skills_versioning.py)
+CREATE TABLE IF NOT EXISTS role_skill_versions (
+    company_name TEXT NOT NULL,
+    job_role TEXT NOT NULL,
+    skills_hash TEXT NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (company_name, job_role)
+);
+
+-- Role skills hash each analysis was scored against; NULL for rows written
+-- before skills versioning, which are therefore never reused as current.
+ALTER TABLE analysis_history ADD COLUMN IF NOT EXISTS skills_hash TEXT;
+
+-- Lookup used to reuse a stored analysis (get_analysis_for_resume_version)
+CREATE INDEX IF NOT EXISTS analysis_history_reuse_idx
+    ON analysis_history (student_email, company_name, job_role, resume_version, skills_hash);
+
+-- ============ ANALYSIS SOURCE ============
+-- Who wrote an analysis: 'student' (the student's own run), 'auto'
+-- (auto-scoring after an upload) or 'rescore' (after a skills change).
+-- History views only show 'student' rows, so rows written before this
+-- column existed are backfilled as 'student' and new rows default to it.
+ALTER TABLE analysis_history ADD COLUMN IF NOT EXISTS source TEXT;
+UPDATE analysis_history SET source = 'student' WHERE source IS NULL;
+ALTER TABLE analysis_history ALTER COLUMN source SET DEFAULT 'student';
+ALTER TABLE analysis_history ALTER COLUMN source SET NOT NULL;
+
+CREATE INDEX IF NOT EXISTS analysis_history_student_source_idx
+    ON analysis_history (student_email, source, analyzed_at DESC);
+
+-- ============ PUBLISHED RANKINGS ============
+-- ATS/semantic weights a ranking was published with (ranking_weights.py);
+-- NULL for rankings published before re-weighting existed.
+ALTER TABLE published_rankings ADD COLUMN IF NOT EXISTS weights JSONB;
+
+-- ============ ANALYSIS WRITE-BEHIND ============
+-- Unique per analysis row (database.build_analysis_row), so a batch retried
+-- after a partial insert skips rows already written (write_behind.py).
+-- NULL for older rows; NULLs never conflict.
+ALTER TABLE analysis_history ADD COLUMN IF NOT EXISTS idempotency_key TEXT;
+CREATE UNIQUE INDEX IF NOT EXISTS analysis_history_idempotency_key_idx
+    ON analysis_history (idempotency_key);
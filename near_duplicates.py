@@ -0,0 +1,251 @@
+# near_duplicates.py
+import base64
+import os
+import zlib
+import numpy as np
+from text_preprocessor import preprocess_text, PREPROCESS_VERSION
+
+# Hash functions per signature (more = better Jaccard estimates, larger signatures)
+NUM_PERM = int(os.getenv("MINHASH_PERMUTATIONS", "128"))
+# Words per shingle of the preprocessed text
+SHINGLE_SIZE = int(os.getenv("MINHASH_SHINGLE_SIZE", "3"))
+# Default Jaccard similarity above which two resumes are reported
+DUPLICATE_THRESHOLD = float(os.getenv("DUPLICATE_THRESHOLD", "0.8"))
+# LSH buckets larger than this are linked to their first member instead of pairwise
+MAX_BUCKET_PAIRS = int(os.getenv("DUPLICATE_MAX_BUCKET", "50"))
+
+# Stored signatures are only reused when this matches (bump when hashing changes)
+MINHASH_VERSION = f"{PREPROCESS_VERSION}-{NUM_PERM}-{SHINGLE_SIZE}-1"
+
+_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.RandomState(1)
+_A = _rng.randint(1, (1 << 31) - 1, size=NUM_PERM).astype(np.uint64)
+_B = _rng.randint(0, (1 << 31) - 1, size=NUM_PERM).astype(np.uint64)
+
+
+# ============ SIGNATURES ============
+
+def shingle_hashes(processed_text, size=SHINGLE_SIZE):
+    """32-bit hashes of the distinct word shingles of a preprocessed text"""
+    tokens = (processed_text or "").split()
+    if len(tokens) < size:
+        shingles = {" ".join(tokens)} if tokens else set()
+    else:
+        shingles = {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+    return np.fromiter((zlib.crc32(s.encode()) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+
+def minhash_signature(processed_text):
+    """
+    MinHash signature of a preprocessed text.
+
+    Returns:
+        np.ndarray: NUM_PERM uint32 values; two signatures agree in a position
+                    with probability equal to the texts' shingle Jaccard similarity.
+    """
+    hashes = shingle_hashes(processed_text)
+    if len(hashes) == 0:
+        return np.full(NUM_PERM, (1 << 31) - 1, dtype=np.uint32)
+    # (a * x + b) mod p for every shingle x and hash function (a, b), then the minimum per function
+    permuted = (hashes[:, None] * _A[None, :] + _B[None, :]) % _PRIME
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def encode_signature(signature):
+    """Pack a signature into a short base64 string for the minhash column"""
+    return base64.b64encode(np.asarray(signature, dtype='<u4').tobytes()).decode('ascii')
+
+
+def decode_signature(value):
+    """Inverse of encode_signature()"""
+    return np.frombuffer(base64.b64decode(value), dtype='<u4').astype(np.uint32)
+
+
+def minhash_fields(processed_text):
+    """minhash / minhash_version columns for a resume row"""
+    return {
+        'minhash': encode_signature(minhash_signature(processed_text)),
+        'minhash_version': MINHASH_VERSION
+    }
+
+
+def get_signatures(resumes):
+    """
+    Signature matrix for resume rows, reusing stored signatures.
+
+    Rows without a current signature get one computed (from the cached
+    processed_text when possible) and written back.
+
+    Returns:
+        np.ndarray: (len(resumes), NUM_PERM) uint32 matrix.
+    """
+    from database import update_resume_cache
+
+    signatures = np.zeros((len(resumes), NUM_PERM), dtype=np.uint32)
+    for i, resume in enumerate(resumes):
+        if resume.get('minhash') and resume.get('minhash_version') == MINHASH_VERSION:
+            signatures[i] = decode_signature(resume['minhash'])
+            continue
+
+        if resume.get('processed_text') is not None and resume.get('preprocess_version') == PREPROCESS_VERSION:
+            processed_text = resume['processed_text']
+        else:
+            processed_text = preprocess_text(resume.get('resume_text') or "")
+        fields = minhash_fields(processed_text)
+        signatures[i] = decode_signature(fields['minhash'])
+        resume.update(fields)
+        if resume.get('id') is not None:
+            update_resume_cache(resume['id'], fields)
+    return signatures
+
+
+# ============ LSH ============
+
+def lsh_params(threshold, num_perm=NUM_PERM):
+    """
+    Choose (bands, rows per band) for a Jaccard threshold.
+
+    Pairs with similarity s share a bucket with probability 1 - (1 - s^r)^b,
+    which rises steeply around (1/b)^(1/r). The highest such point at or
+    below the threshold is picked, favouring recall; false candidates are
+    dropped when signatures are compared.
+    """
+    options = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    below = [(b, r) for b, r in options if (1 / b) ** (1 / r) <= threshold]
+    if not below:
+        return options[-1]
+    return max(below, key=lambda br: (1 / br[0]) ** (1 / br[1]))
+
+
+def candidate_pairs(signatures, bands, rows):
+    """
+    Index pairs (i < j) sharing at least one LSH band bucket.
+
+    Returns:
+        np.ndarray: (pairs, 2) int64 array without duplicates.
+    """
+    n = len(signatures)
+    found = []
+    for band in range(bands):
+        chunk = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        keys = chunk.view(np.dtype((np.void, chunk.dtype.itemsize * rows))).ravel()
+        _, bucket_of, sizes = np.unique(keys, return_inverse=True, return_counts=True)
+        bucket_of = bucket_of.ravel()
+
+        shared = np.flatnonzero(sizes[bucket_of] > 1)
+        if len(shared) == 0:
+            continue
+        # Group members of each shared bucket together
+        shared = shared[np.argsort(bucket_of[shared], kind='stable')]
+        starts = np.flatnonzero(np.r_[True, bucket_of[shared][1:] != bucket_of[shared][:-1]])
+        for members in np.split(shared, starts[1:]):
+            if len(members) <= MAX_BUCKET_PAIRS:
+                i, j = np.triu_indices(len(members), k=1)
+                found.append(np.column_stack([members[i], members[j]]))
+            else:
+                found.append(np.column_stack([np.full(len(members) - 1, members[0]), members[1:]]))
+
+    if not found:
+        return np.zeros((0, 2), dtype=np.int64)
+    pairs = np.vstack(found).astype(np.int64)
+    codes = np.unique(pairs[:, 0] * n + pairs[:, 1])
+    return np.column_stack([codes // n, codes % n])
+
+
+def estimate_similarity(signatures, pairs, chunk_size=50000):
+    """Estimated Jaccard similarity of each pair (share of equal signature positions)"""
+    similarity = np.zeros(len(pairs), dtype=np.float32)
+    for start in range(0, len(pairs), chunk_size):
+        chunk = pairs[start:start + chunk_size]
+        similarity[start:start + chunk_size] = (signatures[chunk[:, 0]] == signatures[chunk[:, 1]]).mean(axis=1)
+    return similarity
+
+
+def find_near_duplicates(signatures, threshold=DUPLICATE_THRESHOLD):
+    """
+    Near-duplicate pairs of a signature matrix.
+
+    Returns:
+        tuple: ((pairs, 2) index array, similarity per pair, number of LSH candidates)
+    """
+    if len(signatures) < 2:
+        return np.zeros((0, 2), dtype=np.int64), np.zeros(0, dtype=np.float32), 0
+    bands, rows = lsh_params(threshold, signatures.shape[1])
+    pairs = candidate_pairs(signatures, bands, rows)
+    similarity = estimate_similarity(signatures, pairs)
+    keep = similarity >= threshold
+    return pairs[keep], similarity[keep], len(pairs)
+
+
+def cluster_pairs(pairs):
+    """Group indices connected by near-duplicate pairs (union-find); returns lists of indices"""
+    parent = {}
+
+    def find(x):
+        parent.setdefault(x, x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for i, j in pairs.tolist():
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    clusters = {}
+    for x in parent:
+        clusters.setdefault(find(x), []).append(x)
+    return sorted((sorted(members) for members in clusters.values()), key=lambda m: (-len(m), m[0]))
+
+
+# ============ REPORT ============
+
+def near_duplicate_report(threshold=DUPLICATE_THRESHOLD):
+    """
+    Find groups of near-identical current resumes across all students.
+
+    Returns:
+        dict: 'resumes' (count checked), 'candidates' (LSH pairs compared),
+              'pairs' (list of {student_a, student_b, similarity}) and
+              'clusters' (list of {'students': [...], 'max_similarity',
+              'min_similarity'}), largest cluster first.
+    """
+    from database import get_all_current_resumes, get_all_students
+
+    resumes = get_all_current_resumes()
+    signatures = get_signatures(resumes)
+    pairs, similarity, candidates = find_near_duplicates(signatures, threshold)
+    names = {s['email']: s['name'] for s in get_all_students()}
+
+    def describe(i):
+        resume = resumes[i]
+        return {
+            'student_email': resume['student_email'],
+            'student_name': names.get(resume['student_email'], "Unknown"),
+            'resume_version': resume['version_number'],
+            'resume_filename': resume['resume_filename']
+        }
+
+    groups = cluster_pairs(pairs)
+    cluster_of = {i: c for c, members in enumerate(groups) for i in members}
+    scores = [[] for _ in groups]
+    for (i, _), s in zip(pairs.tolist(), similarity.tolist()):
+        scores[cluster_of[i]].append(s)
+
+    clusters = [{
+        'students': [describe(i) for i in members],
+        'max_similarity': round(max(cluster_scores), 3),
+        'min_similarity': round(min(cluster_scores), 3)
+    } for members, cluster_scores in zip(groups, scores)]
+
+    return {
+        'resumes': len(resumes),
+        'candidates': candidates,
+        'pairs': [{
+            'student_a': resumes[pairs[p, 0]]['student_email'],
+            'student_b': resumes[pairs[p, 1]]['student_email'],
+            'similarity': round(float(similarity[p]), 3)
+        } for p in np.argsort(-similarity, kind='stable')],
+        'clusters': clusters
+    }
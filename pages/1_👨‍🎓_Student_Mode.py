@@ -1,21 +1,36 @@
 # pages/1_👨‍🎓_Student_Mode.py
 import streamlit as st
 from pdf_processor import extract_text_from_pdf
-from text_preprocessor import preprocess_text
-from matcher import match_resume_to_job
+from matcher import simulate_skill_impact
+from resume_cache import build_resume_fields, get_resume_features, get_resume_chunks
 from database import (
     save_student_resume, 
     get_current_resume, 
     get_all_resume_versions,
-    save_analysis_result,
     get_student_analysis_history,
     get_company_specific_history
 )
+from auto_scorer import schedule_auto_scoring
+from admission import admitted, AdmissionRejected
+from single_flight import analyze_resume_once
+from metrics import trace
 from datetime import datetime
 import pandas as pd
 
 st.title("👨‍🎓 Student Mode - Resume Analysis")
 
+
+def show_queue_position(placeholder):
+    """Callback that shows the student's place in the analysis queue"""
+    return lambda position: placeholder.info(
+        f"⏳ Many students are analyzing right now - you are #{position} in the queue...")
+
+
+def wait_in_queue(placeholder):
+    """Hold an inference slot, showing the student's place in line while they wait"""
+    return admitted(on_wait=show_queue_position(placeholder))
+
+
 # Check authentication
 if 'logged_in' not in st.session_state or not st.session_state['logged_in']:
     st.warning("⚠️ Please login first!")
@@ -82,9 +97,22 @@ with st.expander("📤 Upload New Resume", expanded=not current_resume):
             resume_text = extract_text_from_pdf(uploaded_file)
             
             if resume_text and len(resume_text.strip()) > 50:
-                result = save_student_resume(student_email, resume_text, uploaded_file.name)
+                # Preprocess and encode once at upload so every analysis is pure scoring
+                queue_notice = st.empty()
+                try:
+                    with wait_in_queue(queue_notice):
+                        cache_fields = build_resume_fields(resume_text)
+                except AdmissionRejected as e:
+                    queue_notice.empty()
+                    st.error(f"❌ {e}")
+                    st.stop()
+                queue_notice.empty()
+                result = save_student_resume(student_email, resume_text, uploaded_file.name, cache_fields=cache_fields)
                 
                 if result:
+                    # Score the new version against every role in the background
+                    schedule_auto_scoring(student_email, result[0])
+                    
                     st.success(f"✅ Resume uploaded successfully as Version {result[0]['version_number']}!")
                     st.balloons()
                     st.rerun()
@@ -176,36 +204,19 @@ if company_name:
     
     if st.button("🚀 Analyze Resume", use_container_width=True, type="primary"):
         with st.spinner("Analyzing your resume..."):
-            # Preprocess resume text
-            processed_text = preprocess_text(current_resume['resume_text'])
-            
-            # Calculate scores using your matcher function
-            results = match_resume_to_job(processed_text, company_name, job_role)
-            
-            # Check for errors
-            if 'error' in results:
-                st.error(f"❌ {results['error']}")
+            queue_notice = st.empty()
+            try:
+                # Identical in-flight requests (double-clicks, reruns) share one computation and one save
+                with trace("analyze"):
+                    results = analyze_resume_once(student_email, current_resume, company_name, job_role,
+                                                  on_wait=show_queue_position(queue_notice))
+            except (AdmissionRejected, ValueError) as e:
+                queue_notice.empty()
+                st.error(f"❌ {e}")
                 st.stop()
+            queue_notice.empty()
             
-            # Convert feedback dict to string for storage
-            feedback_str = str(results['feedback'])
-            
-            # Save to database
-            save_analysis_result(
-                student_email=student_email,
-                company_name=company_name,
-                job_role=job_role,
-                resume_version=current_resume['version_number'],
-                resume_filename=current_resume['resume_filename'],
-                ats_score=results['ats_score'],
-                semantic_score=results['semantic_score'],
-                combined_score=results['combined_score'],
-                matched_skills=results['matched_skills'],
-                missing_skills=results['missing_skills'],
-                feedback=feedback_str
-            )
-            
-            st.success("✅ Analysis complete and saved!")
+            st.success("✅ Analysis complete! Queued for saving - it will appear in your history in a moment.")
             
             # Display results
             st.write("### 📈 Current Analysis Results")
@@ -218,11 +229,17 @@ if company_name:
             
             st.write("---")
             
+            # Compare against this role's analysis of an earlier resume version
+            earlier_analyses = [
+                a for a in previous_analysis
+                if a['job_role'] == job_role and a['resume_version'] != current_resume['version_number']
+            ]
+            
             # Show comparison if previous analysis exists
-            if len(previous_analysis) > 0:
+            if len(earlier_analyses) > 0:
                 st.write("### 📊 Progress Comparison")
                 
-                latest_prev = previous_analysis[0]
+                latest_prev = earlier_analyses[0]
                 
                 col1, col2 = st.columns(2)
                 
@@ -302,3 +319,42 @@ if company_name:
                 else:
                     st.write("*You have all required skills!*")
            
+    
+    st.write("---")
+    
+    # ============ WHAT-IF SKILL IMPACT ============
+    st.write("### 🔮 What-If: Which Skills Should You Learn First?")
+    st.caption(f"Estimates how much each missing skill would raise your score for {company_name} - {job_role}.")
+    
+    if st.button("🔮 Simulate Skill Impact", use_container_width=True):
+        with st.spinner("Simulating each missing skill..."):
+            queue_notice = st.empty()
+            try:
+                with wait_in_queue(queue_notice):
+                    processed_text, resume_embedding = get_resume_features(current_resume)
+                    impacts = simulate_skill_impact(processed_text, company_name, job_role, resume_embedding=resume_embedding,
+                                                    chunk_embeddings=get_resume_chunks(current_resume))
+            except AdmissionRejected as e:
+                queue_notice.empty()
+                st.error(f"❌ {e}")
+                st.stop()
+            queue_notice.empty()
+        
+        if impacts:
+            impact_data = []
+            for rank, impact in enumerate(impacts, 1):
+                impact_data.append({
+                    'Priority': rank,
+                    'Skill': impact['skill'],
+                    'Combined Gain': f"{impact['combined_delta']:+.1f}%",
+                    'ATS Gain': f"{impact['ats_delta']:+.1f}%",
+                    'Semantic Gain': f"{impact['semantic_delta']:+.1f}%",
+                    'New Combined Score': f"{impact['new_combined_score']:.1f}%"
+                })
+            st.dataframe(pd.DataFrame(impact_data), use_container_width=True, hide_index=True)
+            
+            st.write("**📚 Start with these:**")
+            for impact in impacts[:3]:
+                st.info(f"**{impact['skill']}** ({impact['combined_delta']:+.1f}%): {impact['course']}")
+        else:
+            st.success("🎉 You already have every required skill for this role!")
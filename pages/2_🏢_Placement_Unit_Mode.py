@@ -3,13 +3,29 @@ import streamlit as st
 from database import (
     create_announcement, get_all_announcements, delete_announcement, toggle_announcement_status,
     publish_ranking, get_all_rankings, delete_ranking,
-    get_all_student_analyses, get_student_by_email,
+    get_all_student_analyses, get_student_by_email, get_students_by_emails,
     save_student_resume, get_current_resume, save_analysis_result
 )
 from company_database import COMPANY_JOB_SKILLS
+from auth import STUDENT_YEARS, STUDENT_BRANCHES
+from job_queue import submit_bulk_analysis, get_job, list_jobs, cancel_job, mark_job_saved
+from auto_scorer import schedule_auto_scoring
+from ranking_weights import get_role_weights, rerank
+from write_behind import get_write_queue
+from cohort_analytics import get_gap_matrix
+from candidate_search import search_candidates, get_search_index, search_index_size
+from embedding_index import rebuild_index
+from near_duplicates import near_duplicate_report, DUPLICATE_THRESHOLD
+from ranking_export import export_ranking
+from roster_import import read_roster, import_roster, REQUIRED_COLUMNS
+from admission import AdmissionRejected
+import diagnostics
 from datetime import datetime
 import pandas as pd
 import json
+import os
+import time
+import tracemalloc
 
 st.title("🏢 Placement Unit - Officer Dashboard")
 
@@ -26,10 +42,87 @@ officer_email = st.session_state['user_email']
 officer_name = st.session_state['user_name']
 
 st.write(f"**Welcome, {officer_name}!**")
+
+# Status of analysis rows waiting to be written to the database
+write_stats = get_write_queue().stats()
+with st.expander("🗄️ Background Database Writes", expanded=write_stats['failed_batches'] > 0 and write_stats['pending'] > 0):
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Pending Rows", write_stats['pending'])
+    col2.metric("Written", write_stats['written_total'])
+    col3.metric("Failed Batches", write_stats['failed_batches'])
+    col4.metric("Dropped Rows", write_stats['dropped_total'])
+    
+    if write_stats['last_flush_at']:
+        st.caption(f"Last successful write: {datetime.fromtimestamp(write_stats['last_flush_at']).strftime('%H:%M:%S')}")
+    if write_stats['pending'] and write_stats['retry_delay']:
+        st.warning(f"⚠️ Database writes are failing - retrying every {write_stats['retry_delay']:.0f}s")
+    
+    if st.button("🔄 Flush Now", key="flush_write_queue"):
+        written = get_write_queue().flush()
+        st.success(f"✅ Wrote {written} row(s)")
+
+# On-demand profiling of the running server (all sessions and background workers)
+with st.expander("🩺 Diagnostics"):
+    st.caption("Samples every thread's stack for a while and writes a collapsed-stack file for flame graphs "
+               "(flamegraph.pl, speedscope). Memory snapshots list the top allocation sites.")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        profile_seconds = st.slider("Profile duration (seconds)", 5, 120, 30, key="diag_profile_seconds")
+        running = diagnostics.active_profile()
+        if running:
+            st.info(f"⏳ Profiling... started {datetime.fromtimestamp(running['started_at']).strftime('%H:%M:%S')}")
+        elif st.button("▶️ Start Profiler", key="diag_start_profile"):
+            diagnostics.start_profile(profile_seconds)
+            st.rerun()
+    
+    with col2:
+        if tracemalloc.is_tracing():
+            if st.button("📸 Take Memory Snapshot", key="diag_memory_snapshot"):
+                snapshot = diagnostics.memory_snapshot()
+                st.write(f"**Traced:** {snapshot['traced_mb']} MB | **Peak:** {snapshot['peak_mb']} MB")
+                st.dataframe(pd.DataFrame(snapshot['allocations']), use_container_width=True, hide_index=True)
+            if st.button("⏹️ Stop Memory Tracing", key="diag_stop_tracing"):
+                diagnostics.stop_memory_tracing()
+                st.rerun()
+        else:
+            st.caption("Memory tracing is off. Set DIAGNOSTICS_TRACEMALLOC=1 to trace from startup.")
+            if st.button("▶️ Start Memory Tracing", key="diag_start_tracing"):
+                diagnostics.start_memory_tracing()
+                st.rerun()
+    
+    for output in diagnostics.recent_outputs():
+        if output.get('path') and os.path.exists(output['path']):
+            with open(output['path'], 'rb') as f:
+                st.download_button(
+                    f"⬇️ {os.path.basename(output['path'])}",
+                    data=f.read(),
+                    file_name=os.path.basename(output['path']),
+                    key=f"diag_download_{output['path']}"
+                )
+        elif output.get('status') == 'error':
+            st.error(f"❌ Profile failed: {output['error']}")
+
 st.write("---")
 
+
+def score_weight_controls(company, role, key_prefix):
+    """Slider for the ATS/semantic balance of a role; returns the chosen weights"""
+    default = get_role_weights(company, role)
+    ats_weight = st.slider(
+        "⚖️ ATS weight (semantic weight = 1 - ATS weight)",
+        min_value=0.0, max_value=1.0, step=0.05,
+        value=float(default['ats'] / (default['ats'] + default['semantic'])),
+        key=f"{key_prefix}_weight_{company}_{role}"
+    )
+    return {'ats': round(ats_weight, 2), 'semantic': round(1 - ats_weight, 2)}
+
+
 # Create tabs for different functions
-tab1, tab2, tab3 = st.tabs(["📢 Announcements", "🏆 Rank Students", "📋 Manage Published Results"])
+tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
+    "📢 Announcements", "🏆 Rank Students", "📋 Manage Published Results", "📈 Skill Gap Analytics", "🔎 Candidate Search",
+    "🧬 Duplicate Resumes", "👥 Import Students"
+])
 
 # ============ TAB 1: ANNOUNCEMENTS ============
 with tab1:
@@ -107,7 +200,7 @@ with tab2:
     st.subheader("🏆 Rank Students for Company")
     
     # Create sub-tabs for existing analyses and manual upload
-    subtab1, subtab2 = st.tabs(["📊 Rank & Publish", "📤 Upload New Resumes"])
+    subtab1, subtab2, subtab3 = st.tabs(["📊 Rank & Publish", "⚡ Rank from Current Resumes", "📤 Upload New Resumes"])
     
     # ===== SUBTAB 1: RANK EXISTING ANALYSES =====
     with subtab1:
@@ -124,23 +217,45 @@ with tab2:
                 # Get all analyses for this company/role (LATEST per student only)
                 student_analyses = get_all_student_analyses(company_name, job_role)
                 
+                students = get_students_by_emails({a['student_email'] for a in student_analyses})
+                names = {s['email']: s.get('name', "Unknown") for s in students}
+                
+                # Keep the loaded cohort so re-weighting and publishing survive reruns
+                st.session_state['saved_rankings'] = {
+                    'company': company_name,
+                    'job_role': job_role,
+                    'analyses': student_analyses,
+                    'names': {a['student_email']: names.get(a['student_email'], "Unknown") for a in student_analyses}
+                }
+            
+            loaded = st.session_state.get('saved_rankings')
+            
+            if loaded and loaded['company'] == company_name and loaded['job_role'] == job_role:
+                student_analyses = loaded['analyses']
+                
                 if student_analyses:
                     st.success(f"✅ Found {len(student_analyses)} unique students for {company_name} - {job_role}")
                     st.info(f"💡 Showing latest analysis per student (duplicates removed)")
                     
+                    # Component scores as columns -> re-ranking is one vectorized operation
+                    weights = score_weight_controls(company_name, job_role, "saved")
+                    combined, order = rerank(
+                        [a['ats_score'] for a in student_analyses],
+                        [a['semantic_score'] for a in student_analyses],
+                        weights
+                    )
+                    
                     # Create ranking dataframe
                     ranking_data = []
-                    for idx, analysis in enumerate(student_analyses, 1):
-                        # Get student details
-                        student = get_student_by_email(analysis['student_email'])
-                        student_name = student['name'] if student else "Unknown"
+                    for idx, i in enumerate(order, 1):
+                        analysis = student_analyses[i]
                         
                         ranking_data.append({
                             'Rank': idx,
-                            'Student Name': student_name,
+                            'Student Name': loaded['names'].get(analysis['student_email'], "Unknown"),
                             'Email': analysis['student_email'],
                             'Resume Ver.': analysis['resume_version'],
-                            'Combined Score': f"{analysis['combined_score']:.1f}%",
+                            'Combined Score': f"{combined[i]:.1f}%",
                             'ATS': f"{analysis['ats_score']:.1f}%",
                             'Semantic': f"{analysis['semantic_score']:.1f}%",
                             'Date': analysis['analyzed_at'][:10]
@@ -149,6 +264,34 @@ with tab2:
                     df = pd.DataFrame(ranking_data)
                     st.dataframe(df, use_container_width=True, hide_index=True)
                     
+                    # Full export re-reads the database in chunks (all students, per-skill columns)
+                    col1, col2 = st.columns([1, 2])
+                    with col1:
+                        export_format = st.radio("Export format", ["CSV", "Excel"], horizontal=True, key="export_format")
+                    with col2:
+                        if st.button("📥 Prepare Full Export", key="prepare_export"):
+                            with st.spinner("Exporting rankings..."):
+                                path, count = export_ranking(
+                                    company_name, job_role,
+                                    fmt="xlsx" if export_format == "Excel" else "csv",
+                                    weights=weights
+                                )
+                            if path:
+                                st.session_state['ranking_export'] = {'path': path, 'count': count, 'company': company_name, 'job_role': job_role}
+                            else:
+                                st.error("❌ Export failed.")
+                    
+                    export = st.session_state.get('ranking_export')
+                    if export and export['company'] == company_name and export['job_role'] == job_role and os.path.exists(export['path']):
+                        with open(export['path'], 'rb') as f:
+                            st.download_button(
+                                f"⬇️ Download {os.path.basename(export['path'])} ({export['count']} students)",
+                                data=f,
+                                file_name=os.path.basename(export['path']),
+                                mime="text/csv" if export['path'].endswith(".csv") else "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                                key="download_ranking_export"
+                            )
+                    
                     st.write("---")
                     st.subheader("📤 Publish This Ranking")
                     
@@ -177,11 +320,11 @@ with tab2:
                                         'rank': item['Rank'],
                                         'student_name': item['Student Name'],
                                         'student_email': item['Email'],
-                                        'combined_score': float(analysis['combined_score']),
-                                        'ats_score': float(analysis['ats_score']),
-                                        'semantic_score': float(analysis['semantic_score'])
+                                        'combined_score': round(float(combined[i]), 2),
+                                        'ats_score': float(student_analyses[i]['ats_score']),
+                                        'semantic_score': float(student_analyses[i]['semantic_score'])
                                     }
-                                    for item, analysis in zip(ranking_data, student_analyses)
+                                    for item, i in zip(ranking_data, order)
                                 ]
                                 
                                 result = publish_ranking(
@@ -191,21 +334,122 @@ with tab2:
                                     description=result_description,
                                     rankings=rankings_json,
                                     published_by_email=officer_email,
-                                    published_by_name=officer_name
+                                    published_by_name=officer_name,
+                                    weights=weights
                                 )
                                 
                                 if result:
                                     st.success("✅ Rankings published! Students can now view them.")
                                     st.balloons()
-                                    st.rerun()
                                 else:
                                     st.error("❌ Failed to publish rankings.")
                 else:
                     st.warning(f"⚠️ No students have analyzed their resume for {company_name} - {job_role} yet.")
                     st.info("💡 Use the 'Upload New Resumes' tab to manually add student resumes.")
     
-    # ===== SUBTAB 2: MANUAL UPLOAD =====
+    # ===== SUBTAB 2: RANK FROM CURRENT RESUMES =====
     with subtab2:
+        st.write("#### Re-rank every student's current resume against all roles of a company")
+        st.info("📌 Uses each student's latest resume version (not stored analyses), so new uploads and skill changes are reflected.")
+        
+        live_company = st.selectbox("Select Company", sorted(list(COMPANY_JOB_SKILLS.keys())), key="live_rank_company")
+        
+        if st.button("⚡ Rank All Roles from Current Resumes", type="primary", key="live_rank_button"):
+            from cohort_ranking import rank_company_from_current_resumes
+            
+            try:
+                with st.spinner(f"Scoring all current resumes against every {live_company} role..."):
+                    st.session_state['live_rankings'] = {
+                        'company': live_company,
+                        'rankings': rank_company_from_current_resumes(live_company),
+                        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M')
+                    }
+            except AdmissionRejected as e:
+                st.warning(str(e))
+        
+        live = st.session_state.get('live_rankings')
+        
+        if live and live['company'] == live_company:
+            st.caption(f"Generated at {live['generated_at']}")
+            role_names = list(live['rankings'].keys())
+            role_tabs = st.tabs(role_names)
+            
+            for role_idx, (role_tab, role) in enumerate(zip(role_tabs, role_names)):
+                with role_tab:
+                    entries = live['rankings'][role]
+                    
+                    if not entries:
+                        st.warning("⚠️ No student resumes found.")
+                        continue
+                    
+                    st.success(f"✅ Ranked {len(entries)} students for {live_company} - {role}")
+                    
+                    weights = score_weight_controls(live_company, role, "live")
+                    combined, order = rerank(
+                        [e['ats_score'] for e in entries],
+                        [e['semantic_score'] for e in entries],
+                        weights
+                    )
+                    
+                    df = pd.DataFrame([{
+                        'Rank': rank,
+                        'Student Name': entries[i]['student_name'],
+                        'Email': entries[i]['student_email'],
+                        'Resume Ver.': entries[i]['resume_version'],
+                        'Combined Score': f"{combined[i]:.1f}%",
+                        'ATS': f"{entries[i]['ats_score']:.1f}%",
+                        'Semantic': f"{entries[i]['semantic_score']:.1f}%"
+                    } for rank, i in enumerate(order, 1)])
+                    st.dataframe(df, use_container_width=True, hide_index=True)
+                    
+                    with st.form(f"publish_live_ranking_form_{role_idx}"):
+                        result_title = st.text_input(
+                            "Result Title*",
+                            value=f"{live_company} - {role} Rankings",
+                            max_chars=200
+                        )
+                        
+                        result_description = st.text_area(
+                            "Description (Optional)",
+                            placeholder="Add notes about this ranking...",
+                            height=100
+                        )
+                        
+                        if st.form_submit_button("📢 Publish Rankings to Students", type="primary"):
+                            if not result_title:
+                                st.error("❌ Please enter a title!")
+                            else:
+                                rankings_json = [
+                                    {
+                                        'rank': rank,
+                                        'student_name': entries[i]['student_name'],
+                                        'student_email': entries[i]['student_email'],
+                                        'combined_score': round(float(combined[i]), 2),
+                                        'ats_score': entries[i]['ats_score'],
+                                        'semantic_score': entries[i]['semantic_score']
+                                    }
+                                    for rank, i in enumerate(order, 1)
+                                ]
+                                
+                                result = publish_ranking(
+                                    title=result_title,
+                                    company_name=live_company,
+                                    job_role=role,
+                                    description=result_description,
+                                    rankings=rankings_json,
+                                    published_by_email=officer_email,
+                                    published_by_name=officer_name,
+                                    weights=weights
+                                )
+                                
+                                if result:
+                                    st.success("✅ Rankings published! Students can now view them.")
+                                    st.balloons()
+                                else:
+                                    st.error("❌ Failed to publish rankings.")
+    
+    # ===== SUBTAB 3: MANUAL UPLOAD =====
+    with subtab3:
         st.write("#### Manually upload and analyze student resumes")
         st.info("📌 Upload resumes for students who haven't uploaded yet. They will be merged with existing analyses.")
         
@@ -238,49 +482,89 @@ with tab2:
                     for file in uploaded_files:
                         st.write(f"• {file.name}")
                 
+                live_top_k = st.number_input("Live leaderboard size (top K)", min_value=5, max_value=500, value=50, step=5, key="manual_top_k")
+                
                 if st.button("🚀 Analyze All Resumes", type="primary", key="analyze_manual"):
-                    # Lazy import - only load when needed
-                    from pdf_processor import extract_text_from_pdf
-                    from text_preprocessor import preprocess_text
-                    from matcher import match_resume_to_job
+                    # Hand the batch to the background workers so reruns don't kill it
+                    files = [(file.name, file.getvalue()) for file in uploaded_files]
+                    job_id = submit_bulk_analysis(files, company_name_manual, job_role_manual,
+                                                  submitted_by=officer_email, top_k=int(live_top_k))
+                    st.session_state['manual_job_id'] = job_id
+                    st.success(f"✅ Submitted {len(files)} resume(s) as job `{job_id}`")
+            
+            # ===== BACKGROUND JOBS =====
+            my_jobs = list_jobs(submitted_by=officer_email)
+            
+            if my_jobs:
+                st.write("---")
+                st.write("### ⏳ Analysis Jobs")
+                
+                job_ids = [job['id'] for job in my_jobs]
+                if st.session_state.get('manual_job_id') not in job_ids:
+                    st.session_state['manual_job_id'] = job_ids[0]
+                
+                selected_job_id = st.selectbox(
+                    "Select Job",
+                    job_ids,
+                    index=job_ids.index(st.session_state['manual_job_id']),
+                    format_func=lambda jid: next(
+                        f"{j['id']} | {j['company']} - {j['job_role']} | {j['done']}/{j['total']} | {j['status']}"
+                        for j in my_jobs if j['id'] == jid
+                    )
+                )
+                st.session_state['manual_job_id'] = selected_job_id
+                
+                job = get_job(selected_job_id)
+                
+                if job:
+                    running = job['status'] in ('queued', 'running')
                     
-                    progress_bar = st.progress(0)
-                    status_text = st.empty()
+                    st.progress(job['done'] / job['total'] if job['total'] else 1.0)
+                    st.write(f"**{job['company']} - {job['job_role']}** | "
+                             f"Processed {job['done']}/{job['total']} | "
+                             f"✅ {len(job['results'])} analyzed | ❌ {len(job['errors'])} failed | Status: {job['status']}")
                     
-                    results_list = []
+                    # Throughput readout
+                    col1, col2, col3 = st.columns(3)
+                    col1.metric("Throughput", f"{job['throughput']:.2f} resumes/sec")
+                    if running and job['eta_seconds'] is not None:
+                        col2.metric("ETA", f"{int(job['eta_seconds'] // 60)}m {int(job['eta_seconds'] % 60)}s")
+                    else:
+                        col2.metric("ETA", "—")
+                    col3.metric("Remaining", job['total'] - job['done'])
                     
-                    for idx, uploaded_file in enumerate(uploaded_files):
-                        status_text.text(f"Analyzing {uploaded_file.name}...")
-                        
-                        # Extract and process
-                        resume_text = extract_text_from_pdf(uploaded_file)
-                        
-                        if resume_text and len(resume_text.strip()) > 50:
-                            processed_text = preprocess_text(resume_text)
-                            
-                            # Calculate scores
-                            results = match_resume_to_job(processed_text, company_name_manual, job_role_manual)
-                            
-                            if 'error' not in results:
-                                results['filename'] = uploaded_file.name
-                                results['resume_text'] = resume_text
-                                results_list.append(results)
-                        
-                        progress_bar.progress((idx + 1) / len(uploaded_files))
+                    if running:
+                        col1, col2, col3 = st.columns(3)
+                        with col1:
+                            st.button("🔄 Refresh Progress", key="refresh_job")
+                        with col2:
+                            auto_refresh = st.checkbox("Auto-refresh", value=True, key="auto_refresh_job")
+                        with col3:
+                            if st.button("⛔ Cancel Job", key="cancel_job"):
+                                cancel_job(selected_job_id)
+                                st.rerun()
+                    
+                    if job['errors']:
+                        with st.expander(f"❌ Failed Files ({len(job['errors'])})"):
+                            for err in job['errors']:
+                                st.write(f"• {err['filename']}: {err['error']}")
                     
-                    status_text.text("✅ Analysis complete!")
+                    results_list = job['results']
                     
                     if results_list:
-                        st.success(f"✅ Successfully analyzed {len(results_list)} resume(s)!")
-                        
-                        # Show results
-                        st.write("### 📊 Analysis Results")
-                        
-                        # Sort by combined score
-                        results_list.sort(key=lambda x: x['combined_score'], reverse=True)
+                        if running:
+                            # Stream the live top-K leaderboard while the tail is still scoring
+                            st.write(f"### 📊 Live Top {job['top_k']} (of {len(results_list)} scored so far)")
+                            table_rows = job['top_results']
+                        else:
+                            st.write("### 📊 Analysis Results")
+                            
+                            # Sort by combined score
+                            results_list.sort(key=lambda x: x['combined_score'], reverse=True)
+                            table_rows = results_list
                         
                         preview_data = []
-                        for idx, result in enumerate(results_list, 1):
+                        for idx, result in enumerate(table_rows, 1):
                             preview_data.append({
                                 'Rank': idx,
                                 'File Name': result['filename'],
@@ -290,7 +574,11 @@ with tab2:
                             })
                         
                         st.dataframe(pd.DataFrame(preview_data), use_container_width=True, hide_index=True)
-                        
+                    
+                    if not running and results_list and job['saved']:
+                        st.success(f"✅ Results of job `{selected_job_id}` have already been saved.")
+                    
+                    elif not running and results_list:
                         st.write("---")
                         st.write("### 📤 Assign to Students & Save")
                         st.warning("⚠️ Assign each resume to a registered student email to save the analysis.")
@@ -304,7 +592,7 @@ with tab2:
                                 email_assignments[idx] = st.text_input(
                                     f"{result['filename']}",
                                     placeholder="student@sctce.ac.in",
-                                    key=f"email_{idx}"
+                                    key=f"email_{selected_job_id}_{idx}"
                                 )
                             
                             save_button = st.form_submit_button("💾 Save Analyses", type="primary")
@@ -335,7 +623,8 @@ with tab2:
                                         save_student_resume(
                                             student_email=student_email,
                                             resume_text=result['resume_text'],
-                                            filename=result['filename']
+                                            filename=result['filename'],
+                                            cache_fields=result['cache_fields']
                                         )
                                         
                                         # Get the resume version that was just saved
@@ -344,8 +633,8 @@ with tab2:
                                         # Save analysis
                                         save_analysis_result(
                                             student_email=student_email,
-                                            company_name=company_name_manual,
-                                            job_role=job_role_manual,
+                                            company_name=job['company'],
+                                            job_role=job['job_role'],
                                             resume_version=current_resume['version_number'],
                                             resume_filename=result['filename'],
                                             ats_score=result['ats_score'],
@@ -355,12 +644,23 @@ with tab2:
                                             missing_skills=result['missing_skills'],
                                             feedback=str(result['feedback'])
                                         )
+                                        
+                                        # Cover the remaining roles so rankings include this student everywhere
+                                        schedule_auto_scoring(student_email, current_resume,
+                                                              skip_roles=[(job['company'], job['job_role'])])
                                     
+                                    mark_job_saved(selected_job_id)
                                     st.success(f"✅ All {len(results_list)} resume(s) saved successfully!")
                                     st.info("💡 Go back to 'Rank & Publish' tab to see the updated rankings with newly added students.")
                                     st.balloons()
-                    else:
+                    
+                    elif not running:
                         st.error("❌ No valid resumes could be analyzed.")
+                    
+                    # Poll the worker pool until the job finishes
+                    if running and auto_refresh:
+                        time.sleep(2)
+                        st.rerun()
             
             st.write("---")
             st.write("#### 🔄 After Uploading")
@@ -390,6 +690,9 @@ with tab3:
                 st.write(f"**Published by:** {ranking['published_by_name']}")
                 st.write(f"**Date:** {ranking['created_at'][:16]}")
                 
+                if ranking.get('weights'):
+                    st.write(f"**Score Weights:** ATS {ranking['weights']['ats']:.2f} | Semantic {ranking['weights']['semantic']:.2f}")
+                
                 if ranking['description']:
                     st.info(f"**Description:** {ranking['description']}")
                 
@@ -415,3 +718,304 @@ with tab3:
                     st.rerun()
     else:
         st.info("📭 No published rankings yet.")
+
+
+# ============ TAB 4: SKILL GAP ANALYTICS ============
+with tab4:
+    st.subheader("📈 Skill Gaps Across Students")
+    st.info("📌 Based on each student's latest analysis per role. A skill counts as a gap when it is missing for a role and not matched for any other.")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        gap_company = st.selectbox("Company", ["All Companies"] + sorted(list(COMPANY_JOB_SKILLS.keys())), key="gap_company")
+    with col2:
+        gap_roles = ["All Roles"] + (list(COMPANY_JOB_SKILLS[gap_company].keys()) if gap_company != "All Companies" else [])
+        gap_role = st.selectbox("Job Role", gap_roles, key="gap_role")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        load_gaps = st.button("📊 Load Analytics", type="primary", key="gap_load")
+    with col2:
+        refresh = st.button("🔄 Refresh Data", key="gap_refresh")
+    
+    # Built only on request - this tab also renders on every job-progress rerun
+    gap_selection = (gap_company, gap_role)
+    if load_gaps or refresh:
+        with st.spinner("Loading analyses..."):
+            st.session_state['gap_analytics'] = {
+                'selection': gap_selection,
+                'matrix': get_gap_matrix(
+                    None if gap_company == "All Companies" else gap_company,
+                    None if gap_role == "All Roles" else gap_role,
+                    refresh=refresh
+                )
+            }
+    
+    gap_state = st.session_state.get('gap_analytics')
+    matrix = gap_state['matrix'] if gap_state and gap_state['selection'] == gap_selection else None
+    
+    if matrix is None:
+        st.info("👆 Click 'Load Analytics' to analyze skill gaps for this selection.")
+    elif matrix.num_students == 0:
+        st.warning("⚠️ No analyses found for this selection yet.")
+    else:
+        col1, col2 = st.columns(2)
+        with col1:
+            branch_filter = st.multiselect("Branch", sorted(set(matrix.branches)), key="gap_branches")
+        with col2:
+            year_filter = st.multiselect("Year", sorted(set(matrix.years)), key="gap_years")
+        mask = matrix.mask(branch_filter, year_filter)
+        
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Students", int(mask.sum()))
+        col2.metric("Skills Tracked", len(matrix.skills))
+        col3.metric("Analyses", int(matrix.roles_analyzed[mask].sum()))
+        st.caption(f"Data as of {datetime.fromtimestamp(matrix.built_at).strftime('%H:%M:%S')}")
+        
+        if not mask.any():
+            st.warning("⚠️ No students match these filters.")
+        else:
+            top_gaps = matrix.top_gaps(limit=20, mask=mask)
+            if not top_gaps:
+                st.success("🎉 No skill gaps for these students!")
+            else:
+                st.write("#### 🎯 Most Common Missing Skills")
+                gaps_df = pd.DataFrame([{
+                    'Skill': g['skill'],
+                    'Students Missing': g['students'],
+                    '% of Students': g['share']
+                } for g in top_gaps])
+                st.bar_chart(gaps_df.set_index('Skill')['Students Missing'])
+                st.dataframe(gaps_df, use_container_width=True, hide_index=True)
+                
+                st.write("#### 🔗 Skills Missing Together")
+                st.caption("Number of students missing both skills - good candidates for a combined training session.")
+                skills, together = matrix.co_occurrence(limit=10, mask=mask)
+                st.dataframe(pd.DataFrame(together, index=skills, columns=skills), use_container_width=True)
+                
+                st.write("#### 🏫 Breakdown")
+                breakdown_by = st.radio("Group by", ["Branch", "Year"], horizontal=True, key="gap_breakdown_by")
+                groups, sizes, skills, counts = matrix.breakdown(by=breakdown_by.lower(), limit=10, mask=mask)
+                breakdown_df = pd.DataFrame(counts, index=groups, columns=skills)
+                breakdown_df.insert(0, 'Students', sizes)
+                st.dataframe(breakdown_df, use_container_width=True)
+
+
+# ============ TAB 5: CANDIDATE SEARCH ============
+with tab5:
+    st.subheader("🔎 Search Students by Skills or Job Description")
+    st.info("📌 Combines keyword matches (BM25) with resume similarity, over every student's current resume.")
+    
+    with st.form("candidate_search_form"):
+        search_query = st.text_area(
+            "Search*",
+            placeholder="e.g. kubernetes aws docker - or paste a full job description",
+            height=100
+        )
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            search_years = st.multiselect("Year", STUDENT_YEARS)
+        with col2:
+            search_branches = st.multiselect("Branch", STUDENT_BRANCHES)
+        with col3:
+            search_limit = st.number_input("Results", min_value=5, max_value=200, value=25, step=5)
+        
+        use_semantic = st.checkbox("Include resume similarity (slower on the first search)", value=True)
+        search_clicked = st.form_submit_button("🔎 Search", type="primary")
+    
+    if search_clicked:
+        if not search_query.strip():
+            st.error("❌ Please enter a search query!")
+        else:
+            filters = {}
+            if search_years:
+                filters['year'] = search_years
+            if search_branches:
+                filters['branch'] = search_branches
+            
+            start = time.perf_counter()
+            try:
+                with st.spinner("Searching..."):
+                    results = search_candidates(search_query, k=int(search_limit), filters=filters, semantic=use_semantic)
+            except AdmissionRejected as e:
+                st.warning(str(e))
+                results = None
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            
+            if results is None:
+                pass  # Queue full - already explained by the warning above
+            elif not results:
+                st.warning("⚠️ No matching students found.")
+            else:
+                names = {s['email']: s['name'] for s in get_students_by_emails([r['student_email'] for r in results])}
+                st.success(f"✅ {len(results)} student(s) in {elapsed_ms:.0f} ms")
+                st.dataframe(pd.DataFrame([{
+                    'Rank': rank,
+                    'Student Name': names.get(r['student_email'], "Unknown"),
+                    'Email': r['student_email'],
+                    'Year': r['year'],
+                    'Branch': r['branch'],
+                    'Keyword Rank': r['keyword_rank'],
+                    'Similarity Rank': r['semantic_rank'],
+                    'Matched Terms': ", ".join(r['matched_terms']),
+                    'Score': r['score']
+                } for rank, r in enumerate(results, 1)]), use_container_width=True, hide_index=True)
+    
+    with st.expander("⚙️ Search Index"):
+        indexed = search_index_size()
+        st.write(f"**Students in keyword index:** {indexed if indexed is not None else 'not built yet (built on first search)'}")
+        st.caption("Both indexes are updated automatically when a student uploads a new resume. Rebuild after bulk database changes.")
+        if st.button("🔄 Rebuild Search Indexes", key="rebuild_search_index"):
+            try:
+                with st.spinner("Rebuilding keyword and embedding indexes from current resumes..."):
+                    get_search_index(rebuild=True)
+                    rebuilt = rebuild_index()
+                st.success(f"✅ Keyword and embedding indexes rebuilt ({rebuilt} students)")
+            except AdmissionRejected as e:
+                st.warning(str(e))
+
+
+# ============ TAB 6: DUPLICATE RESUMES ============
+with tab6:
+    st.subheader("🧬 Near-Duplicate Resumes")
+    st.info("📌 Finds current resumes with nearly the same wording (copied or shared templates), which can distort rankings.")
+    
+    dup_threshold = st.slider(
+        "Similarity threshold",
+        min_value=0.5, max_value=1.0, step=0.05, value=DUPLICATE_THRESHOLD,
+        help="Estimated share of 3-word phrases the two resumes have in common",
+        key="dup_threshold"
+    )
+    
+    if st.button("🔍 Find Duplicates", type="primary", key="dup_find"):
+        with st.spinner("Comparing resumes..."):
+            st.session_state['duplicate_report'] = {
+                'threshold': dup_threshold,
+                'report': near_duplicate_report(dup_threshold),
+                'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M')
+            }
+    
+    dup = st.session_state.get('duplicate_report')
+    if dup:
+        report = dup['report']
+        st.caption(f"Generated at {dup['generated_at']} with threshold {dup['threshold']:.2f}")
+        
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Resumes Checked", report['resumes'])
+        col2.metric("Duplicate Groups", len(report['clusters']))
+        col3.metric("Students Involved", sum(len(c['students']) for c in report['clusters']))
+        
+        if not report['clusters']:
+            st.success("✅ No near-duplicate resumes found!")
+        
+        for idx, cluster in enumerate(report['clusters'][:100], 1):
+            similarity = (f"{cluster['min_similarity']:.0%}" if cluster['min_similarity'] == cluster['max_similarity']
+                          else f"{cluster['min_similarity']:.0%} - {cluster['max_similarity']:.0%}")
+            with st.expander(f"Group {idx}: {len(cluster['students'])} students ({similarity} similar)"):
+                st.dataframe(pd.DataFrame([{
+                    'Student Name': s['student_name'],
+                    'Email': s['student_email'],
+                    'Resume Ver.': s['resume_version'],
+                    'File': s['resume_filename']
+                } for s in cluster['students']]), use_container_width=True, hide_index=True)
+        
+        if len(report['clusters']) > 100:
+            st.caption(f"Showing the 100 largest of {len(report['clusters'])} groups - download the full list below.")
+        
+        if report['pairs']:
+            st.download_button(
+                "⬇️ Download All Pairs (CSV)",
+                data=pd.DataFrame(report['pairs']).to_csv(index=False),
+                file_name=f"duplicate_resumes_{datetime.now().strftime('%Y%m%d')}.csv",
+                mime="text/csv",
+                key="dup_download"
+            )
+
+
+# ============ TAB 7: IMPORT STUDENTS ============
+with tab7:
+    st.subheader("👥 Register Students from a Roster")
+    st.info(f"📌 Upload an Excel or CSV file with columns: {', '.join(REQUIRED_COLUMNS)} and optionally password. "
+            "Students without a password get a generated one, offered once as a separate download.")
+    
+    roster_file = st.file_uploader("Roster file", type=['xlsx', 'xls', 'csv'], key="roster_file")
+    
+    if roster_file:
+        roster_rows, missing_columns = read_roster(roster_file, roster_file.name)
+        
+        if missing_columns:
+            st.error(f"❌ Missing column(s): {', '.join(missing_columns)}")
+        elif not roster_rows:
+            st.warning("⚠️ The file has no rows.")
+        else:
+            st.write(f"**{len(roster_rows)} row(s) found**")
+            with st.expander("👀 Preview"):
+                st.dataframe(pd.DataFrame(roster_rows[:20]).drop(columns=['password'], errors='ignore'),
+                             use_container_width=True, hide_index=True)
+            
+            if st.button("👥 Import Students", type="primary", key="roster_import"):
+                progress_bar = st.progress(0.0)
+                status_text = st.empty()
+                
+                def show_progress(stage, done, total):
+                    progress_bar.progress(done / total if total else 1.0)
+                    status_text.text(f"{'Hashing passwords' if stage == 'hashing' else 'Saving students'}: {done}/{total}")
+                
+                with st.spinner("Importing roster..."):
+                    imported = import_roster(roster_rows, on_progress=show_progress)
+                progress_bar.empty()
+                status_text.empty()
+                
+                # Generated passwords go out once in a CSV; the session only keeps the status columns
+                generated = [r for r in imported if r['password']]
+                st.session_state['roster_credentials_csv'] = pd.DataFrame([{
+                    'Name': r['name'],
+                    'Email': r['email'],
+                    'Initial Password': r['password']
+                } for r in generated]).to_csv(index=False) if generated else None
+                st.session_state['roster_results'] = [{k: v for k, v in r.items() if k != 'password'} for r in imported]
+    
+    roster_results = st.session_state.get('roster_results')
+    if roster_results:
+        counts = pd.Series([r['status'] for r in roster_results]).value_counts()
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Created", int(counts.get('created', 0)))
+        col2.metric("Already Registered", int(counts.get('exists', 0)))
+        col3.metric("Invalid / Duplicate", int(counts.get('invalid', 0) + counts.get('duplicate', 0)))
+        col4.metric("Failed", int(counts.get('failed', 0)))
+        
+        results_df = pd.DataFrame([{
+            'Row': r['row'],
+            'Name': r['name'],
+            'Email': r['email'],
+            'Year': r['year'],
+            'Branch': r['branch'],
+            'Status': r['status'],
+            'Message': r['message']
+        } for r in roster_results])
+        
+        problems = results_df[~results_df['Status'].isin(['created'])]
+        if not problems.empty:
+            st.write("**Rows not imported:**")
+            st.dataframe(problems, use_container_width=True, hide_index=True)
+        
+        if st.session_state.get('roster_credentials_csv'):
+            st.warning("🔐 Generated passwords can be downloaded only once - they are cleared from this session after the download. "
+                       "Share them securely and delete the file afterwards.")
+            st.download_button(
+                "🔑 Download Initial Passwords (CSV)",
+                data=st.session_state['roster_credentials_csv'],
+                file_name=f"roster_passwords_{datetime.now().strftime('%Y%m%d-%H%M')}.csv",
+                mime="text/csv",
+                key="roster_credentials_download",
+                on_click=lambda: st.session_state.pop('roster_credentials_csv', None)
+            )
+        
+        st.download_button(
+            "⬇️ Download Import Results (CSV)",
+            data=results_df.to_csv(index=False),
+            file_name=f"roster_import_{datetime.now().strftime('%Y%m%d-%H%M')}.csv",
+            mime="text/csv",
+            key="roster_results_download"
+        )
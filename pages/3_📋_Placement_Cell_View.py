@@ -54,6 +54,9 @@ with tab2:
                 st.write(f"**Published by:** {ranking['published_by_name']}")
                 st.write(f"**Date:** {ranking['created_at'][:16]}")
                 
+                if ranking.get('weights'):
+                    st.write(f"**Score Weights:** ATS {ranking['weights']['ats']:.2f} | Semantic {ranking['weights']['semantic']:.2f}")
+                
                 if ranking['description']:
                     st.info(f"**Note:** {ranking['description']}")
                 
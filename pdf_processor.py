@@ -1,5 +1,6 @@
 # pdf_processor.py
 from PyPDF2 import PdfReader
+from metrics import timed
 # text_preprocessor.py
 # text_preprocessor.py
 import re
@@ -72,6 +73,7 @@ def preprocess_text(text):
 
 
 
+@timed("extract")
 def extract_text_from_pdf(pdf_path):
     """
     Extract text from a PDF file.
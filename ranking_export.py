@@ -0,0 +1,147 @@
+# ranking_export.py
+import argparse
+import csv
+import os
+from datetime import datetime
+from company_database import COMPANY_JOB_SKILLS
+from database import get_ranking_index, get_analyses_by_ids, get_students_by_emails
+from ranking_weights import get_role_weights, rerank
+
+# Where exports are written before download
+EXPORT_DIR = os.getenv("RANKING_EXPORT_DIR", os.path.join("data", "exports"))
+# Analysis rows fetched (and written) per chunk
+EXPORT_CHUNK_SIZE = int(os.getenv("RANKING_EXPORT_CHUNK", "500"))
+
+BASE_COLUMNS = ['Rank', 'Student Name', 'Email', 'Year', 'Branch', 'Resume Ver.', 'Resume File',
+                'Combined Score', 'ATS Score', 'Semantic Score', 'Matched', 'Missing', 'Analyzed At']
+
+
+def export_columns(skills):
+    """Header row: fixed columns followed by one column per required skill"""
+    return BASE_COLUMNS + [f"Skill: {skill}" for skill in skills]
+
+
+def iter_ranking_rows(company_name, job_role, weights=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield the full ranking of a company/role one chunk of rows at a time.
+
+    A first query fetches only ids and scores of each student's latest
+    analysis, which is enough to rank; full rows (with skill lists) and
+    student details are then fetched chunk_size at a time in rank order,
+    so memory stays flat however many students there are.
+
+    Yields:
+        list: Rows matching export_columns() (per-skill cells are "matched",
+              "missing" or empty).
+    """
+    skills = COMPANY_JOB_SKILLS[company_name][job_role]
+    index = get_ranking_index(company_name, job_role)
+    if not index:
+        return
+
+    combined, order = rerank([r['ats_score'] for r in index], [r['semantic_score'] for r in index],
+                             weights or get_role_weights(company_name, job_role))
+
+    for start in range(0, len(order), chunk_size):
+        chunk = order[start:start + chunk_size]
+        analyses = {a['id']: a for a in get_analyses_by_ids([index[i]['id'] for i in chunk])}
+        students = {s['email']: s for s in get_students_by_emails({index[i]['student_email'] for i in chunk})}
+
+        rows = []
+        for rank, i in enumerate(chunk, start + 1):
+            analysis = analyses.get(index[i]['id'])
+            if analysis is None:
+                continue
+            student = students.get(analysis['student_email'], {})
+            matched = set(analysis.get('matched_skills') or [])
+            missing = set(analysis.get('missing_skills') or [])
+            rows.append([
+                rank,
+                student.get('name', "Unknown"),
+                analysis['student_email'],
+                student.get('year'),
+                student.get('branch'),
+                analysis.get('resume_version'),
+                analysis.get('resume_filename'),
+                round(float(combined[i]), 2),
+                analysis['ats_score'],
+                analysis['semantic_score'],
+                len(matched),
+                len(missing),
+                (analysis.get('analyzed_at') or "")[:19]
+            ] + ["matched" if skill in matched else "missing" if skill in missing else "" for skill in skills])
+        yield rows
+
+
+def write_csv(company_name, job_role, path, weights=None):
+    """Stream a ranking to a CSV file; returns the number of students written"""
+    written = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(export_columns(COMPANY_JOB_SKILLS[company_name][job_role]))
+        for rows in iter_ranking_rows(company_name, job_role, weights):
+            writer.writerows(rows)
+            written += len(rows)
+    return written
+
+
+def write_xlsx(company_name, job_role, path, weights=None):
+    """Stream a ranking to an Excel file with openpyxl's write-only mode; returns the number of students written"""
+    from openpyxl import Workbook
+
+    # Write-only workbooks keep only the current row in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title="".join(c for c in job_role if c not in '[]:*?/\\')[:31] or "Ranking")
+    sheet.freeze_panes = "D2"
+    sheet.append(export_columns(COMPANY_JOB_SKILLS[company_name][job_role]))
+
+    written = 0
+    for rows in iter_ranking_rows(company_name, job_role, weights):
+        for row in rows:
+            sheet.append(row)
+        written += len(rows)
+    workbook.save(path)
+    return written
+
+
+def export_ranking(company_name, job_role, fmt="csv", weights=None, output_path=None):
+    """
+    Export the full ranking of a company/role to a file.
+
+    Args:
+        fmt (str): "csv" or "xlsx".
+        weights (dict): ATS/semantic weights (default: the role's configured weights).
+        output_path (str): Target file (default: a timestamped file in EXPORT_DIR).
+
+    Returns:
+        tuple: (path, number of students written), or (None, 0) on error.
+    """
+    if output_path is None:
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        name = "".join(c if c.isalnum() else "_" for c in f"{company_name}_{job_role}")
+        output_path = os.path.join(EXPORT_DIR, f"ranking_{name}_{datetime.now().strftime('%Y%m%d-%H%M%S')}.{fmt}")
+
+    try:
+        writer = write_xlsx if fmt == "xlsx" else write_csv
+        return output_path, writer(company_name, job_role, output_path, weights)
+    except Exception as e:
+        print(f"Error exporting ranking: {e}")
+        return None, 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export a full company/role ranking with per-skill columns.")
+    parser.add_argument("--company", required=True, help="Company name")
+    parser.add_argument("--role", required=True, help="Job role")
+    parser.add_argument("--format", choices=["csv", "xlsx"], default="csv")
+    parser.add_argument("-o", "--output", help="Output file (default: data/exports/...)")
+    parser.add_argument("--ats-weight", type=float, help="ATS weight 0-1 (semantic weight = 1 - ATS weight)")
+    args = parser.parse_args()
+
+    if args.role not in COMPANY_JOB_SKILLS.get(args.company, {}):
+        parser.error(f"Unknown company/role: {args.company} - {args.role}")
+
+    weights = None if args.ats_weight is None else {'ats': args.ats_weight, 'semantic': 1 - args.ats_weight}
+    path, count = export_ranking(args.company, args.role, args.format, weights, args.output)
+    if path:
+        print(f"✓ Exported {count} student(s) to {path}")
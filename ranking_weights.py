@@ -0,0 +1,43 @@
+# ranking_weights.py
+import numpy as np
+
+# Default balance between the ATS (keyword) and semantic scores
+DEFAULT_WEIGHTS = {'ats': 0.5, 'semantic': 0.5}
+
+# Per-role overrides: (company, job_role) -> weights
+# e.g. ("Amazon", "Support Engineer III"): {'ats': 0.7, 'semantic': 0.3}
+ROLE_WEIGHTS = {}
+
+
+def get_role_weights(company_name, job_role):
+    """Get the configured score weights for a company/role"""
+    return dict(ROLE_WEIGHTS.get((company_name, job_role), DEFAULT_WEIGHTS))
+
+
+def combine_scores(ats_score, semantic_score, weights=None):
+    """
+    Weighted combination of ATS and semantic scores.
+
+    Works on plain numbers and on numpy arrays (whole cohorts at once);
+    weights may themselves be arrays, e.g. one weight per role column.
+    """
+    weights = weights or DEFAULT_WEIGHTS
+    total = weights['ats'] + weights['semantic']
+    return (weights['ats'] * ats_score + weights['semantic'] * semantic_score) / np.where(total > 0, total, 1)
+
+
+def rerank(ats_scores, semantic_scores, weights=None):
+    """
+    Re-rank a cohort from its component score columns without touching the model.
+
+    Args:
+        ats_scores (array-like): ATS score per student.
+        semantic_scores (array-like): Semantic score per student.
+        weights (dict): {'ats': ..., 'semantic': ...}.
+
+    Returns:
+        tuple: (combined scores array, row order best-first)
+    """
+    combined = combine_scores(np.asarray(ats_scores, dtype=np.float64),
+                              np.asarray(semantic_scores, dtype=np.float64), weights)
+    return combined, np.argsort(-combined, kind='stable')
@@ -0,0 +1,228 @@
+# resume_cache.py
+import json
+import os
+import numpy as np
+from text_preprocessor import preprocess_text, PREPROCESS_VERSION
+from database import update_resume_cache, get_resume_page
+from near_duplicates import minhash_fields
+
+# Resumes encoded per inference slot when a whole cold cohort needs encoding,
+# so one officer request never holds a slot (and blocks students) throughout
+COHORT_ENCODE_BATCH = int(os.getenv("COHORT_ENCODE_BATCH", "64"))
+
+
+def _get_model():
+    """Import the matcher lazily - loading S-BERT is only needed when encoding"""
+    import matcher
+    return matcher
+
+
+def parse_embedding(value):
+    """
+    Convert a stored embedding back into a float32 vector.
+
+    Supabase returns float arrays as lists, and pgvector columns as strings
+    like "[0.1,0.2,...]".
+
+    Returns:
+        np.ndarray or None: The embedding, or None if nothing is stored.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = json.loads(value)
+    return np.asarray(value, dtype=np.float32)
+
+
+def _cache_fields(matcher, processed_text, embedding, chunk_matrix):
+    """Cached columns of one resume (chunk_embeddings only in "max" pooling mode)"""
+    fields = {
+        'processed_text': processed_text,
+        'embedding': embedding.tolist(),
+        'preprocess_version': PREPROCESS_VERSION,
+        'embedding_model': matcher.EMBEDDING_VERSION,
+        **minhash_fields(processed_text)
+    }
+    if chunk_matrix is not None:
+        fields['chunk_embeddings'] = chunk_matrix.tolist()
+    return fields
+
+
+def build_resume_fields(resume_text):
+    """
+    Compute the cached columns for a new resume version.
+
+    Args:
+        resume_text (str): Raw text extracted from the PDF.
+
+    Returns:
+        dict: processed_text, embedding, preprocess_version and embedding_model
+              columns (plus chunk_embeddings in "max" pooling mode) ready to
+              pass to save_student_resume().
+    """
+    matcher = _get_model()
+    processed_text = preprocess_text(resume_text)
+    embeddings, chunk_matrices = matcher.encode_resumes_with_chunks([processed_text])
+    return _cache_fields(matcher, processed_text, embeddings[0], chunk_matrices[0] if chunk_matrices else None)
+
+
+def is_cache_fresh(resume):
+    """Check whether a resume row's cached columns match the current preprocessing and model"""
+    matcher = _get_model()
+    return (
+        resume.get('processed_text') is not None
+        and resume.get('preprocess_version') == PREPROCESS_VERSION
+        and resume.get('embedding') is not None
+        and resume.get('embedding_model') == matcher.EMBEDDING_VERSION
+        and (matcher.CHUNK_POOLING != "max" or resume.get('chunk_embeddings') is not None)
+    )
+
+
+def get_resume_features(resume):
+    """
+    Get the preprocessed text and embedding for a resume row.
+
+    Uses the stored columns when they are up to date; otherwise computes them
+    once and writes them back so the next analysis is pure scoring.
+
+    Args:
+        resume (dict): A row from the student_resumes table.
+
+    Returns:
+        tuple: (processed_text, embedding as np.ndarray)
+    """
+    if is_cache_fresh(resume):
+        return resume['processed_text'], parse_embedding(resume['embedding'])
+
+    fields = build_resume_fields(resume['resume_text'])
+    if resume.get('id') is not None:
+        update_resume_cache(resume['id'], fields)
+    resume.update(fields)
+    return fields['processed_text'], parse_embedding(fields['embedding'])
+
+
+def get_resume_chunks(resume):
+    """
+    Get the stored chunk matrix of a resume row for "max" pooling.
+
+    Returns:
+        np.ndarray or None: (num_chunks x D) matrix, or None when chunk
+                            pooling is not "max".
+    """
+    if _get_model().CHUNK_POOLING != "max":
+        return None
+    if not is_cache_fresh(resume):
+        get_resume_features(resume)
+    return parse_embedding(resume['chunk_embeddings'])
+
+
+def encode_and_store(resumes):
+    """
+    Preprocess and encode many resume rows in one batch and write the columns back.
+
+    Rows are updated in place. Returns the number of rows written to the database.
+    """
+    matcher = _get_model()
+    processed = [preprocess_text(r['resume_text']) for r in resumes]
+    embeddings, chunk_matrices = matcher.encode_resumes_with_chunks(processed)
+
+    updated = 0
+    for i, (resume, processed_text) in enumerate(zip(resumes, processed)):
+        fields = _cache_fields(matcher, processed_text, embeddings[i], chunk_matrices[i] if chunk_matrices else None)
+        resume.update(fields)
+        if resume.get('id') is not None and update_resume_cache(resume['id'], fields) is not None:
+            updated += 1
+    return updated
+
+
+def refresh_cohort_cache(resumes, batch_size=COHORT_ENCODE_BATCH):
+    """
+    Encode the stale rows of a cohort batch_size rows at a time, each batch
+    under its own interactive admission slot (rows are updated in place).
+
+    Raises:
+        AdmissionRejected: If the inference queue is full or the wait timed out.
+    """
+    from admission import admitted
+
+    stale = [r for r in resumes if not is_cache_fresh(r)]
+    for start in range(0, len(stale), batch_size):
+        with admitted():
+            encode_and_store(stale[start:start + batch_size])
+
+
+def get_cohort_features(resumes):
+    """
+    Get preprocessed text and embeddings for many resume rows at once.
+
+    Rows with fresh cached columns are reused as-is; the rest are encoded
+    together in batches (and written back) instead of one model call each.
+
+    Args:
+        resumes (list): Rows from the student_resumes table.
+
+    Returns:
+        tuple: (list of processed texts, N x D float32 embedding matrix)
+    """
+    stale = [r for r in resumes if not is_cache_fresh(r)]
+    if stale:
+        encode_and_store(stale)
+
+    processed_texts = [r['processed_text'] for r in resumes]
+    if not resumes:
+        return processed_texts, np.zeros((0, 0), dtype=np.float32)
+    embeddings = np.vstack([parse_embedding(r['embedding']) for r in resumes])
+    return processed_texts, embeddings
+
+
+def get_cohort_chunks(resumes):
+    """
+    Get the stored chunk matrices of many resume rows for "max" pooling
+    (call after get_cohort_features(), which refreshes stale rows).
+
+    Returns:
+        list or None: One (num_chunks x D) matrix per resume, or None when
+                      chunk pooling is not "max".
+    """
+    if _get_model().CHUNK_POOLING != "max":
+        return None
+    stale = [r for r in resumes if not is_cache_fresh(r)]
+    if stale:
+        encode_and_store(stale)
+    return [parse_embedding(r['chunk_embeddings']) for r in resumes]
+
+
+def backfill_resume_cache(batch_size=64):
+    """
+    Fill processed_text/embedding for every resume row that is missing them or
+    was computed with an older preprocessing version or model.
+
+    Resumes are read batch_size rows at a time and each page is encoded in one batch.
+
+    Returns:
+        int: Number of rows updated.
+    """
+    updated = 0
+    after_id = 0
+
+    while True:
+        page = get_resume_page(after_id=after_id, limit=batch_size)
+        if not page:
+            break
+        after_id = page[-1]['id']
+
+        stale = [r for r in page if not is_cache_fresh(r)]
+        if not stale:
+            continue
+
+        updated += encode_and_store(stale)
+
+        print(f"Backfilled {updated} resume(s) so far (up to id {after_id})")
+
+    return updated
+
+
+if __name__ == "__main__":
+    print("--- Backfilling preprocessed resume text and embeddings ---")
+    count = backfill_resume_cache()
+    print(f"Done. Updated {count} resume(s).")
@@ -0,0 +1,246 @@
+# roster_import.py
+import multiprocessing
+import os
+import re
+import secrets
+import string
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from auth import hash_password, STUDENT_YEARS, STUDENT_BRANCHES
+from database import get_students_by_emails, insert_students_bulk, insert_student
+
+# Processes hashing passwords (bcrypt is deliberately slow, ~250 ms per hash)
+HASH_WORKERS = int(os.getenv("ROSTER_HASH_WORKERS", str(max(1, min(8, os.cpu_count() or 1)))))
+# Passwords per pool task
+HASH_CHUNK_SIZE = int(os.getenv("ROSTER_HASH_CHUNK", "16"))
+# Students per multi-row insert
+INSERT_BATCH_SIZE = int(os.getenv("ROSTER_INSERT_BATCH", "500"))
+
+# Accepted spellings of each roster column
+COLUMN_ALIASES = {
+    'name': ['name', 'full name', 'student name'],
+    'email': ['email', 'e-mail', 'email address', 'mail'],
+    'year': ['year', 'year of study', 'study year'],
+    'branch': ['branch', 'department', 'dept'],
+    'password': ['password', 'initial password', 'temporary password']
+}
+REQUIRED_COLUMNS = ['name', 'email', 'year', 'branch']
+
+BRANCH_ABBREVIATIONS = {
+    'cse': "Computer Science & Engineering",
+    'cs': "Computer Science & Engineering",
+    'ece': "Electronics & Communication Engineering",
+    'ec': "Electronics & Communication Engineering",
+    'eee': "Electrical & Electronics Engineering",
+    'ee': "Electrical & Electronics Engineering",
+    'me': "Mechanical Engineering",
+    'mech': "Mechanical Engineering",
+    'ce': "Civil Engineering",
+    'civil': "Civil Engineering"
+}
+
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+
+# ============ PARSING ============
+
+def read_roster(file, filename):
+    """
+    Read a roster spreadsheet into row dicts with normalized column names.
+
+    Args:
+        file: Uploaded file object or path (.xlsx/.xls or .csv).
+        filename (str): Used to detect the format.
+
+    Returns:
+        tuple: (list of row dicts, list of missing required columns)
+    """
+    # Streamlit reruns hand back the same upload - start from the beginning every time
+    if hasattr(file, "seek"):
+        file.seek(0)
+    if filename.lower().endswith((".xlsx", ".xls")):
+        df = pd.read_excel(file, dtype=str, keep_default_na=False)
+    else:
+        df = pd.read_csv(file, dtype=str, keep_default_na=False, encoding="utf-8-sig")
+
+    renames = {}
+    for column in df.columns:
+        key = str(column).strip().lower()
+        for field, aliases in COLUMN_ALIASES.items():
+            if key in aliases and field not in renames.values():
+                renames[column] = field
+    df = df.rename(columns=renames)
+
+    missing = [column for column in REQUIRED_COLUMNS if column not in df.columns]
+    fields = [field for field in COLUMN_ALIASES if field in df.columns]
+    rows = [{field: str(value).strip() for field, value in zip(fields, values)}
+            for values in df[fields].itertuples(index=False, name=None)]
+    return rows, missing
+
+
+def normalize_year(value):
+    """Map "4", "4th", "4th year" etc. to a signup year label, or None"""
+    value = value.strip().lower()
+    for label in STUDENT_YEARS:
+        if value in (label.lower(), label[0], label.split()[0].lower()):
+            return label
+    return None
+
+
+def normalize_branch(value):
+    """Map a branch name or common abbreviation to a signup branch label, or None"""
+    value = value.strip().lower()
+    for label in STUDENT_BRANCHES:
+        if value == label.lower() or value == label.lower().replace("&", "and"):
+            return label
+    return BRANCH_ABBREVIATIONS.get(value.replace(".", ""))
+
+
+def generate_password(length=10):
+    """Random initial password for rows that don't provide one"""
+    alphabet = string.ascii_letters + string.digits
+    return "".join(secrets.choice(alphabet) for _ in range(length))
+
+
+def validate_rows(rows):
+    """
+    Check every roster row with the same rules as student signup.
+
+    Returns:
+        list: One result dict per row (row number, email, name, year, branch,
+              password, generated flag, status and message). Rows that can
+              be imported have status None; others are "invalid" or "duplicate".
+    """
+    results = []
+    seen = set()
+    for number, row in enumerate(rows, 2):  # row 1 is the header
+        email = row.get('email', "")
+        result = {
+            'row': number,
+            'email': email,
+            'name': row.get('name', ""),
+            'year': normalize_year(row.get('year', "")),
+            'branch': normalize_branch(row.get('branch', "")),
+            'password': row.get('password', ""),
+            'generated_password': False,
+            'status': None,
+            'message': ""
+        }
+
+        problems = []
+        if not result['name']:
+            problems.append("missing name")
+        if not EMAIL_PATTERN.match(email):
+            problems.append("invalid email")
+        if result['year'] is None:
+            problems.append(f"unknown year '{row.get('year', '')}'")
+        if result['branch'] is None:
+            problems.append(f"unknown branch '{row.get('branch', '')}'")
+        if result['password'] and len(result['password']) < 6:
+            problems.append("password shorter than 6 characters")
+
+        if problems:
+            result.update({'status': 'invalid', 'message': ", ".join(problems)})
+        elif email.lower() in seen:
+            result.update({'status': 'duplicate', 'message': "email appears earlier in the file"})
+        else:
+            seen.add(email.lower())
+            if not result['password']:
+                result.update({'password': generate_password(), 'generated_password': True})
+        results.append(result)
+    return results
+
+
+# ============ HASHING ============
+
+def _hash_chunk(passwords):
+    """Worker task: bcrypt-hash a chunk of passwords"""
+    return [hash_password(password) for password in passwords]
+
+
+def hash_passwords(passwords, workers=HASH_WORKERS, chunk_size=HASH_CHUNK_SIZE, on_progress=None):
+    """
+    bcrypt-hash many passwords across worker processes.
+
+    Args:
+        on_progress (callable): Called with (hashed so far, total) after each chunk.
+
+    Returns:
+        list: Hashes in the same order as passwords.
+    """
+    chunks = [passwords[i:i + chunk_size] for i in range(0, len(passwords), chunk_size)]
+    hashes = []
+
+    if workers <= 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            hashes.extend(_hash_chunk(chunk))
+            if on_progress:
+                on_progress(len(hashes), len(passwords))
+        return hashes
+
+    # spawn: forking the multi-threaded Streamlit server is unsafe
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks)),
+                             mp_context=multiprocessing.get_context("spawn")) as pool:
+        for chunk_hashes in pool.map(_hash_chunk, chunks):
+            hashes.extend(chunk_hashes)
+            if on_progress:
+                on_progress(len(hashes), len(passwords))
+    return hashes
+
+
+# ============ IMPORT ============
+
+def import_roster(rows, workers=HASH_WORKERS, on_progress=None):
+    """
+    Register every valid, new student of a roster.
+
+    Existing emails are found with one bulk query, passwords are hashed in a
+    process pool, and students are inserted in batches (falling back to
+    single inserts for a batch that fails, so each row gets its own status).
+
+    Args:
+        rows (list): Row dicts from read_roster().
+        on_progress (callable): Called with (stage, done, total).
+
+    Returns:
+        list: Result dicts from validate_rows() with status "created",
+              "exists", "duplicate", "invalid" or "failed".
+    """
+    results = validate_rows(rows)
+    pending = [r for r in results if r['status'] is None]
+
+    existing = {s['email'].lower() for s in get_students_by_emails([r['email'] for r in pending])}
+    for result in pending:
+        if result['email'].lower() in existing:
+            result.update({'status': 'exists', 'message': "already registered"})
+    pending = [r for r in pending if r['status'] is None]
+
+    hashes = hash_passwords(
+        [r['password'] for r in pending], workers,
+        on_progress=(lambda done, total: on_progress('hashing', done, total)) if on_progress else None
+    )
+
+    for start in range(0, len(pending), INSERT_BATCH_SIZE):
+        batch = pending[start:start + INSERT_BATCH_SIZE]
+        students = [{
+            'email': r['email'], 'name': r['name'], 'password': hashed, 'year': r['year'], 'branch': r['branch']
+        } for r, hashed in zip(batch, hashes[start:start + INSERT_BATCH_SIZE])]
+
+        if insert_students_bulk(students, chunk_size=len(students)) is not None:
+            for result in batch:
+                result['status'] = 'created'
+        else:
+            # One bad row fails the whole multi-row insert - retry one by one
+            for result, student in zip(batch, students):
+                created = insert_student(student['email'], student['name'], student['password'],
+                                         student['year'], student['branch'])
+                result.update({'status': 'created'} if created else {'status': 'failed', 'message': "database insert failed"})
+
+        if on_progress:
+            on_progress('inserting', min(start + INSERT_BATCH_SIZE, len(pending)), len(pending))
+
+    # Only passwords we generated are reported back (the officer has to hand them out)
+    for result in results:
+        if not (result['generated_password'] and result['status'] == 'created'):
+            result['password'] = ""
+    return results
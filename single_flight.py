@@ -0,0 +1,223 @@
+# single_flight.py
+import collections
+import hashlib
+import os
+import threading
+
+# Completed analyses kept in memory (per server process)
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", "1024"))
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls with the same key into one computation.
+
+    The first caller for a key runs the function; callers that arrive while it
+    is running wait for and share its result. Successful results are kept in a
+    bounded LRU cache so later identical requests return immediately.
+    """
+
+    def __init__(self, max_cached=ANALYSIS_CACHE_SIZE):
+        self.max_cached = max_cached
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._cache = collections.OrderedDict()
+        self.hits = 0
+        self.shared = 0
+        self.misses = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) once per key.
+
+        Returns:
+            The result of fn - either computed now, shared with a concurrent
+            caller, or served from the cache. None results are not cached.
+
+        Raises:
+            Whatever fn raised (every waiting caller sees the same exception).
+        """
+        while True:
+            with self._lock:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    self.hits += 1
+                    return self._cache[key]
+
+                call = self._in_flight.get(key)
+                leader = call is None
+                if leader:
+                    call = {'done': threading.Event(), 'finished': False, 'result': None, 'error': None}
+                    self._in_flight[key] = call
+                    self.misses += 1
+                else:
+                    self.shared += 1
+
+            if leader:
+                break
+
+            call['done'].wait()
+            if call['error'] is not None:
+                raise call['error']
+            if call['finished']:
+                return call['result']
+            # The leader was interrupted (e.g. a Streamlit rerun) - try again
+
+        try:
+            call['result'] = fn(*args, **kwargs)
+            call['finished'] = True
+        except Exception as e:
+            call['error'] = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+                if call['finished'] and call['result'] is not None and self.max_cached > 0:
+                    self._cache[key] = call['result']
+                    while len(self._cache) > self.max_cached:
+                        self._cache.popitem(last=False)
+            call['done'].set()
+
+        return call['result']
+
+    def forget(self, key):
+        """Drop a cached result (e.g. after the underlying data changed)"""
+        with self._lock:
+            self._cache.pop(key, None)
+
+    def reset(self):
+        """Empty the cache and zero the counters (calls in flight are left alone)"""
+        with self._lock:
+            self._cache.clear()
+            self.hits = self.shared = self.misses = 0
+
+    def stats(self):
+        """Cache hits, shared in-flight calls, computations and current sizes"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'shared': self.shared,
+                'misses': self.misses,
+                'in_flight': len(self._in_flight),
+                'cached': len(self._cache)
+            }
+
+
+_analysis_flight = SingleFlight()
+
+
+def get_analysis_flight():
+    """Get the process-wide single-flight group for student analyses"""
+    return _analysis_flight
+
+
+def analysis_key(student_email, resume, company_name, job_role):
+    """
+    Identify one analysis by everything that determines its result.
+
+    Two requests with the same key would compute the same scores, so they
+    can share one computation and one row in analysis_history. The student
+    and version are part of the key because each student gets their own row.
+    """
+    # Lazy imports - matcher loads the model
+    import matcher
+    from ranking_weights import get_role_weights
+    from skills_versioning import skills_db_version
+
+    resume_hash = hashlib.sha1((resume.get('resume_text') or '').encode()).hexdigest()
+    weights = get_role_weights(company_name, job_role)
+    return (
+        student_email,
+        resume.get('version_number'),
+        resume_hash,
+        company_name,
+        job_role,
+        skills_db_version(),
+        matcher.EMBEDDING_VERSION,
+        matcher.SOFT_ATS,
+        tuple(sorted(weights.items()))
+    )
+
+
+def _compute_analysis(student_email, resume, company_name, job_role, on_wait=None):
+    """Look up or compute one analysis and save it (runs once per key)"""
+    from admission import admitted
+    from database import get_analysis_for_resume_version
+    from skills_versioning import current_role_hash
+    from matcher import match_resume_to_job, build_feedback
+    from resume_cache import get_resume_features, get_resume_chunks
+
+    # The current version is usually already auto-scored for every role - but only reuse
+    # a row scored against the role's current skills (the cache key includes them too)
+    stored = get_analysis_for_resume_version(student_email, company_name, job_role, resume['version_number'],
+                                             skills_hash=current_role_hash(company_name, job_role))
+    if stored:
+        results = {
+            'ats_score': stored['ats_score'],
+            'semantic_score': stored['semantic_score'],
+            'combined_score': stored['combined_score'],
+            'matched_skills': stored['matched_skills'],
+            'missing_skills': stored['missing_skills'],
+            'feedback': build_feedback(stored['missing_skills'])
+        }
+        if stored.get('source', 'student') != 'student':
+            # Background rows are hidden from the student's history - record that they ran it
+            _save_student_analysis(student_email, resume, company_name, job_role, results)
+        return results
+
+    with admitted(on_wait=on_wait):
+        # Reuse the preprocessed text and embedding stored with the resume
+        processed_text, resume_embedding = get_resume_features(resume)
+        results = match_resume_to_job(processed_text, company_name, job_role, resume_embedding=resume_embedding,
+                                      chunk_embeddings=get_resume_chunks(resume))
+
+    if 'error' in results:
+        raise ValueError(results['error'])
+
+    _save_student_analysis(student_email, resume, company_name, job_role, results)
+    return results
+
+
+def _save_student_analysis(student_email, resume, company_name, job_role, results):
+    """Save an analysis the student ran, in the background so they don't wait on the insert"""
+    from write_behind import save_analysis_result_async
+
+    save_analysis_result_async(
+        student_email=student_email,
+        company_name=company_name,
+        job_role=job_role,
+        resume_version=resume['version_number'],
+        resume_filename=resume['resume_filename'],
+        ats_score=results['ats_score'],
+        semantic_score=results['semantic_score'],
+        combined_score=results['combined_score'],
+        matched_skills=results['matched_skills'],
+        missing_skills=results['missing_skills'],
+        feedback=str(results['feedback'])
+    )
+
+
+def analyze_resume_once(student_email, resume, company_name, job_role, on_wait=None):
+    """
+    Analyze a resume version for a company/role, deduplicating identical requests.
+
+    Double-clicks and reruns that arrive while the same analysis is running
+    wait for it instead of computing (and inserting into analysis_history)
+    again; finished analyses are served from an in-memory cache.
+
+    Args:
+        student_email (str): The student's email.
+        resume (dict): The student_resumes row to analyze.
+        company_name (str): The company name.
+        job_role (str): The job role.
+        on_wait (callable): Passed to admission control to report the queue position.
+
+    Returns:
+        dict: Scores, matched/missing skills and feedback.
+
+    Raises:
+        ValueError: If the resume could not be scored.
+        AdmissionRejected: If the analysis queue is full or the wait timed out.
+    """
+    key = analysis_key(student_email, resume, company_name, job_role)
+    return _analysis_flight.do(key, _compute_analysis, student_email, resume, company_name, job_role, on_wait=on_wait)
@@ -0,0 +1,165 @@
+# skills_versioning.py
+import argparse
+import hashlib
+import json
+from company_database import COMPANY_JOB_SKILLS
+from database import (
+    get_role_skill_versions, upsert_role_skill_versions, delete_role_skill_version,
+    get_all_current_resumes, build_analysis_row, save_analysis_results_bulk
+)
+
+
+def role_skills_hash(company_name, job_role, skills):
+    """
+    Content hash of one role's skills.
+
+    Skill order is part of the hash because it changes the job description
+    text used for the semantic score.
+    """
+    payload = json.dumps([company_name, job_role, list(skills)], ensure_ascii=False)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def current_role_hash(company_name, job_role):
+    """Hash of one role's current skills, or None if the role no longer exists"""
+    skills = COMPANY_JOB_SKILLS.get(company_name, {}).get(job_role)
+    return role_skills_hash(company_name, job_role, skills) if skills is not None else None
+
+
+def current_role_hashes():
+    """Hash every role in COMPANY_JOB_SKILLS: {(company, role): hash}"""
+    return {
+        (company, role): role_skills_hash(company, role, skills)
+        for company, roles in COMPANY_JOB_SKILLS.items()
+        for role, skills in roles.items()
+    }
+
+
+def skills_db_version():
+    """Short version tag for the whole skills database (changes when any role changes)"""
+    combined = "".join(h for _, h in sorted(current_role_hashes().items()))
+    return hashlib.sha1(combined.encode()).hexdigest()[:12]
+
+
+def diff_skill_versions():
+    """
+    Compare the skills database against the hashes stored with the last re-score.
+
+    Returns:
+        dict: 'changed', 'added' and 'removed' lists of (company, role) pairs.
+    """
+    current = current_role_hashes()
+    stored = {(row['company_name'], row['job_role']): row['skills_hash'] for row in get_role_skill_versions()}
+
+    return {
+        'changed': sorted(key for key in current if key in stored and stored[key] != current[key]),
+        'added': sorted(key for key in current if key not in stored),
+        'removed': sorted(key for key in stored if key not in current)
+    }
+
+
+def rescore_roles(roles):
+    """
+    Re-score every student's current resume against the given roles only.
+
+    Uses the cached preprocessed text and embeddings, scores all roles in one
+    batched pass and writes each role's results with multi-row inserts.
+
+    Args:
+        roles (list): (company, job_role) pairs to re-score.
+
+    Returns:
+        tuple: (number of analysis rows written, list of roles whose rows were all saved)
+    """
+    from matcher import score_cohort_against_roles, cohort_result
+    from resume_cache import get_cohort_features, get_cohort_chunks
+
+    resumes = get_all_current_resumes()
+    if not roles or not resumes:
+        return 0, list(roles)
+
+    processed_texts, embeddings = get_cohort_features(resumes)
+    scores = score_cohort_against_roles(processed_texts, embeddings, roles, chunk_embeddings=get_cohort_chunks(resumes))
+
+    rows_written = 0
+    saved_roles = []
+    for r, role in enumerate(scores['roles']):
+        rows = []
+        for i, resume in enumerate(resumes):
+            result = cohort_result(scores, i, r)
+            rows.append(build_analysis_row(
+                student_email=resume['student_email'],
+                company_name=result['company'],
+                job_role=result['job_role'],
+                resume_version=resume['version_number'],
+                resume_filename=resume['resume_filename'],
+                ats_score=result['ats_score'],
+                semantic_score=result['semantic_score'],
+                combined_score=result['combined_score'],
+                matched_skills=result['matched_skills'],
+                missing_skills=result['missing_skills'],
+                feedback=str(result['feedback']),
+                source='rescore'
+            ))
+
+        saved = save_analysis_results_bulk(rows)
+        if saved is not None:
+            rows_written += len(saved)
+            saved_roles.append(tuple(role))
+    return rows_written, saved_roles
+
+
+def sync_skill_versions(rescore=True):
+    """
+    Re-score changed/added roles and record the new hashes. Unchanged roles are untouched.
+
+    A role's hash is only recorded once its re-scored rows are saved, so a
+    failed write is retried on the next sync.
+
+    Returns:
+        dict: The diff that was applied plus 'rows_written' and 'failed'
+              (roles whose re-score could not be saved).
+    """
+    diff = diff_skill_versions()
+    affected = diff['changed'] + diff['added']
+
+    if rescore:
+        rows_written, synced = rescore_roles(affected)
+    else:
+        rows_written, synced = 0, affected
+
+    current = current_role_hashes()
+    if synced:
+        upsert_role_skill_versions([
+            {'company_name': company, 'job_role': role, 'skills_hash': current[(company, role)]}
+            for company, role in synced
+        ])
+    for company, role in diff['removed']:
+        delete_role_skill_version(company, role)
+
+    diff['rows_written'] = rows_written
+    diff['failed'] = sorted(set(affected) - set(synced))
+    return diff
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find roles whose skills changed and re-score them.")
+    parser.add_argument("--apply", action="store_true", help="Re-score affected roles and store the new hashes")
+    parser.add_argument("--no-rescore", action="store_true", help="With --apply, only record hashes (e.g. first run)")
+    args = parser.parse_args()
+
+    print(f"Skills database version: {skills_db_version()}")
+
+    diff = sync_skill_versions(rescore=not args.no_rescore) if args.apply else diff_skill_versions()
+
+    for label in ('changed', 'added', 'removed'):
+        print(f"\n{label.title()} roles ({len(diff[label])}):")
+        for company, role in diff[label]:
+            print(f"   • {company} - {role}")
+
+    if args.apply:
+        print(f"\n✓ Wrote {diff['rows_written']} analysis row(s)")
+        for company, role in diff['failed']:
+            print(f"⚠ Could not save re-scored rows for {company} - {role} (will retry on the next run)")
+    else:
+        print("\nRun with --apply to re-score the affected roles.")
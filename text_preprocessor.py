@@ -3,12 +3,17 @@ import re
 from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer, PorterStemmer
 from nltk.tokenize import word_tokenize
+from metrics import timed
+
+# Bump whenever preprocess_text() changes so stored processed_text is recomputed
+PREPROCESS_VERSION = "1"
 
 # Initialize NLP tools
 stop_words = set(stopwords.words('english'))
 lemmatizer = WordNetLemmatizer()
 stemmer = PorterStemmer()
 
+@timed("preprocess")
 def preprocess_text(text):
     """
     Applies a series of text preprocessing steps:
@@ -0,0 +1,145 @@
+# write_behind.py
+import atexit
+import collections
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from database import build_analysis_row, save_analysis_results_bulk
+
+# How often queued analysis rows are flushed to the database
+FLUSH_INTERVAL = float(os.getenv("ANALYSIS_WRITE_INTERVAL_MS", "300")) / 1000
+# Rows per multi-row insert
+MAX_BATCH_SIZE = int(os.getenv("ANALYSIS_WRITE_BATCH", "500"))
+# Rows kept (queued + awaiting retry) before the oldest are dropped
+MAX_PENDING = int(os.getenv("ANALYSIS_WRITE_MAX_PENDING", "10000"))
+# Upper bound for the retry back-off after failed inserts
+MAX_RETRY_DELAY = float(os.getenv("ANALYSIS_WRITE_MAX_RETRY_DELAY", "30"))
+
+
+class WriteBehindQueue:
+    """
+    Buffer analysis rows in memory and insert them in batches on a background thread.
+
+    enqueue() returns immediately, so the UI never waits on the database.
+    Rows from every session are combined into multi-row inserts; failed
+    batches go back to the front of the queue and are retried with back-off
+    (rows carry an idempotency_key, so a retried partial insert is not
+    written twice).
+    """
+
+    def __init__(self, flush_interval=FLUSH_INTERVAL, max_batch_size=MAX_BATCH_SIZE,
+                 max_pending=MAX_PENDING, insert_rows=save_analysis_results_bulk):
+        self.flush_interval = flush_interval
+        self.max_batch_size = max_batch_size
+        self.max_pending = max_pending
+        self._insert_rows = insert_rows
+        self._pending = collections.deque()
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._retry_delay = 0.0
+        self.written_total = 0
+        self.failed_batches = 0
+        self.dropped_total = 0
+        self.last_error = None
+        self.last_flush_at = None
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="analysis-write-behind", daemon=True)
+            self._thread.start()
+
+    def enqueue(self, row):
+        """Queue one row (from build_analysis_row) for insertion"""
+        with self._cond:
+            self._pending.append(row)
+            while len(self._pending) > self.max_pending:
+                self._pending.popleft()
+                self.dropped_total += 1
+            self._ensure_started()
+            # While backing off after a failure, let the back-off run out instead of retrying per row
+            if len(self._pending) >= self.max_batch_size and not self._retry_delay:
+                self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait(self.flush_interval + self._retry_delay)
+            self.flush()
+
+    def flush(self):
+        """
+        Insert everything queued so far.
+
+        Returns:
+            int: Number of rows written.
+        """
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._cond:
+                    if not self._pending:
+                        break
+                    batch = [self._pending.popleft() for _ in range(min(self.max_batch_size, len(self._pending)))]
+
+                result = self._insert_rows(batch)
+                if result is None:
+                    # Put the batch back in order and retry later
+                    with self._cond:
+                        self._pending.extendleft(reversed(batch))
+                        while len(self._pending) > self.max_pending:
+                            self._pending.popleft()
+                            self.dropped_total += 1
+                        self.failed_batches += 1
+                        self.last_error = time.time()
+                        self._retry_delay = min(MAX_RETRY_DELAY, max(1.0, self._retry_delay * 2))
+                    break
+
+                written += len(batch)
+                with self._cond:
+                    self.written_total += len(batch)
+                    self.last_flush_at = time.time()
+                    self._retry_delay = 0.0
+        return written
+
+    def pending_roles(self, student_email, resume_version):
+        """(company, job_role) pairs of rows still queued for one resume version"""
+        with self._cond:
+            return {(row['company_name'], row['job_role']) for row in self._pending
+                    if row['student_email'] == student_email and row['resume_version'] == resume_version}
+
+    def stats(self):
+        """Queue depth and totals for the status panel"""
+        with self._cond:
+            return {
+                'pending': len(self._pending),
+                'written_total': self.written_total,
+                'failed_batches': self.failed_batches,
+                'dropped_total': self.dropped_total,
+                'retry_delay': self._retry_delay,
+                'last_flush_at': self.last_flush_at,
+                'last_error_at': self.last_error
+            }
+
+
+_queue = WriteBehindQueue()
+# Write out whatever is still buffered when the server shuts down
+atexit.register(_queue.flush)
+
+
+def get_write_queue():
+    """Get the process-wide analysis write-behind queue"""
+    return _queue
+
+
+def save_analysis_result_async(student_email, company_name, job_role, resume_version, resume_filename,
+                               ats_score, semantic_score, combined_score, matched_skills, missing_skills, feedback):
+    """Queue an analysis for saving; same arguments as database.save_analysis_result"""
+    row = build_analysis_row(
+        student_email, company_name, job_role, resume_version, resume_filename,
+        ats_score, semantic_score, combined_score, matched_skills, missing_skills, feedback
+    )
+    # Stamp the analysis time now so batching and retries don't reorder history
+    row['analyzed_at'] = datetime.now(timezone.utc).isoformat()
+    _queue.enqueue(row)